@@ -1,10 +1,11 @@
 // SPDX-License-Identifier: MIT
 
-pragma solidity ^0.8.0;
+pragma solidity ^0.8.1;
 
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts-upgradeable/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts-upgradeable/contracts/access/OwnableUpgradeable.sol";
+import "@openzeppelin/contracts/proxy/Clones.sol";
 import "./BankingNode.sol";
 import "./libraries/TransferHelper.sol";
 
@@ -14,6 +15,8 @@ import "./libraries/TransferHelper.sol";
 error InvalidBaseToken();
 //occurs when a user tries to set up a second node from same account
 error OneNodePerAccountOnly();
+//occurs when creating a node before the BankingNode implementation is set, or setting it to a non contract
+error InvalidImplementation();
 
 contract BNPLFactory is Initializable, OwnableUpgradeable {
 
@@ -25,6 +28,9 @@ contract BNPLFactory is Initializable, OwnableUpgradeable {
     address public uniswapFactory;
     mapping(address => bool) public approvedBaseTokens;
     address public aaveDistributionController;
+    mapping(address => bool) public isBankingNode;
+    //BankingNode contract every node is a clone of
+    address public bankingNodeImplementation;
 
     event NewNode(address indexed _operator, address indexed _node);
 
@@ -74,14 +80,15 @@ contract BNPLFactory is Initializable, OwnableUpgradeable {
         if (operatorToNode[msg.sender] != address(0)) {
             revert OneNodePerAccountOnly();
         }
-        //create a new node
-        bytes memory bytecode = type(BankingNode).creationCode;
+        address implementation = bankingNodeImplementation;
+        if (implementation == address(0)) {
+            revert InvalidImplementation();
+        }
+        //create a new node, as a minimal proxy (EIP-1167) of the implementation
         bytes32 salt = keccak256(
             abi.encodePacked(_baseToken, _requireKYC, _gracePeriod, msg.sender)
         );
-        assembly {
-            node := create2(0, add(bytecode, 32), mload(bytecode), salt)
-        }
+        node = Clones.cloneDeterministic(implementation, salt);
         BankingNode(node).initialize(
             _baseToken,
             _bnpl,
@@ -96,9 +103,12 @@ contract BNPLFactory is Initializable, OwnableUpgradeable {
 
         bankingNodesList.push(node);
         operatorToNode[msg.sender] = node;
+        isBankingNode[node] = true;
         
         TransferHelper.safeApprove(_bnpl, node, bondAmount);
         BankingNode(node).stake(bondAmount);
+
+        emit NewNode(msg.sender, node);
     }
 
     //ONLY OWNER FUNCTIONS
@@ -116,6 +126,37 @@ contract BNPLFactory is Initializable, OwnableUpgradeable {
         approvedBaseTokens[_baseToken] = _status;
     }
 
+    /**
+     * Set the BankingNode implementation new nodes are cloned from
+     * Existing nodes keep the implementation they were created with
+     */
+    function setBankingNodeImplementation(address _implementation)
+        external
+        onlyOwner
+    {
+        if (_implementation.code.length == 0) {
+            revert InvalidImplementation();
+        }
+        bankingNodeImplementation = _implementation;
+    }
+
+    /**
+     * Flag the nodes created before isBankingNode existed, from bankingNodesList[start]
+     * Paged as the list can outgrow a block, count is capped at the end of the list
+     */
+    function backfillBankingNodes(uint256 start, uint256 count)
+        external
+        onlyOwner
+    {
+        uint256 end = start + count;
+        if (end > bankingNodesList.length) {
+            end = bankingNodesList.length;
+        }
+        for (uint256 i = start; i < end; i++) {
+            isBankingNode[bankingNodesList[i]] = true;
+        }
+    }
+
     /**
      * Get number of current nodes
      */
@@ -8,6 +8,7 @@ error InvalidToken();
 error InsufficientUserBalance(uint256 userBalance);
 error PoolExists();
 error RewardsCannotIncrease();
+error InvalidInputLength();
 
 /**
  * Modified version of Sushiswap MasterChef.sol contract
@@ -18,6 +19,9 @@ error RewardsCannotIncrease();
  * - Minting functions for BNPL not possible, they are transfered from treasury instead
  * - Removed safeMath as using solidity ^0.8.0
  * - Require checks changed to custom errors to save gas
+ * - Emissions are tracked per allocation point in a global index, so add and set only update one pool
+ * - Emissions are pulled from the treasury an epoch at a time into a buffer, pool updates only do accounting
+ * - The owner can return the buffer to the treasury, rewards already given to pools are kept
  */
 
 contract BNPLRewardsController is Ownable {
@@ -30,6 +34,14 @@ contract BNPLRewardsController is Ownable {
     uint256 public endTime; //3 years of emmisions
     uint256 public totalAllocPoint = 0; //total allocation points, no need for max alloc points as max is the supply of BNPL
     PoolInfo[] public poolInfo;
+    //pid + 1 of each node's pool, 0 if the node has no pool
+    mapping(address => uint256) private nodeToPid;
+    //BNPL emitted per allocation point since the start * 1e18, and the last time it was updated
+    uint256 public accBnplPerAllocPoint;
+    uint256 public lastGlobalUpdateTime;
+    //BNPL pulled from the treasury and not yet given to pools
+    uint256 public emissionsBuffer;
+    uint256 public constant EPOCH = 604800; //1 week of emmisions pulled at a time
 
     struct UserInfo {
         uint256 amount;
@@ -41,6 +53,7 @@ contract BNPLRewardsController is Ownable {
         uint256 allocPoint;
         uint256 lastRewardTime;
         uint256 accBnplPerShare;
+        uint256 lastAccBnplPerAllocPoint; //accBnplPerAllocPoint at the last pool update
     }
 
     //EVENTS
@@ -51,6 +64,7 @@ contract BNPLRewardsController is Ownable {
         uint256 indexed pid,
         uint256 amount
     );
+    event EmissionsReturned(uint256 amount);
 
     constructor(
         BNPLFactory _bnplFactory,
@@ -76,10 +90,11 @@ contract BNPLRewardsController is Ownable {
     function add(IBankingNode _lpToken) public {
         checkValidNode(address(_lpToken));
 
-        massUpdatePools();
+        uint256 _accBnplPerAllocPoint = updateGlobal();
 
         uint256 _allocPoint = _lpToken.getStakedBNPL();
         checkForDuplicate(_lpToken);
+        nodeToPid[address(_lpToken)] = poolInfo.length + 1;
 
         uint256 lastRewardTime = block.timestamp > startTime
             ? block.timestamp
@@ -90,7 +105,8 @@ contract BNPLRewardsController is Ownable {
                 lpToken: _lpToken,
                 allocPoint: _allocPoint,
                 lastRewardTime: lastRewardTime,
-                accBnplPerShare: 0
+                accBnplPerShare: 0,
+                lastAccBnplPerAllocPoint: _accBnplPerAllocPoint
             })
         );
     }
@@ -103,7 +119,8 @@ contract BNPLRewardsController is Ownable {
         //get the new _allocPoints
         uint256 _allocPoint = poolInfo[_pid].lpToken.getStakedBNPL();
 
-        massUpdatePools();
+        //other pools keep earning at the previous weights up to now through the global index
+        updatePool(_pid);
 
         totalAllocPoint =
             totalAllocPoint +
@@ -122,6 +139,20 @@ contract BNPLRewardsController is Ownable {
         }
     }
 
+    /**
+     * Update the BNPL emitted per allocation point up to now
+     * Must be called before totalAllocPoint or bnplPerSecond change
+     */
+    function updateGlobal() internal returns (uint256 _accBnplPerAllocPoint) {
+        _accBnplPerAllocPoint = accBnplPerAllocPoint;
+        if (block.timestamp <= lastGlobalUpdateTime) {
+            return _accBnplPerAllocPoint;
+        }
+        _accBnplPerAllocPoint = getAccBnplPerAllocPoint();
+        accBnplPerAllocPoint = _accBnplPerAllocPoint;
+        lastGlobalUpdateTime = block.timestamp;
+    }
+
     /**
      * Update reward variables for a pool given pool to be up-to-date
      */
@@ -130,58 +161,144 @@ contract BNPLRewardsController is Ownable {
         if (block.timestamp <= pool.lastRewardTime) {
             return;
         }
+        uint256 _accBnplPerAllocPoint = updateGlobal();
         uint256 lpSupply = pool.lpToken.balanceOf(address(this));
+        //rewards of the pool since its last update
+        uint256 bnplReward = (pool.allocPoint *
+            (_accBnplPerAllocPoint - pool.lastAccBnplPerAllocPoint)) / 1e18;
+        pool.lastAccBnplPerAllocPoint = _accBnplPerAllocPoint;
         if (lpSupply == 0) {
-            pool.lastRewardTime == block.timestamp;
+            pool.lastRewardTime = block.timestamp;
             return;
         }
-        uint256 multiplier = getMultiplier(
-            pool.lastRewardTime,
-            block.timestamp
-        );
-        uint256 bnplReward = (multiplier * bnplPerSecond * pool.allocPoint) /
-            totalAllocPoint;
 
-        //instead of minting, simply transfers the tokens from the owner
-        //ensure owner has approved the tokens to the contract
+        //instead of minting, rewards are paid from the buffer of tokens pulled from the treasury
+        uint256 _emissionsBuffer = emissionsBuffer;
+        if (bnplReward > _emissionsBuffer) {
+            //lazily pull the shortfall and the next epoch if no keeper has
+            _emissionsBuffer += pullFromTreasury(
+                bnplReward - _emissionsBuffer + getEpochEmissions()
+            );
+        }
+        emissionsBuffer = _emissionsBuffer - bnplReward;
 
-        address _bnpl = bnpl;
-        address _treasury = treasury;
+        pool.accBnplPerShare += (bnplReward * 1e12) / lpSupply;
+        pool.lastRewardTime = block.timestamp;
+    }
+
+    /**
+     * Top up the emissions buffer to the next epoch of emmisions, in one transfer from the treasury
+     * Can be called by keepers, otherwise the buffer is filled when a pool update needs it
+     */
+    function pullEmissions() external {
+        uint256 epochEmissions = getEpochEmissions();
+        uint256 _emissionsBuffer = emissionsBuffer;
+        if (epochEmissions > _emissionsBuffer) {
+            emissionsBuffer =
+                _emissionsBuffer +
+                pullFromTreasury(epochEmissions - _emissionsBuffer);
+        }
+    }
+
+    /**
+     * Return the emissions buffer above _keep to the treasury
+     * Pools must be updated first, so the buffer only holds BNPL not yet given to pools
+     */
+    function returnToTreasury(uint256 _keep) internal {
+        uint256 _emissionsBuffer = emissionsBuffer;
+        if (_emissionsBuffer <= _keep) {
+            return;
+        }
+        emissionsBuffer = _keep;
+        TransferHelper.safeTransfer(bnpl, treasury, _emissionsBuffer - _keep);
+        emit EmissionsReturned(_emissionsBuffer - _keep);
+    }
+
+    /**
+     * Transfer BNPL from the treasury, instead of minting
+     * Ensure the treasury has approved the tokens to the contract
+     */
+    function pullFromTreasury(uint256 _amount) internal returns (uint256) {
         TransferHelper.safeTransferFrom(
-            _bnpl,
-            _treasury,
+            bnpl,
+            treasury,
             address(this),
-            bnplReward
+            _amount
         );
-
-        pool.accBnplPerShare += (bnplReward * 1e12) / lpSupply;
-        pool.lastRewardTime = block.timestamp;
+        return _amount;
     }
 
     /**
      * Deposit LP tokens from the user
      */
     function deposit(uint256 _pid, uint256 _amount) public {
+        uint256 pending = _deposit(_pid, _amount);
+        if (pending > 0) {
+            safeBnplTransfer(msg.sender, pending);
+        }
+    }
+
+    /**
+     * Deposit LP tokens into several pools, the BNPL harvested is paid in one transfer
+     */
+    function depositMany(uint256[] calldata _pids, uint256[] calldata _amounts)
+        external
+    {
+        uint256 length = _pids.length;
+        if (length != _amounts.length) {
+            revert InvalidInputLength();
+        }
+        uint256 pending;
+        for (uint256 i = 0; i < length; ++i) {
+            pending += _deposit(_pids[i], _amounts[i]);
+        }
+        if (pending > 0) {
+            safeBnplTransfer(msg.sender, pending);
+        }
+    }
+
+    /**
+     * Harvest the BNPL of several pools in one transfer, same as deposit(pid, 0) for each pool
+     */
+    function harvestMany(uint256[] calldata _pids) external {
+        uint256 length = _pids.length;
+        uint256 pending;
+        for (uint256 i = 0; i < length; ++i) {
+            pending += _deposit(_pids[i], 0);
+        }
+        if (pending > 0) {
+            safeBnplTransfer(msg.sender, pending);
+        }
+    }
+
+    /**
+     * Update the pool and deposit the LP tokens of the user
+     * Returns the pending BNPL harvested, to be paid by the caller
+     */
+    function _deposit(uint256 _pid, uint256 _amount)
+        private
+        returns (uint256 pending)
+    {
         PoolInfo storage pool = poolInfo[_pid];
         UserInfo storage user = userInfo[_pid][msg.sender];
 
         updatePool(_pid);
 
-        uint256 pending = ((user.amount * pool.accBnplPerShare) / 1e12) -
+        pending =
+            ((user.amount * pool.accBnplPerShare) / 1e12) -
             user.rewardDebt;
 
         user.amount += _amount;
         user.rewardDebt = (user.amount * pool.accBnplPerShare) / 1e12;
 
-        if (pending > 0) {
-            safeBnplTransfer(msg.sender, pending);
+        if (_amount > 0) {
+            TransferHelper.safeTransferFrom(
+                address(pool.lpToken),
+                msg.sender,
+                address(this),
+                _amount
+            );
         }
-        TransferHelper.safeTransferFrom(
-            address(pool.lpToken),
-            msg.sender,
-            address(this),
-            _amount
-        );
 
         emit Deposit(msg.sender, _pid, _amount);
     }
@@ -247,14 +364,28 @@ contract BNPLRewardsController is Ownable {
 
     /**
      * Update the BNPL per second emmisions, emmisions can only be decreased
+     * The emissions buffer is trimmed to an epoch at the new rate, the rest returned to the treasury
      */
     function updateRewards(uint256 _bnplPerSecond) public onlyOwner {
         if (_bnplPerSecond > bnplPerSecond) {
             revert RewardsCannotIncrease();
         }
+        //give pools their rewards at the previous rate before trimming the buffer
+        massUpdatePools();
+        updateGlobal();
+
         bnplPerSecond = _bnplPerSecond;
+        returnToTreasury(getEpochEmissions());
+    }
 
+    /**
+     * Return all the BNPL of the emissions buffer to the treasury
+     * Rewards accrued up to now are given to pools first and stay claimable,
+     * later pool updates pull from the treasury again
+     */
+    function sweepEmissionsBuffer() external onlyOwner {
         massUpdatePools();
+        returnToTreasury(0);
     }
 
     /**
@@ -285,6 +416,34 @@ contract BNPLRewardsController is Ownable {
         }
     }
 
+    /**
+     * Get the BNPL emitted per allocation point since the start * 1e18, up to now
+     * Emissions while no pools are allocated points are not distributed
+     */
+    function getAccBnplPerAllocPoint() public view returns (uint256) {
+        uint256 _totalAllocPoint = totalAllocPoint;
+        if (_totalAllocPoint == 0) {
+            return accBnplPerAllocPoint;
+        }
+        uint256 multiplier = getMultiplier(
+            lastGlobalUpdateTime,
+            block.timestamp
+        );
+        return
+            accBnplPerAllocPoint +
+            (multiplier * bnplPerSecond * 1e18) /
+            _totalAllocPoint;
+    }
+
+    /**
+     * Get the BNPL emitted over the next epoch, stops at endTime
+     */
+    function getEpochEmissions() public view returns (uint256) {
+        return
+            getMultiplier(block.timestamp, block.timestamp + EPOCH) *
+            bnplPerSecond;
+    }
+
     /**
      * Get the number of pools
      */
@@ -296,10 +455,8 @@ contract BNPLRewardsController is Ownable {
      * Check if the pool already exists
      */
     function checkForDuplicate(IBankingNode _lpToken) internal view {
-        for (uint256 i = 0; i < poolInfo.length; i++) {
-            if (poolInfo[i].lpToken == _lpToken) {
-                revert PoolExists();
-            }
+        if (nodeToPid[address(_lpToken)] != 0) {
+            revert PoolExists();
         }
     }
 
@@ -308,7 +465,7 @@ contract BNPLRewardsController is Ownable {
      * Modifed by removing safe math
      */
     function pendingBnpl(uint256 _pid, address _user)
-        external
+        public
         view
         returns (uint256)
     {
@@ -318,31 +475,37 @@ contract BNPLRewardsController is Ownable {
         uint256 lpSupply = pool.lpToken.balanceOf(address(this));
 
         if (block.timestamp > pool.lastRewardTime && lpSupply != 0) {
-            uint256 multiplier = getMultiplier(
-                pool.lastRewardTime,
-                block.timestamp
-            );
-            uint256 bnplReward = (multiplier *
-                bnplPerSecond *
-                pool.allocPoint) / totalAllocPoint;
+            uint256 bnplReward = (pool.allocPoint *
+                (getAccBnplPerAllocPoint() - pool.lastAccBnplPerAllocPoint)) /
+                1e18;
             accBnplPerShare += (bnplReward * 1e12) / lpSupply;
         }
         return (user.amount * accBnplPerShare) / (1e12) - user.rewardDebt;
     }
 
+    /**
+     * Get the pending bnpl to harvest of a user in several pools
+     */
+    function pendingBnplMany(uint256[] calldata _pids, address _user)
+        external
+        view
+        returns (uint256[] memory pending)
+    {
+        uint256 length = _pids.length;
+        pending = new uint256[](length);
+        for (uint256 i = 0; i < length; ++i) {
+            pending[i] = pendingBnpl(_pids[i], _user);
+        }
+    }
+
     /**
      * Checks if a given address is a valid banking node registered
      * Reverts with InvalidToken() if node not found
      */
     function checkValidNode(address _bankingNode) private view {
-        BNPLFactory _bnplFactory = bnplFactory;
-        uint256 length = _bnplFactory.bankingNodeCount();
-        for (uint256 i; i < length; i++) {
-            if (_bnplFactory.bankingNodesList(i) == _bankingNode) {
-                return;
-            }
+        if (!bnplFactory.isBankingNode(_bankingNode)) {
+            revert InvalidToken();
         }
-        revert InvalidToken();
     }
 
     /**
@@ -352,7 +515,7 @@ contract BNPLRewardsController is Ownable {
      * - must multiply by BNPL price / 1e18 to get USD APR
      * If return == 0, APR = NaN
      */
-    function getBnplApr(uint256 _pid) external view returns (uint256 bnplApr) {
+    function getBnplApr(uint256 _pid) public view returns (uint256 bnplApr) {
         PoolInfo storage pool = poolInfo[_pid];
         uint256 lpBalanceStaked = pool.lpToken.balanceOf(address(this));
         if (lpBalanceStaked == 0) {
@@ -365,17 +528,27 @@ contract BNPLRewardsController is Ownable {
         }
     }
 
+    /**
+     * Get the Apr of every pool, indexed by pid, see getBnplApr
+     */
+    function getBnplAprAll() external view returns (uint256[] memory bnplAprs) {
+        uint256 length = poolInfo.length;
+        bnplAprs = new uint256[](length);
+        for (uint256 pid = 0; pid < length; ++pid) {
+            bnplAprs[pid] = getBnplApr(pid);
+        }
+    }
+
     /**
      * Helper function for front end
-     * Get the pid+1 given a node address
+     * Get the pid given a node address
      * Returns 0xFFFF if node not found
      */
     function getPid(address node) external view returns (uint256) {
-        for (uint256 i; i < poolInfo.length; ++i) {
-            if (address(poolInfo[i].lpToken) == node) {
-                return i;
-            }
+        uint256 pid = nodeToPid[node];
+        if (pid == 0) {
+            return 0xFFFF;
         }
-        return 0xFFFF;
+        return pid - 1;
     }
 }
@@ -1,8 +1,8 @@
 // SPDX-License-Identifier: MIT
 
 // NOTE: BankingNode.sol should only be created through the BNPLFactory contract to
-// ensure compatibility of baseToken and minimum bond amounts. Before interacting,
-// please ensure that the contract deployer was BNPLFactory.sol
+// ensure compatibility of baseToken and minimum bond amounts. Nodes are EIP-1167 clones
+// of one implementation, before interacting please ensure that bnplFactory is BNPLFactory.sol
 
 pragma solidity ^0.8.0;
 
@@ -71,23 +71,34 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
     //constants set by factory
     address public BNPL;
     ILendingPoolAddressesProvider public lendingPoolProvider;
-    address public immutable bnplFactory;
+    address public bnplFactory;
     //used by treasury can be private
     IAaveIncentivesController private aaveRewardController;
     address private treasury;
+    //cached from lendingPoolProvider, updated with refreshProtocolAddresses()
+    ILendingPool private lendingPool;
+    address private baseTokenAToken;
+    //multiplier from baseToken decimals to 18 decimals
+    uint256 private decimalAdjust;
 
     //For loans
-    mapping(uint256 => Loan) public idToLoan;
+    uint256 private constant RAY = 1e27;
+    //can be private as there is a getter function for loans (idToLoan)
+    mapping(uint256 => Loan) private packedLoans;
     uint256[] public pendingRequests;
     uint256[] public currentLoans;
+    //position + 1 of a loan in pendingRequests/currentLoans for constant gas removal, 0 if not added
+    mapping(uint256 => uint256) private pendingRequestIndex;
+    mapping(uint256 => uint256) private currentLoanIndex;
     mapping(uint256 => uint256) defaultedLoans;
     uint256 public defaultedLoanCount;
+    //can be private as there is a getter function for total default loss
+    uint256 private totalDefaultLoss;
 
     //For Staking, Slashing and Balances
     uint256 public accountsReceiveable;
     mapping(address => bool) public whitelistedAddresses;
     mapping(address => uint256) public unbondBlock;
-    mapping(uint256 => address) public loanToAgent;
     uint256 public slashingBalance;
     mapping(address => uint256) public stakingShares;
     //can be private as there is a getter function for staking balance
@@ -102,18 +113,21 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
     //For Collateral in loans
     mapping(address => uint256) public collateralOwed;
 
+    //packed into 4 storage slots, inputs are checked to fit on request and approval
     struct Loan {
         address borrower;
-        bool interestOnly; //interest only or principal + interest
-        uint256 loanStartTime; //unix timestamp of start
-        uint256 loanAmount;
-        uint256 paymentInterval; //unix interval of payment (e.g. monthly = 2,628,000)
-        uint256 interestRate; //interest rate per peiod * 10000, e.g., 10% on a 12 month loan = : 0.1 * 10000 / 12 = 83
-        uint256 numberOfPayments;
-        uint256 principalRemaining;
-        uint256 paymentsMade;
+        uint96 loanAmount;
+        address agent;
+        uint96 principalRemaining;
         address collateral;
-        uint256 collateralAmount;
+        uint96 collateralAmount;
+        uint96 paymentAmount; //periodic payment, set on approval (interest only loans: the interest payment)
+        uint40 loanStartTime; //unix timestamp of start
+        uint32 paymentInterval; //unix interval of payment (e.g. monthly = 2,628,000)
+        uint16 interestRate; //interest rate per peiod * 10000, e.g., 10% on a 12 month loan = : 0.1 * 10000 / 12 = 83
+        uint16 numberOfPayments;
+        uint16 paymentsMade;
+        bool interestOnly; //interest only or principal + interest
         bool isSlashed;
     }
 
@@ -138,8 +152,11 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
     event bnplWithdrawn(address user, uint256 bnplWithdrawn);
     event KYCRequirementChanged(bool newStatus);
 
+    /**
+     * Locks the implementation, nodes are clones initialized by the factory
+     */
     constructor() {
-        bnplFactory = msg.sender;
+        bnplFactory = address(this);
     }
 
     // MODIFIERS
@@ -165,12 +182,22 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
      * Ensure that the loan has principal to be paid
      */
     modifier ensurePrincipalRemaining(uint256 loanId) {
-        if (idToLoan[loanId].principalRemaining == 0) {
+        if (packedLoans[loanId].principalRemaining == 0) {
             revert NoPrincipalRemaining();
         }
         _;
     }
 
+    /**
+     * Ensure that the loan was not slashed, its principal is already counted as a default loss
+     */
+    modifier ensureNotSlashed(uint256 loanId) {
+        if (packedLoans[loanId].isSlashed) {
+            revert LoanAlreadySlashed();
+        }
+        _;
+    }
+
     /**
      * For operator only functions
      */
@@ -206,6 +233,7 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
 
     /**
      * Called once by the factory at time of deployment
+     * The caller is saved as the factory, clones start with an empty storage
      */
     function initialize(
         address _baseToken,
@@ -218,8 +246,9 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         address _aaveDistributionController,
         address _uniswapFactory
     ) external {
-        //only to be done by factory, no need for error msgs in here as not used by users
-        require(msg.sender == bnplFactory);
+        //only to be done once, no need for error msgs in here as not used by users
+        require(bnplFactory == address(0));
+        bnplFactory = msg.sender;
         baseToken = _baseToken;
         BNPL = _BNPL;
         requireKYC = _requireKYC;
@@ -235,13 +264,11 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         uniswapFactory = _uniswapFactory;
         treasury = address(0x27a99802FC48b57670846AbFFf5F2DcDE8a6fC29);
         timeCreated = block.timestamp;
+        _refreshProtocolAddresses();
         //decimal check on baseToken and aToken to make sure math logic on future steps
-        require(
-            ERC20(_baseToken).decimals() ==
-                ERC20(
-                    _getLendingPool().getReserveData(_baseToken).aTokenAddress
-                ).decimals()
-        );
+        uint256 tokenDecimals = ERC20(_baseToken).decimals();
+        require(tokenDecimals == ERC20(baseTokenAToken).decimals());
+        decimalAdjust = 10**(18 - tokenDecimals);
     }
 
     /**
@@ -274,25 +301,37 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         ) {
             revert InvalidLoanInput();
         }
+        //ensure the inputs fit in the packed Loan
+        if (
+            loanAmount > type(uint96).max ||
+            collateralAmount > type(uint96).max ||
+            interestRate > type(uint16).max ||
+            numberOfPayments > type(uint16).max
+        ) {
+            revert InvalidLoanInput();
+        }
         //157,680,000 seconds in 5 years
         if (paymentInterval * numberOfPayments > 157680000) {
             revert MaximumLoanDurationExceeded();
         }
         requestId = incrementor;
         incrementor++;
-        pendingRequests.push(requestId);
-        idToLoan[requestId] = Loan(
+        _addLoan(pendingRequests, pendingRequestIndex, requestId);
+        //paymentInterval fits in uint32 as the loan duration is at most 5 years
+        packedLoans[requestId] = Loan(
             msg.sender, //set borrower
-            interestOnly,
-            0, //start time initiated to 0
-            loanAmount,
-            paymentInterval, //interval of payments (e.g. Monthly)
-            interestRate, //annualized interest rate per period * 10000 (e.g. 12 month loan 10% = 83)
-            numberOfPayments,
+            uint96(loanAmount),
+            agent, //save the agent of the loan
             0, //initalize principalRemaining to 0
-            0, //intialize paymentsMade to 0
             collateral,
-            collateralAmount,
+            uint96(collateralAmount),
+            0, //payment amount is calculated on approval
+            0, //start time initiated to 0
+            uint32(paymentInterval), //interval of payments (e.g. Monthly)
+            uint16(interestRate), //annualized interest rate per period * 10000 (e.g. 12 month loan 10% = 83)
+            uint16(numberOfPayments),
+            0, //intialize paymentsMade to 0
+            interestOnly,
             false
         );
         //post the collateral if any
@@ -308,9 +347,6 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
             //deposit the collateral in AAVE to accrue interest
             _depositToLendingPool(collateral, collateralAmount);
         }
-        //save the agent of the loan
-        loanToAgent[requestId] = agent;
-
         emit LoanRequest(requestId, message);
     }
 
@@ -319,7 +355,7 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
      * Loan must have no principal remaining (not approved, or payments finsihed)
      */
     function withdrawCollateral(uint256 loanId) external {
-        Loan storage loan = idToLoan[loanId];
+        Loan storage loan = packedLoans[loanId];
         address collateral = loan.collateral;
         uint256 amount = loan.collateralAmount;
 
@@ -365,13 +401,13 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         nonBaseToken(collateral)
     {
         //get the aToken address
-        ILendingPool lendingPool = _getLendingPool();
+        ILendingPool _lendingPool = lendingPool;
         address _bnpl = BNPL;
         uint256 feesAccrued = IERC20(
-            lendingPool.getReserveData(collateral).aTokenAddress
+            _lendingPool.getReserveData(collateral).aTokenAddress
         ).balanceOf(address(this)) - collateralOwed[collateral];
         //ensure there is collateral to collect inside of _swap
-        lendingPool.withdraw(collateral, feesAccrued, address(this));
+        _lendingPool.withdraw(collateral, feesAccrued, address(this));
         //no slippage for small swaps
         _swapToken(collateral, _bnpl, 0, feesAccrued);
     }
@@ -379,30 +415,14 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
     /*
      * Make a loan payment
      */
-    function makeLoanPayment(uint256 loanId)
-        external
-        ensurePrincipalRemaining(loanId)
-    {
-        Loan storage loan = idToLoan[loanId];
-        uint256 paymentAmount = getNextPayment(loanId);
-        uint256 interestPortion = (loan.principalRemaining *
-            loan.interestRate) / 10000;
+    function makeLoanPayment(uint256 loanId) external {
+        (
+            uint256 paymentAmount,
+            uint256 depositAmount,
+            uint256 principalPortion
+        ) = _makeLoanPayment(loanId);
+        accountsReceiveable -= principalPortion;
         address _baseToken = baseToken;
-        loan.paymentsMade++;
-        //reduce accounts receiveable and loan principal if principal + interest payment
-        bool finalPayment = loan.paymentsMade == loan.numberOfPayments;
-
-        if (!loan.interestOnly) {
-            uint256 principalPortion = paymentAmount - interestPortion;
-            loan.principalRemaining -= principalPortion;
-            accountsReceiveable -= principalPortion;
-        } else {
-            //interest only, principal change only on final payment
-            if (finalPayment) {
-                accountsReceiveable -= loan.principalRemaining;
-                loan.principalRemaining = 0;
-            }
-        }
         //make payment
         TransferHelper.safeTransferFrom(
             _baseToken,
@@ -411,17 +431,41 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
             paymentAmount
         );
         //deposit the tokens into AAVE on behalf of the pool contract, withholding 30% and the interest as baseToken
-        _depositToLendingPool(
+        _depositToLendingPool(_baseToken, depositAmount);
+    }
+
+    /**
+     * Make the next payment of several loans
+     * The total is paid in one transfer and deposited to AAVE in one deposit
+     */
+    function makeLoanPayments(uint256[] calldata loanIds)
+        external
+        nonZeroInput(loanIds.length)
+    {
+        uint256 totalPayment;
+        uint256 totalDeposit;
+        uint256 totalPrincipal;
+        for (uint256 i; i < loanIds.length; i++) {
+            (
+                uint256 paymentAmount,
+                uint256 depositAmount,
+                uint256 principalPortion
+            ) = _makeLoanPayment(loanIds[i]);
+            totalPayment += paymentAmount;
+            totalDeposit += depositAmount;
+            totalPrincipal += principalPortion;
+        }
+        accountsReceiveable -= totalPrincipal;
+        address _baseToken = baseToken;
+        //make payments
+        TransferHelper.safeTransferFrom(
             _baseToken,
-            paymentAmount - ((interestPortion * 3) / 10)
+            msg.sender,
+            address(this),
+            totalPayment
         );
-        //remove if final payment
-        if (finalPayment) {
-            _removeCurrentLoan(loanId);
-        }
-        //increment the loan status
-
-        emit loanPaymentMade(loanId);
+        //deposit the tokens into AAVE on behalf of the pool contract, withholding 30% and the interest as baseToken
+        _depositToLendingPool(_baseToken, totalDeposit);
     }
 
     /**
@@ -431,8 +475,9 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
     function repayEarly(uint256 loanId)
         external
         ensurePrincipalRemaining(loanId)
+        ensureNotSlashed(loanId)
     {
-        Loan storage loan = idToLoan[loanId];
+        Loan storage loan = packedLoans[loanId];
         uint256 principalLeft = loan.principalRemaining;
         //make a payment of remaining principal + 1 period of interest
         uint256 interestAmount = (principalLeft * loan.interestRate) / 10000;
@@ -494,24 +539,20 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         ensureNodeActive
         nonZeroInput(_amount)
     {
+        uint256 totalAssetValue = getTotalAssetValue();
         //First deposit must be at least 10M wei to prevent initial attack
-        if (getTotalAssetValue() == 0 && _amount < 10000000) {
+        if (totalAssetValue == 0 && _amount < 10000000) {
             revert InvalidInitialDeposit();
         }
-        //check the decimals of the baseTokens
         address _baseToken = baseToken;
-        uint256 decimalAdjust = 1;
-        uint256 tokenDecimals = ERC20(_baseToken).decimals();
-        if (tokenDecimals != 18) {
-            decimalAdjust = 10**(18 - tokenDecimals);
-        }
-        //get the amount of tokens to mint
+        //get the amount of tokens to mint, adjusted from baseToken decimals
         uint256 what = _amount * decimalAdjust;
-        if (totalSupply() != 0) {
+        uint256 _totalSupply = totalSupply();
+        if (_totalSupply != 0) {
             //no need to decimal adjust here as total asset value adjusts
             //unable to deposit if getTotalAssetValue() == 0 and totalSupply() != 0, but this
             //should never occur as defaults will get slashed for some base token recovery
-            what = (_amount * totalSupply()) / getTotalAssetValue();
+            what = (_amount * _totalSupply) / totalAssetValue;
         }
         //transfer tokens from the user and mint
         TransferHelper.safeTransferFrom(
@@ -533,12 +574,18 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
      * , not BNPL USD to burn
      */
     function withdraw(uint256 _amount) external nonZeroInput(_amount) {
-        uint256 userBaseBalance = getBaseTokenBalance(msg.sender);
-        if (userBaseBalance < _amount) {
+        uint256 _balance = balanceOf(msg.sender);
+        uint256 _totalSupply = totalSupply();
+        uint256 totalAssetValue = getTotalAssetValue();
+        //same as getBaseTokenBalance(msg.sender), reusing the asset value
+        if (
+            _totalSupply == 0 ||
+            (_balance * totalAssetValue) / _totalSupply < _amount
+        ) {
             revert InsufficientBalance();
         }
         //safe div, if _amount > 0, asset value always >0;
-        uint256 what = (_amount * totalSupply()) / getTotalAssetValue();
+        uint256 what = (_amount * _totalSupply) / totalAssetValue;
         address _baseToken = baseToken;
         _burn(msg.sender, what);
         //non-zero revert with checked in "_withdrawFromLendingPool"
@@ -666,14 +713,12 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
     function slashLoan(uint256 loanId, uint256 minOut)
         external
         ensurePrincipalRemaining(loanId)
+        ensureNotSlashed(loanId)
     {
         //Step 1. load loan as local variable
-        Loan storage loan = idToLoan[loanId];
+        Loan storage loan = packedLoans[loanId];
 
-        //Step 2. requirement checks: loan is ongoing and expired past grace period
-        if (loan.isSlashed) {
-            revert LoanAlreadySlashed();
-        }
+        //Step 2. requirement checks: loan is expired past grace period
         if (block.timestamp <= getNextDueDate(loanId) + gracePeriod) {
             revert LoanNotExpired();
         }
@@ -734,6 +779,7 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         //Step 6. remove loan from currentLoans and add to defaulted loans
         defaultedLoans[defaultedLoanCount] = loanId;
         defaultedLoanCount++;
+        totalDefaultLoss += loan.principalRemaining;
 
         loan.isSlashed = true;
         _removeCurrentLoan(loanId);
@@ -787,6 +833,14 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         emit baseTokensDonated(_amount);
     }
 
+    /**
+     * Update the cached AAVE Lending Pool and baseToken aToken, after an AAVE upgrade
+     * Can be called by anyone, the addresses are read from the lending pool provider
+     */
+    function refreshProtocolAddresses() external {
+        _refreshProtocolAddresses();
+    }
+
     //OPERATOR ONLY FUNCTIONS
 
     /**
@@ -797,55 +851,76 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         external
         operatorOnly
     {
-        Loan storage loan = idToLoan[loanId];
-        uint256 length = pendingRequests.length;
-        uint256 loanSize = loan.loanAmount;
-        address _baseToken = baseToken;
-
         if (getBNPLBalance(operator) < 0x13DA329B6336471800000) {
             revert NodeInactive();
         }
-        //ensure the loan was never started and collateral enough
-        if (loan.loanStartTime > 0) {
-            revert LoanAlreadyStarted();
-        }
-        if (loan.collateralAmount < requiredCollateralAmount) {
-            revert InsufficientCollateral();
-        }
-
-        //remove from loanRequests and add loan to current loans
-
-        for (uint256 i = 0; i < length; i++) {
-            if (loanId == pendingRequests[i]) {
-                pendingRequests[i] = pendingRequests[length - 1];
-                pendingRequests.pop();
-                break;
-            }
-        }
-
-        currentLoans.push(loanId);
-
-        //add the principal remaining and start the loan
-
-        loan.principalRemaining = loanSize;
-        loan.loanStartTime = block.timestamp;
-        accountsReceiveable += loanSize;
-        //send the funds and update accounts (minus 0.5% origination fee)
+        ILendingPool _lendingPool = lendingPool;
+        address _baseToken = baseToken;
 
-        _withdrawFromLendingPool(
-            _baseToken,
-            (loanSize * 199) / 200,
-            loan.borrower
+        uint256 loanSize = _approveLoan(
+            loanId,
+            requiredCollateralAmount,
+            _lendingPool,
+            _baseToken
         );
+        accountsReceiveable += loanSize;
         //send the 0.25% origination fee to treasury and agent
-        _withdrawFromLendingPool(_baseToken, loanSize / 400, treasury);
-        _withdrawFromLendingPool(
+        _lendingPool.withdraw(_baseToken, loanSize / 400, treasury);
+        _lendingPool.withdraw(
             _baseToken,
             loanSize / 400,
-            loanToAgent[loanId]
+            packedLoans[loanId].agent
         );
+    }
 
-        emit approvedLoan(loanId);
+    /**
+     * Approve a batch of pending loan requests, with the same checks and fees as approveLoan
+     * Origination fees are sent as one withdrawal to treasury, and one withdrawal
+     * per run of consecutive loans with the same agent
+     */
+    function approveLoans(
+        uint256[] calldata loanIds,
+        uint256[] calldata requiredCollateralAmounts
+    ) external operatorOnly {
+        if (loanIds.length != requiredCollateralAmounts.length) {
+            revert InvalidLoanInput();
+        }
+        if (getBNPLBalance(operator) < 0x13DA329B6336471800000) {
+            revert NodeInactive();
+        }
+        ILendingPool _lendingPool = lendingPool;
+        address _baseToken = baseToken;
+
+        uint256 totalLoanSize;
+        uint256 treasuryFees;
+        address agent;
+        uint256 agentFees;
+        for (uint256 i; i < loanIds.length; i++) {
+            uint256 loanSize = _approveLoan(
+                loanIds[i],
+                requiredCollateralAmounts[i],
+                _lendingPool,
+                _baseToken
+            );
+            totalLoanSize += loanSize;
+            treasuryFees += loanSize / 400;
+            //send the agent fees so far when the agent changes
+            address loanAgent = packedLoans[loanIds[i]].agent;
+            if (loanAgent != agent) {
+                if (agentFees > 0) {
+                    _lendingPool.withdraw(_baseToken, agentFees, agent);
+                }
+                agent = loanAgent;
+                agentFees = 0;
+            }
+            agentFees += loanSize / 400;
+        }
+        accountsReceiveable += totalLoanSize;
+        //send the 0.25% origination fees to treasury and the last agent
+        if (treasuryFees > 0) {
+            _lendingPool.withdraw(_baseToken, treasuryFees, treasury);
+            _lendingPool.withdraw(_baseToken, agentFees, agent);
+        }
     }
 
     /**
@@ -882,12 +957,26 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
 
     /**
      * Deposit token onto AAVE lending pool, receiving aTokens in return
+     * Keeps a standing max approval of the baseToken to the pool, only re-approved once used up
+     * Collateral tokens are approved for the exact amount, so no allowance is left over
      */
     function _depositToLendingPool(address tokenIn, uint256 amountIn) private {
-        address _lendingPool = address(_getLendingPool());
-        TransferHelper.safeApprove(tokenIn, _lendingPool, 0);
-        TransferHelper.safeApprove(tokenIn, _lendingPool, amountIn);
-        _getLendingPool().deposit(tokenIn, amountIn, address(this), 0);
+        ILendingPool _lendingPool = lendingPool;
+        if (tokenIn != baseToken) {
+            TransferHelper.safeApprove(tokenIn, address(_lendingPool), amountIn);
+        } else if (
+            IERC20(tokenIn).allowance(address(this), address(_lendingPool)) <
+            amountIn
+        ) {
+            //approve to 0 first for tokens such as USDT
+            TransferHelper.safeApprove(tokenIn, address(_lendingPool), 0);
+            TransferHelper.safeApprove(
+                tokenIn,
+                address(_lendingPool),
+                type(uint256).max
+            );
+        }
+        _lendingPool.deposit(tokenIn, amountIn, address(this), 0);
     }
 
     /**
@@ -898,27 +987,207 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
         uint256 amountOut,
         address to
     ) private nonZeroInput(amountOut) {
-        _getLendingPool().withdraw(tokenOut, amountOut, to);
+        lendingPool.withdraw(tokenOut, amountOut, to);
     }
 
     /**
-     * Get the latest AAVE Lending Pool contract
+     * Cache the latest AAVE Lending Pool contract and baseToken aToken
+     * Revokes the baseToken allowance of the previous pool if it changed
      */
-    function _getLendingPool() private view returns (ILendingPool) {
-        return ILendingPool(lendingPoolProvider.getLendingPool());
+    function _refreshProtocolAddresses() private {
+        ILendingPool _lendingPool = ILendingPool(
+            lendingPoolProvider.getLendingPool()
+        );
+        address oldLendingPool = address(lendingPool);
+        if (
+            oldLendingPool != address(0) &&
+            oldLendingPool != address(_lendingPool)
+        ) {
+            TransferHelper.safeApprove(baseToken, oldLendingPool, 0);
+        }
+        lendingPool = _lendingPool;
+        baseTokenAToken = _lendingPool.getReserveData(baseToken).aTokenAddress;
     }
 
     /**
      * Remove given loan from current loan list
      */
     function _removeCurrentLoan(uint256 loanId) private {
-        for (uint256 i = 0; i < currentLoans.length; i++) {
-            if (loanId == currentLoans[i]) {
-                currentLoans[i] = currentLoans[currentLoans.length - 1];
-                currentLoans.pop();
-                return;
+        _removeLoan(currentLoans, currentLoanIndex, loanId);
+    }
+
+    /**
+     * Append a loan to a loan list (pendingRequests or currentLoans) and save its position
+     */
+    function _addLoan(
+        uint256[] storage loans,
+        mapping(uint256 => uint256) storage loanIndex,
+        uint256 loanId
+    ) private {
+        loans.push(loanId);
+        loanIndex[loanId] = loans.length;
+    }
+
+    /**
+     * Remove a loan from a loan list in constant gas, by moving the last loan into its position
+     * Does nothing if the loan is not in the list
+     */
+    function _removeLoan(
+        uint256[] storage loans,
+        mapping(uint256 => uint256) storage loanIndex,
+        uint256 loanId
+    ) private {
+        uint256 index = loanIndex[loanId];
+        uint256 length = loans.length;
+        //positions are not reset by clearPendingLoans, so check the position still holds the loan
+        if (index == 0 || index > length || loans[index - 1] != loanId) {
+            return;
+        }
+        uint256 lastLoanId = loans[length - 1];
+        loans[index - 1] = lastLoanId;
+        loanIndex[lastLoanId] = index;
+        loans.pop();
+        delete loanIndex[loanId];
+    }
+
+    /**
+     * Update a loan for its next payment, removing it from current loans if final
+     * Returns the payment due, the amount to deposit to AAVE (payment minus 30% of the interest),
+     * and the principal repaid, the caller deducts it from accounts receiveable and collects the payment
+     */
+    function _makeLoanPayment(uint256 loanId)
+        private
+        ensurePrincipalRemaining(loanId)
+        ensureNotSlashed(loanId)
+        returns (
+            uint256 paymentAmount,
+            uint256 depositAmount,
+            uint256 principalPortion
+        )
+    {
+        Loan storage loan = packedLoans[loanId];
+        paymentAmount = getNextPayment(loanId);
+        uint256 interestPortion = (uint256(loan.principalRemaining) *
+            loan.interestRate) / 10000;
+        loan.paymentsMade++;
+        //reduce accounts receiveable and loan principal if principal + interest payment
+        bool finalPayment = loan.paymentsMade == loan.numberOfPayments;
+
+        if (!loan.interestOnly) {
+            principalPortion = paymentAmount - interestPortion;
+            uint256 _principalRemaining = loan.principalRemaining -
+                principalPortion;
+            loan.principalRemaining = uint96(_principalRemaining);
+            //a payment capped at the payoff is the final one, even before the last period
+            if (_principalRemaining == 0) {
+                loan.paymentsMade = loan.numberOfPayments;
+                finalPayment = true;
             }
+        } else {
+            //interest only, principal change only on final payment
+            if (finalPayment) {
+                principalPortion = loan.principalRemaining;
+                loan.principalRemaining = 0;
+            }
+        }
+        depositAmount = paymentAmount - ((interestPortion * 3) / 10);
+        //remove if final payment
+        if (finalPayment) {
+            _removeCurrentLoan(loanId);
         }
+
+        emit loanPaymentMade(loanId);
+    }
+
+    /**
+     * Start a pending loan and send the loan amount (minus 0.5% origination fee) to the borrower
+     * Returns the loan amount, the caller adds it to accounts receiveable and sends the fees
+     */
+    function _approveLoan(
+        uint256 loanId,
+        uint256 requiredCollateralAmount,
+        ILendingPool _lendingPool,
+        address _baseToken
+    ) private returns (uint256 loanSize) {
+        Loan storage loan = packedLoans[loanId];
+        loanSize = loan.loanAmount;
+
+        //ensure the loan was never started and collateral enough
+        if (loan.loanStartTime > 0) {
+            revert LoanAlreadyStarted();
+        }
+        if (loan.collateralAmount < requiredCollateralAmount) {
+            revert InsufficientCollateral();
+        }
+
+        //remove from loanRequests and add loan to current loans
+        _removeLoan(pendingRequests, pendingRequestIndex, loanId);
+        _addLoan(currentLoans, currentLoanIndex, loanId);
+
+        //add the principal remaining and start the loan
+        uint256 paymentAmount = _getPaymentAmount(
+            loanSize,
+            loan.interestRate,
+            loan.numberOfPayments,
+            loan.interestOnly
+        );
+        if (paymentAmount > type(uint96).max) {
+            revert InvalidLoanInput();
+        }
+        loan.principalRemaining = uint96(loanSize);
+        loan.loanStartTime = uint40(block.timestamp);
+        loan.paymentAmount = uint96(paymentAmount);
+        //send the funds (minus 0.5% origination fee)
+        _lendingPool.withdraw(_baseToken, (loanSize * 199) / 200, loan.borrower);
+
+        emit approvedLoan(loanId);
+    }
+
+    /**
+     * Get the periodic payment of a loan, calculated once on approval
+     * Principal + interest payments are given by the formula:
+     * p : principal
+     * i : interest rate per period
+     * d : duration
+     * p * i / (1 - (1+i) ** -d)
+     * (1+i) ** -d is calculated in ray (27 decimals) and is always <= 1, so it can not overflow
+     */
+    function _getPaymentAmount(
+        uint256 loanAmount,
+        uint256 interestRate,
+        uint256 numberOfPayments,
+        bool interestOnly
+    ) private pure returns (uint256) {
+        if (interestOnly) {
+            return (loanAmount * interestRate) / 10000;
+        }
+        //1 / (1+i) rounded half up
+        uint256 discount = (RAY * 10000 + (10000 + interestRate) / 2) /
+            (10000 + interestRate);
+        //safe div: interestRate > 0 => (1+i) ** -d < 1
+        return
+            (loanAmount * interestRate * RAY) /
+            ((RAY - _rayPow(discount, numberOfPayments)) * 10000);
+    }
+
+    /**
+     * Raise a ray to an integer power, by squaring
+     */
+    function _rayPow(uint256 x, uint256 n) private pure returns (uint256 z) {
+        z = n % 2 != 0 ? x : RAY;
+        for (n /= 2; n != 0; n /= 2) {
+            x = _rayMul(x, x);
+            if (n % 2 != 0) {
+                z = _rayMul(z, x);
+            }
+        }
+    }
+
+    /**
+     * Multiply two rays, rounding half up
+     */
+    function _rayMul(uint256 a, uint256 b) private pure returns (uint256) {
+        return (a * b + RAY / 2) / RAY;
     }
 
     /**
@@ -1003,6 +1272,71 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
 
     //VIEW ONLY FUNCTIONS
 
+    /**
+     * ERC20 name and symbol are constant, as the ERC20 constructor does not run for clones
+     */
+    function name() public pure override returns (string memory) {
+        return "BNPL USD";
+    }
+
+    function symbol() public pure override returns (string memory) {
+        return "pUSD";
+    }
+
+    /**
+     * Get a loan, in the same shape as the Loan struct before it was packed
+     */
+    function idToLoan(uint256 loanId)
+        external
+        view
+        returns (
+            address borrower,
+            bool interestOnly,
+            uint256 loanStartTime,
+            uint256 loanAmount,
+            uint256 paymentInterval,
+            uint256 interestRate,
+            uint256 numberOfPayments,
+            uint256 principalRemaining,
+            uint256 paymentsMade,
+            address collateral,
+            uint256 collateralAmount,
+            bool isSlashed
+        )
+    {
+        Loan storage loan = packedLoans[loanId];
+        borrower = loan.borrower;
+        interestOnly = loan.interestOnly;
+        loanStartTime = loan.loanStartTime;
+        loanAmount = loan.loanAmount;
+        paymentInterval = loan.paymentInterval;
+        interestRate = loan.interestRate;
+        numberOfPayments = loan.numberOfPayments;
+        principalRemaining = loan.principalRemaining;
+        paymentsMade = loan.paymentsMade;
+        collateral = loan.collateral;
+        collateralAmount = loan.collateralAmount;
+        isSlashed = loan.isSlashed;
+    }
+
+    /**
+     * Get the periodic payment of a loan, saved on approval (0 for pending requests)
+     */
+    function getLoanPaymentAmount(uint256 loanId)
+        external
+        view
+        returns (uint256)
+    {
+        return packedLoans[loanId].paymentAmount;
+    }
+
+    /**
+     * Get the agent of a loan
+     */
+    function loanToAgent(uint256 loanId) external view returns (address) {
+        return packedLoans[loanId].agent;
+    }
+
     /**
      * Get the total BNPL in the staking account
      * Given by (total BNPL of node) - (unbonding balance) - (slashing balance)
@@ -1058,36 +1392,22 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
      */
     function getNextPayment(uint256 loanId) public view returns (uint256) {
         //if loan is completed or not approved, return 0
-        Loan storage loan = idToLoan[loanId];
-        if (loan.principalRemaining == 0) {
+        Loan storage loan = packedLoans[loanId];
+        uint256 _principalRemaining = loan.principalRemaining;
+        if (_principalRemaining == 0) {
             return 0;
         }
-        uint256 _interestRate = loan.interestRate;
-        uint256 _loanAmount = loan.loanAmount;
-        uint256 _numberOfPayments = loan.numberOfPayments;
-        //check if it is an interest only loan
-        if (loan.interestOnly) {
-            //check if its the final payment
-            if (loan.paymentsMade + 1 == _numberOfPayments) {
-                //if final payment, then principal + final interest amount
-                return _loanAmount + ((_loanAmount * _interestRate) / 10000);
-            } else {
-                //if not final payment, simple interest amount
-                return (_loanAmount * _interestRate) / 10000;
-            }
-        } else {
-            //principal + interest payments, payment given by the formula:
-            //p : principal
-            //i : interest rate per period
-            //d : duration
-            // p * (i * (1+i) ** d) / ((1+i) ** d - 1)
-            uint256 numerator = _loanAmount *
-                _interestRate *
-                (10000 + _interestRate)**_numberOfPayments;
-            uint256 denominator = (10000 + _interestRate)**_numberOfPayments -
-                (10**(4 * _numberOfPayments));
-            return numerator / (denominator * 10000);
+        uint256 payoff = _principalRemaining +
+            ((_principalRemaining * loan.interestRate) / 10000);
+        //if final payment, then principal + final interest amount
+        //(for principal + interest loans this also clears any rounding left in the principal)
+        if (uint256(loan.paymentsMade) + 1 == loan.numberOfPayments) {
+            return payoff;
         }
+        //otherwise the payment calculated on approval, capped at the payoff:
+        //on long schedules rounding can pay off the principal before the last payment
+        uint256 _paymentAmount = loan.paymentAmount;
+        return _paymentAmount < payoff ? _paymentAmount : payoff;
     }
 
     /**
@@ -1096,13 +1416,13 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
      */
     function getNextDueDate(uint256 loanId) public view returns (uint256) {
         //check that the loan has been approved and loan is not completed;
-        Loan storage loan = idToLoan[loanId];
+        Loan storage loan = packedLoans[loanId];
         if (loan.principalRemaining == 0) {
             return 0;
         }
         return
             loan.loanStartTime +
-            ((loan.paymentsMade + 1) * loan.paymentInterval);
+            ((uint256(loan.paymentsMade) + 1) * loan.paymentInterval);
     }
 
     /**
@@ -1111,8 +1431,8 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
      */
     function getTotalAssetValue() public view returns (uint256) {
         return
-            IERC20(_getLendingPool().getReserveData(baseToken).aTokenAddress)
-                .balanceOf(address(this)) + accountsReceiveable;
+            IERC20(baseTokenAToken).balanceOf(address(this)) +
+            accountsReceiveable;
     }
 
     /**
@@ -1131,13 +1451,102 @@ contract BankingNode is ERC20("BNPL USD", "pUSD") {
 
     /**
      * Get the total Losses occurred
+     * Given by the sum of principal remaining on each loan at the time it was slashed
      */
     function getTotalDefaultLoss() external view returns (uint256) {
-        uint256 totalLosses = 0;
-        for (uint256 i; i < defaultedLoanCount; i++) {
-            Loan storage loan = idToLoan[defaultedLoans[i]];
-            totalLosses += loan.principalRemaining;
+        return totalDefaultLoss;
+    }
+
+    /**
+     * Get a page of defaulted loans, in the order they were slashed
+     * Returns the loan ids and the principal remaining of each loan
+     */
+    function getDefaultedLoans(uint256 offset, uint256 limit)
+        external
+        view
+        returns (uint256[] memory loanIds, uint256[] memory principalRemaining)
+    {
+        uint256 _defaultedLoanCount = defaultedLoanCount;
+        if (offset >= _defaultedLoanCount) {
+            return (new uint256[](0), new uint256[](0));
+        }
+        uint256 length = _defaultedLoanCount - offset;
+        if (limit < length) {
+            length = limit;
+        }
+        loanIds = new uint256[](length);
+        principalRemaining = new uint256[](length);
+        for (uint256 i; i < length; i++) {
+            uint256 loanId = defaultedLoans[offset + i];
+            loanIds[i] = loanId;
+            principalRemaining[i] = packedLoans[loanId].principalRemaining;
+        }
+    }
+
+    /**
+     * Get a page of pending requests, with the loan, next payment and next due date of each
+     */
+    function getPendingRequests(uint256 offset, uint256 limit)
+        external
+        view
+        returns (
+            uint256[] memory loanIds,
+            Loan[] memory loans,
+            uint256[] memory nextPayments,
+            uint256[] memory nextDueDates
+        )
+    {
+        return _getLoans(pendingRequests, offset, limit);
+    }
+
+    /**
+     * Get a page of current loans, with the loan, next payment and next due date of each
+     */
+    function getCurrentLoans(uint256 offset, uint256 limit)
+        external
+        view
+        returns (
+            uint256[] memory loanIds,
+            Loan[] memory loans,
+            uint256[] memory nextPayments,
+            uint256[] memory nextDueDates
+        )
+    {
+        return _getLoans(currentLoans, offset, limit);
+    }
+
+    /**
+     * Get up to limit loans of a list of loan ids, starting at offset
+     */
+    function _getLoans(
+        uint256[] storage list,
+        uint256 offset,
+        uint256 limit
+    )
+        private
+        view
+        returns (
+            uint256[] memory loanIds,
+            Loan[] memory loans,
+            uint256[] memory nextPayments,
+            uint256[] memory nextDueDates
+        )
+    {
+        uint256 length = list.length;
+        length = offset < length ? length - offset : 0;
+        if (limit < length) {
+            length = limit;
+        }
+        loanIds = new uint256[](length);
+        loans = new Loan[](length);
+        nextPayments = new uint256[](length);
+        nextDueDates = new uint256[](length);
+        for (uint256 i; i < length; i++) {
+            uint256 loanId = list[offset + i];
+            loanIds[i] = loanId;
+            loans[i] = packedLoans[loanId];
+            nextPayments[i] = getNextPayment(loanId);
+            nextDueDates[i] = getNextDueDate(loanId);
         }
-        return totalLosses;
     }
 }
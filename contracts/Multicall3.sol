@@ -0,0 +1,43 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+/**
+ * Aggregates several calls into one, with the same aggregate3 interface as Multicall3
+ * Multicall3 is deployed at 0xcA11bde05977b3631167028862bE2a173976CA11 on most networks,
+ * this is only deployed by scripts/multicall.py where it is not
+ */
+contract Multicall3 {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /**
+     * Call every target in order, reverts if a call that does not allow failure reverts
+     */
+    function aggregate3(Call3[] calldata calls)
+        external
+        payable
+        returns (Result[] memory returnData)
+    {
+        uint256 length = calls.length;
+        returnData = new Result[](length);
+        for (uint256 i = 0; i < length; i++) {
+            Call3 calldata _call = calls[i];
+            Result memory result = returnData[i];
+            (result.success, result.returnData) = _call.target.call(
+                _call.callData
+            );
+            require(
+                _call.allowFailure || result.success,
+                "Multicall3: call failed"
+            );
+        }
+    }
+}
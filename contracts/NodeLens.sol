@@ -0,0 +1,127 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "./BankingNode.sol";
+
+/**
+ * Read only view over a BankingNode, returns a full snapshot of the node in one call
+ * Holds no state and has no constructor, so it does not need to be deployed:
+ * its runtime bytecode can be placed at any address with an eth_call state override
+ */
+contract NodeLens {
+    //same layout as the BankingNode.idToLoan getter
+    struct LoanTerms {
+        address borrower;
+        bool interestOnly;
+        uint256 loanStartTime;
+        uint256 loanAmount;
+        uint256 paymentInterval;
+        uint256 interestRate;
+        uint256 numberOfPayments;
+        uint256 principalRemaining;
+        uint256 paymentsMade;
+        address collateral;
+        uint256 collateralAmount;
+        bool isSlashed;
+    }
+
+    struct LoanSnapshot {
+        uint256 loanId;
+        LoanTerms terms;
+        address agent;
+        uint256 paymentAmount;
+        uint256 nextPayment;
+        uint256 nextDueDate;
+    }
+
+    struct NodeSnapshot {
+        address node;
+        address operator;
+        address baseToken;
+        uint256 gracePeriod;
+        bool requireKYC;
+        uint256 timeCreated;
+        uint256 totalSupply;
+        uint256 totalAssetValue;
+        uint256 accountsReceiveable;
+        uint256 stakedBNPL;
+        uint256 totalStakingShares;
+        uint256 unbondingAmount;
+        uint256 slashingBalance;
+        uint256 defaultedLoanCount;
+        uint256 totalDefaultLoss;
+        uint256[] pendingRequests;
+        LoanSnapshot[] currentLoans;
+        uint256 blockNumber;
+        uint256 timestamp;
+    }
+
+    /**
+     * Get the snapshot of a node, including every pending request id and every current loan
+     */
+    function getNodeSnapshot(BankingNode node)
+        external
+        view
+        returns (NodeSnapshot memory snapshot)
+    {
+        snapshot.node = address(node);
+        snapshot.operator = node.operator();
+        snapshot.baseToken = node.baseToken();
+        snapshot.gracePeriod = node.gracePeriod();
+        snapshot.requireKYC = node.requireKYC();
+        snapshot.timeCreated = node.timeCreated();
+        snapshot.totalSupply = node.totalSupply();
+        snapshot.totalAssetValue = node.getTotalAssetValue();
+        snapshot.accountsReceiveable = node.accountsReceiveable();
+        snapshot.stakedBNPL = node.getStakedBNPL();
+        snapshot.totalStakingShares = node.totalStakingShares();
+        snapshot.unbondingAmount = node.unbondingAmount();
+        snapshot.slashingBalance = node.slashingBalance();
+        snapshot.defaultedLoanCount = node.defaultedLoanCount();
+        snapshot.totalDefaultLoss = node.getTotalDefaultLoss();
+
+        uint256 length = node.getPendingRequestCount();
+        snapshot.pendingRequests = new uint256[](length);
+        for (uint256 i; i < length; i++) {
+            snapshot.pendingRequests[i] = node.pendingRequests(i);
+        }
+
+        length = node.getCurrentLoansCount();
+        snapshot.currentLoans = new LoanSnapshot[](length);
+        for (uint256 i; i < length; i++) {
+            snapshot.currentLoans[i] = getLoanSnapshot(
+                node,
+                node.currentLoans(i)
+            );
+        }
+
+        snapshot.blockNumber = block.number;
+        snapshot.timestamp = block.timestamp;
+    }
+
+    /**
+     * Get the terms, agent, periodic payment, next payment and next due date of a single loan
+     */
+    function getLoanSnapshot(BankingNode node, uint256 loanId)
+        public
+        view
+        returns (LoanSnapshot memory loan)
+    {
+        loan.loanId = loanId;
+        //decoded straight into memory, unpacking all 12 return values would be stack too deep
+        (bool success, bytes memory terms) = address(node).staticcall(
+            abi.encodeWithSelector(node.idToLoan.selector, loanId)
+        );
+        if (!success) {
+            //bubble up the revert of the node
+            assembly {
+                revert(add(terms, 32), mload(terms))
+            }
+        }
+        loan.terms = abi.decode(terms, (LoanTerms));
+        loan.agent = node.loanToAgent(loanId);
+        loan.paymentAmount = node.getLoanPaymentAmount(loanId);
+        loan.nextPayment = node.getNextPayment(loanId);
+        loan.nextDueDate = node.getNextDueDate(loanId);
+    }
+}
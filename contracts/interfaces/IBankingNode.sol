@@ -51,6 +51,8 @@ interface IBankingNode {
 
     function makeLoanPayment(uint256 loanId) external;
 
+    function makeLoanPayments(uint256[] calldata loanIds) external;
+
     function repayEarly(uint256 loanId) external;
 
     function collectFees() external;
@@ -71,11 +73,18 @@ interface IBankingNode {
 
     function donateBaseToken(uint256 _amount) external;
 
+    function refreshProtocolAddresses() external;
+
     //Operator only functions
 
     function approveLoan(uint256 loanId, uint256 requiredCollateralAmount)
         external;
 
+    function approveLoans(
+        uint256[] calldata loanIds,
+        uint256[] calldata requiredCollateralAmounts
+    ) external;
+
     function clearPendingLoans() external;
 
     function whitelistAddresses(address whitelistAddition) external;
@@ -101,4 +110,11 @@ interface IBankingNode {
     function getCurrentLoansCount() external view returns (uint256);
 
     function getDefaultedLoansCount() external view returns (uint256);
+
+    function getTotalDefaultLoss() external view returns (uint256);
+
+    function getDefaultedLoans(uint256 offset, uint256 limit)
+        external
+        view
+        returns (uint256[] memory loanIds, uint256[] memory principalRemaining);
 }
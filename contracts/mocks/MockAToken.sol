@@ -0,0 +1,83 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import "./MockLendingPool.sol";
+
+/**
+ * Interest bearing aToken of the MockLendingPool
+ * Balances are stored scaled by the reserve liquidity index, so they grow as the pool accrues interest
+ * Only the balance functions used by BankingNode are implemented, aTokens are not transferable
+ */
+contract MockAToken {
+    MockLendingPool public immutable pool;
+    address public immutable UNDERLYING_ASSET_ADDRESS;
+    uint8 public immutable decimals;
+
+    mapping(address => uint256) public scaledBalanceOf;
+    uint256 public scaledTotalSupply;
+
+    constructor(address _underlyingAsset, uint8 _decimals) {
+        pool = MockLendingPool(msg.sender);
+        UNDERLYING_ASSET_ADDRESS = _underlyingAsset;
+        decimals = _decimals;
+    }
+
+    modifier onlyPool() {
+        require(msg.sender == address(pool));
+        _;
+    }
+
+    /**
+     * Mint aTokens worth amount of underlying at the given liquidity index
+     */
+    function mint(
+        address user,
+        uint256 amount,
+        uint256 index
+    ) external onlyPool {
+        uint256 scaledAmount = _rayDiv(amount, index);
+        require(scaledAmount != 0);
+        scaledBalanceOf[user] += scaledAmount;
+        scaledTotalSupply += scaledAmount;
+    }
+
+    /**
+     * Burn aTokens worth amount of underlying at the given liquidity index
+     */
+    function burn(
+        address user,
+        uint256 amount,
+        uint256 index
+    ) external onlyPool {
+        uint256 scaledAmount = _rayDiv(amount, index);
+        require(scaledAmount != 0);
+        scaledBalanceOf[user] -= scaledAmount;
+        scaledTotalSupply -= scaledAmount;
+    }
+
+    function balanceOf(address user) public view returns (uint256) {
+        return
+            _rayMul(
+                scaledBalanceOf[user],
+                pool.getReserveNormalizedIncome(UNDERLYING_ASSET_ADDRESS)
+            );
+    }
+
+    function totalSupply() external view returns (uint256) {
+        return
+            _rayMul(
+                scaledTotalSupply,
+                pool.getReserveNormalizedIncome(UNDERLYING_ASSET_ADDRESS)
+            );
+    }
+
+    //half up rounding, same as aave WadRayMath
+    function _rayMul(uint256 a, uint256 b) private pure returns (uint256) {
+        return (a * b + 5e26) / 1e27;
+    }
+
+    function _rayDiv(uint256 a, uint256 b) private pure returns (uint256) {
+        return (a * 1e27 + b / 2) / b;
+    }
+}
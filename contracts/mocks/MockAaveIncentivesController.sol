@@ -0,0 +1,61 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import "../libraries/TransferHelper.sol";
+
+/**
+ * Local stand-in for the AAVE incentives controller
+ * Unclaimed rewards are set directly instead of accruing from emissions,
+ * the reward tokens must be sent to this contract before they are claimed
+ */
+contract MockAaveIncentivesController {
+    address public immutable REWARD_TOKEN;
+    mapping(address => uint256) private unclaimedRewards;
+
+    event RewardsClaimed(
+        address indexed user,
+        address indexed to,
+        address indexed claimer,
+        uint256 amount
+    );
+
+    constructor(address _rewardToken) {
+        REWARD_TOKEN = _rewardToken;
+    }
+
+    function setUserUnclaimedRewards(address user, uint256 amount) external {
+        unclaimedRewards[user] = amount;
+    }
+
+    function getUserUnclaimedRewards(address user)
+        external
+        view
+        returns (uint256)
+    {
+        return unclaimedRewards[user];
+    }
+
+    function getRewardsBalance(address[] calldata, address user)
+        external
+        view
+        returns (uint256)
+    {
+        return unclaimedRewards[user];
+    }
+
+    function claimRewards(
+        address[] calldata,
+        uint256 amount,
+        address to
+    ) external returns (uint256) {
+        uint256 unclaimed = unclaimedRewards[msg.sender];
+        if (amount > unclaimed) {
+            amount = unclaimed;
+        }
+        unclaimedRewards[msg.sender] = unclaimed - amount;
+        TransferHelper.safeTransfer(REWARD_TOKEN, to, amount);
+        emit RewardsClaimed(msg.sender, to, msg.sender, amount);
+        return amount;
+    }
+}
@@ -0,0 +1,31 @@
+// SPDX-License-Identifier: MIT
+
+// NOTE: Local stand-in for the base, collateral and reward tokens used on the
+// development network. Anyone can mint, so never deploy this to a live network.
+
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+contract MockERC20 is ERC20 {
+    uint8 private immutable _decimals;
+
+    constructor(
+        string memory name_,
+        string memory symbol_,
+        uint8 decimals_
+    ) ERC20(name_, symbol_) {
+        _decimals = decimals_;
+    }
+
+    /**
+     * Mint tokens to any address, used to fund test accounts
+     */
+    function mint(address to, uint256 amount) external {
+        _mint(to, amount);
+    }
+
+    function decimals() public view override returns (uint8) {
+        return _decimals;
+    }
+}
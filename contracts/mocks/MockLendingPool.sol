@@ -0,0 +1,147 @@
+// SPDX-License-Identifier: MIT
+
+// NOTE: Local stand-in for the AAVE v2 LendingPool. Implements only the functions
+// BankingNode uses (deposit, withdraw, getReserveData) with the same signatures.
+
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "../libraries/DataTypes.sol";
+import "../libraries/TransferHelper.sol";
+import "./MockAToken.sol";
+import "./MockERC20.sol";
+
+contract MockLendingPool {
+    struct Reserve {
+        MockAToken aToken;
+        uint256 liquidityIndex; //ray, index at lastUpdateTimestamp
+        uint256 liquidityRate; //ray, yearly rate, accrued linearly like aave deposits
+        uint256 lastUpdateTimestamp;
+    }
+
+    mapping(address => Reserve) public reserves;
+    address[] public reservesList;
+
+    event Deposit(
+        address indexed reserve,
+        address user,
+        address indexed onBehalfOf,
+        uint256 amount
+    );
+    event Withdraw(
+        address indexed reserve,
+        address indexed user,
+        address indexed to,
+        uint256 amount
+    );
+
+    /**
+     * List a new reserve, deploying its aToken
+     * liquidityRate is the yearly deposit rate in ray (e.g. 2% = 0.02e27)
+     */
+    function initReserve(address asset, uint256 liquidityRate)
+        external
+        returns (address aToken)
+    {
+        Reserve storage reserve = reserves[asset];
+        require(address(reserve.aToken) == address(0));
+        reserve.aToken = new MockAToken(asset, ERC20(asset).decimals());
+        reserve.liquidityIndex = 1e27;
+        reserve.liquidityRate = liquidityRate;
+        reserve.lastUpdateTimestamp = block.timestamp;
+        reservesList.push(asset);
+        aToken = address(reserve.aToken);
+    }
+
+    /**
+     * Change the yearly deposit rate of a reserve, interest up to now is accrued at the old rate
+     */
+    function setLiquidityRate(address asset, uint256 liquidityRate) external {
+        Reserve storage reserve = _updateIndex(asset);
+        reserve.liquidityRate = liquidityRate;
+    }
+
+    function deposit(
+        address asset,
+        uint256 amount,
+        address onBehalfOf,
+        uint16
+    ) external {
+        Reserve storage reserve = _updateIndex(asset);
+        TransferHelper.safeTransferFrom(
+            asset,
+            msg.sender,
+            address(this),
+            amount
+        );
+        reserve.aToken.mint(onBehalfOf, amount, reserve.liquidityIndex);
+        emit Deposit(asset, msg.sender, onBehalfOf, amount);
+    }
+
+    function withdraw(
+        address asset,
+        uint256 amount,
+        address to
+    ) external returns (uint256) {
+        Reserve storage reserve = _updateIndex(asset);
+        if (amount == type(uint256).max) {
+            amount = reserve.aToken.balanceOf(msg.sender);
+        }
+        reserve.aToken.burn(msg.sender, amount, reserve.liquidityIndex);
+        //accrued interest is not backed by borrowers here, mint it on demand
+        uint256 available = ERC20(asset).balanceOf(address(this));
+        if (available < amount) {
+            MockERC20(asset).mint(address(this), amount - available);
+        }
+        TransferHelper.safeTransfer(asset, to, amount);
+        emit Withdraw(asset, msg.sender, to, amount);
+        return amount;
+    }
+
+    function getReserveData(address asset)
+        external
+        view
+        returns (DataTypes.ReserveData memory data)
+    {
+        Reserve storage reserve = reserves[asset];
+        data.liquidityIndex = uint128(reserve.liquidityIndex);
+        data.currentLiquidityRate = uint128(reserve.liquidityRate);
+        data.lastUpdateTimestamp = uint40(reserve.lastUpdateTimestamp);
+        data.aTokenAddress = address(reserve.aToken);
+    }
+
+    /**
+     * Current liquidity index of a reserve (ray), including interest not yet written to storage
+     */
+    function getReserveNormalizedIncome(address asset)
+        public
+        view
+        returns (uint256)
+    {
+        Reserve storage reserve = reserves[asset];
+        uint256 timeDelta = block.timestamp - reserve.lastUpdateTimestamp;
+        if (timeDelta == 0) {
+            return reserve.liquidityIndex;
+        }
+        //linear interest: index * (1 + rate * timeDelta / 1 year)
+        uint256 linearInterest = 1e27 +
+            (reserve.liquidityRate * timeDelta) /
+            365 days;
+        return (reserve.liquidityIndex * linearInterest + 5e26) / 1e27;
+    }
+
+    function getReservesList() external view returns (address[] memory) {
+        return reservesList;
+    }
+
+    function _updateIndex(address asset)
+        private
+        returns (Reserve storage reserve)
+    {
+        reserve = reserves[asset];
+        //same as aave, deposits to a reserve that is not listed revert
+        require(address(reserve.aToken) != address(0), "reserve not listed");
+        reserve.liquidityIndex = getReserveNormalizedIncome(asset);
+        reserve.lastUpdateTimestamp = block.timestamp;
+    }
+}
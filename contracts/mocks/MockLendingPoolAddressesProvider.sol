@@ -0,0 +1,26 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+/**
+ * Local stand-in for the AAVE LendingPoolAddressesProvider
+ * The lending pool can be swapped to test nodes against an AAVE upgrade
+ */
+contract MockLendingPoolAddressesProvider {
+    address private lendingPool;
+
+    event LendingPoolUpdated(address indexed newAddress);
+
+    constructor(address _lendingPool) {
+        lendingPool = _lendingPool;
+    }
+
+    function getLendingPool() external view returns (address) {
+        return lendingPool;
+    }
+
+    function setLendingPoolImpl(address pool) external {
+        lendingPool = pool;
+        emit LendingPoolUpdated(pool);
+    }
+}
@@ -0,0 +1,43 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import "./MockUniswapV2Pair.sol";
+
+/**
+ * Local stand-in for the Sushiswap factory
+ * BankingNode only uses the factory address to compute pair addresses, pairs are
+ * registered here after being placed so scripts can look them up with getPair
+ */
+contract MockUniswapV2Factory {
+    mapping(address => mapping(address => address)) public getPair;
+    address[] public allPairs;
+
+    event PairCreated(
+        address indexed token0,
+        address indexed token1,
+        address pair,
+        uint256
+    );
+
+    function registerPair(address pair) external {
+        address token0 = MockUniswapV2Pair(pair).token0();
+        address token1 = MockUniswapV2Pair(pair).token1();
+        require(
+            MockUniswapV2Pair(pair).factory() == address(this),
+            "UniswapV2: FORBIDDEN"
+        );
+        require(
+            getPair[token0][token1] == address(0),
+            "UniswapV2: PAIR_EXISTS"
+        );
+        getPair[token0][token1] = pair;
+        getPair[token1][token0] = pair;
+        allPairs.push(pair);
+        emit PairCreated(token0, token1, pair, allPairs.length);
+    }
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+}
@@ -0,0 +1,132 @@
+// SPDX-License-Identifier: MIT
+
+// NOTE: BankingNode finds pairs with UniswapV2Library.pairFor, which hardcodes the
+// Sushiswap init code hash. On the development network this contract's runtime code
+// is placed at the address pairFor computes (see scripts/deploy_helpers.deploy_mock_pair)
+// and then initialized, instead of being deployed through the factory.
+
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "../libraries/TransferHelper.sol";
+
+/**
+ * Local stand-in for a Sushiswap (UniswapV2) pair
+ * Keeps the UniswapV2Pair getReserves/swap math, including the 0.3% fee and K check
+ * Liquidity is added by transferring tokens to the pair and calling sync(), no LP tokens
+ */
+contract MockUniswapV2Pair {
+    address public factory;
+    address public token0;
+    address public token1;
+
+    uint112 private reserve0;
+    uint112 private reserve1;
+    uint32 private blockTimestampLast;
+
+    event Swap(
+        address indexed sender,
+        uint256 amount0In,
+        uint256 amount1In,
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address indexed to
+    );
+    event Sync(uint112 reserve0, uint112 reserve1);
+
+    /**
+     * Called once after the code is placed, tokens must be sorted
+     */
+    function initialize(
+        address _factory,
+        address _token0,
+        address _token1
+    ) external {
+        require(token0 == address(0), "UniswapV2: FORBIDDEN");
+        require(_token0 < _token1, "UniswapV2: UNSORTED");
+        factory = _factory;
+        token0 = _token0;
+        token1 = _token1;
+    }
+
+    function getReserves()
+        public
+        view
+        returns (
+            uint112 _reserve0,
+            uint112 _reserve1,
+            uint32 _blockTimestampLast
+        )
+    {
+        _reserve0 = reserve0;
+        _reserve1 = reserve1;
+        _blockTimestampLast = blockTimestampLast;
+    }
+
+    function swap(
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address to,
+        bytes calldata
+    ) external {
+        require(
+            amount0Out > 0 || amount1Out > 0,
+            "UniswapV2: INSUFFICIENT_OUTPUT_AMOUNT"
+        );
+        (uint112 _reserve0, uint112 _reserve1, ) = getReserves();
+        require(
+            amount0Out < _reserve0 && amount1Out < _reserve1,
+            "UniswapV2: INSUFFICIENT_LIQUIDITY"
+        );
+        address _token0 = token0;
+        address _token1 = token1;
+        require(to != _token0 && to != _token1, "UniswapV2: INVALID_TO");
+        //optimistically transfer tokens
+        if (amount0Out > 0) TransferHelper.safeTransfer(_token0, to, amount0Out);
+        if (amount1Out > 0) TransferHelper.safeTransfer(_token1, to, amount1Out);
+        uint256 balance0 = IERC20(_token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(_token1).balanceOf(address(this));
+
+        uint256 amount0In = balance0 > _reserve0 - amount0Out
+            ? balance0 - (_reserve0 - amount0Out)
+            : 0;
+        uint256 amount1In = balance1 > _reserve1 - amount1Out
+            ? balance1 - (_reserve1 - amount1Out)
+            : 0;
+        require(
+            amount0In > 0 || amount1In > 0,
+            "UniswapV2: INSUFFICIENT_INPUT_AMOUNT"
+        );
+        //K check with the 0.3% fee taken from the input amounts
+        uint256 balance0Adjusted = balance0 * 1000 - amount0In * 3;
+        uint256 balance1Adjusted = balance1 * 1000 - amount1In * 3;
+        require(
+            balance0Adjusted * balance1Adjusted >=
+                uint256(_reserve0) * _reserve1 * 1000**2,
+            "UniswapV2: K"
+        );
+        _update(balance0, balance1);
+        emit Swap(msg.sender, amount0In, amount1In, amount0Out, amount1Out, to);
+    }
+
+    /**
+     * Force reserves to match balances, used to add liquidity
+     */
+    function sync() external {
+        _update(
+            IERC20(token0).balanceOf(address(this)),
+            IERC20(token1).balanceOf(address(this))
+        );
+    }
+
+    function _update(uint256 balance0, uint256 balance1) private {
+        require(
+            balance0 <= type(uint112).max && balance1 <= type(uint112).max,
+            "UniswapV2: OVERFLOW"
+        );
+        reserve0 = uint112(balance0);
+        reserve1 = uint112(balance1);
+        blockTimestampLast = uint32(block.timestamp);
+        emit Sync(reserve0, reserve1);
+    }
+}
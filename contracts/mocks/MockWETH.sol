@@ -0,0 +1,19 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import "./MockERC20.sol";
+
+/**
+ * Local stand-in for WETH9, keeps the deposit/withdraw interface used by scripts/helper.get_weth
+ */
+contract MockWETH is MockERC20("Wrapped Ether", "WETH", 18) {
+    function deposit() external payable {
+        _mint(msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 amount) external {
+        _burn(msg.sender, amount);
+        payable(msg.sender).transfer(amount);
+    }
+}
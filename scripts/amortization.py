@@ -0,0 +1,202 @@
+"""
+Off-chain repayment schedules, matching BankingNode wei for wei
+
+Mirrors the integer maths of BankingNode._getPaymentAmount (the periodic payment saved
+on approval), getNextPayment, getNextDueDate and makeLoanPayment, including their
+rounding and where they revert.
+
+The (1+i) ** -d term of the payment formula only depends on the rate and the number of
+payments, so it is computed once per (rate, n) and shared by every loan with the same
+terms. A schedule is then a single multiplication per loan plus one step per period.
+
+    from scripts.amortization import schedule, schedules
+    schedule(100 * 10**6, 83, 12).periods[0].payment
+    schedules(get_node_snapshot(node).current_loans)
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+MAX_UINT256 = 2**256 - 1
+MAX_UINT96 = 2**96 - 1  # Loan.paymentAmount
+RAY = 10**27
+
+
+@dataclass(frozen=True)
+class Period:
+    payment_number: int  # 1 for the first payment
+    due_date: int
+    payment: int
+    interest: int
+    principal: int
+    principal_remaining: int  # after this payment
+
+
+@dataclass(frozen=True)
+class Schedule:
+    periods: List[Period]
+    # payment number at which makeLoanPayment reverts, the schedule stops before it
+    reverts_at: Optional[int] = None
+
+    @property
+    def total_paid(self):
+        return sum(period.payment for period in self.periods)
+
+    @property
+    def total_interest(self):
+        return sum(period.interest for period in self.periods)
+
+
+def _ray_mul(a, b):
+    return (a * b + RAY // 2) // RAY
+
+
+@lru_cache(maxsize=None)
+def _discount_factor(interest_rate, number_of_payments):
+    """
+    (1+i) ** -d in ray, calculated by squaring like BankingNode._rayPow
+    """
+    x = (RAY * 10000 + (10000 + interest_rate) // 2) // (10000 + interest_rate)
+    n = number_of_payments
+    z = x if n % 2 else RAY
+    n //= 2
+    while n:
+        x = _ray_mul(x, x)
+        if n % 2:
+            z = _ray_mul(z, x)
+        n //= 2
+    return z
+
+
+def payment_amount(loan_amount, interest_rate, number_of_payments, interest_only=False):
+    """
+    Same as BankingNode._getPaymentAmount, the periodic payment saved on approval
+    Returns None where the contract reverts
+    """
+    if interest_only:
+        interest = loan_amount * interest_rate
+        return None if interest > MAX_UINT256 else interest // 10000
+    numerator = loan_amount * interest_rate * RAY
+    if numerator > MAX_UINT256:
+        return None
+    denominator = RAY - _discount_factor(interest_rate, number_of_payments)
+    return numerator // (denominator * 10000)
+
+
+def approved_payment(
+    loan_amount, interest_rate, number_of_payments, interest_only=False
+):
+    """
+    The payment approveLoan saves, None where approveLoan reverts: where
+    _getPaymentAmount reverts, or InvalidLoanInput for a payment above uint96
+    """
+    payment = payment_amount(
+        loan_amount, interest_rate, number_of_payments, interest_only
+    )
+    return None if payment is None or payment > MAX_UINT96 else payment
+
+
+def next_payment(
+    loan_amount,
+    interest_rate,
+    number_of_payments,
+    interest_only=False,
+    payments_made=0,
+    principal_remaining=None,
+    stored_payment=None,
+):
+    """
+    Same as BankingNode.getNextPayment for a loan with principal remaining
+    Defaults to a loan that has just been approved, returns None where the contract reverts
+    """
+    if principal_remaining is None:
+        principal_remaining = loan_amount
+    payoff = principal_remaining + principal_remaining * interest_rate // 10000
+    if payments_made + 1 == number_of_payments:
+        return payoff
+    if stored_payment is None:
+        stored_payment = approved_payment(
+            loan_amount, interest_rate, number_of_payments, interest_only
+        )
+        if stored_payment is None:
+            return None
+    # rounding can pay off the principal before the last payment
+    return min(stored_payment, payoff)
+
+
+def schedule(
+    loan_amount,
+    interest_rate,
+    number_of_payments,
+    interest_only=False,
+    loan_start_time=0,
+    payment_interval=0,
+    principal_remaining=None,
+    payments_made=0,
+    stored_payment=None,
+):
+    """
+    Remaining payments of a loan, as made by makeLoanPayment
+    Defaults to a loan that has just been approved
+    """
+    if principal_remaining is None:
+        principal_remaining = loan_amount
+    if stored_payment is None:
+        stored_payment = approved_payment(
+            loan_amount, interest_rate, number_of_payments, interest_only
+        )
+    periods = []
+    while principal_remaining > 0 and payments_made < number_of_payments:
+        payment = next_payment(
+            loan_amount,
+            interest_rate,
+            number_of_payments,
+            interest_only,
+            payments_made,
+            principal_remaining,
+            stored_payment,
+        )
+        interest = principal_remaining * interest_rate // 10000
+        payments_made += 1
+        if payment is None or stored_payment is None:
+            return Schedule(periods, payments_made)
+        if not interest_only:
+            principal = payment - interest
+            if principal < 0 or principal > principal_remaining:
+                return Schedule(periods, payments_made)
+        elif payments_made == number_of_payments:
+            principal = principal_remaining
+        else:
+            principal = 0
+        principal_remaining -= principal
+        periods.append(
+            Period(
+                payments_made,
+                loan_start_time + payments_made * payment_interval,
+                payment,
+                interest,
+                principal,
+                principal_remaining,
+            )
+        )
+    return Schedule(periods)
+
+
+def schedules(loans):
+    """
+    Schedules of many loans, given scripts.lens.LoanSnapshot objects
+    """
+    return [
+        schedule(
+            loan.terms.loan_amount,
+            loan.terms.interest_rate,
+            loan.terms.number_of_payments,
+            loan.terms.interest_only,
+            loan.terms.loan_start_time,
+            loan.terms.payment_interval,
+            loan.terms.principal_remaining if loan.terms.loan_start_time else None,
+            loan.terms.payments_made,
+            loan.payment_amount if loan.terms.loan_start_time else None,
+        )
+        for loan in loans
+    ]
@@ -0,0 +1,428 @@
+"""
+Gas benchmarks for BankingNode, BNPLFactory and BNPLRewardsController
+
+Every case is measured at several state sizes, to expose how gas grows with state:
+    - BankingNode cases: N pending requests and N current loans on the node
+    - BNPLFactory / BNPLRewardsController cases: N nodes registered as reward pools
+
+Runs on the development network only (mocks + a mintable BNPL, so any number of nodes
+can be bonded). Usage:
+
+    brownie run scripts/bench_gas.py                       # measure and print
+    brownie run scripts/bench_gas.py main record           # save as the baseline
+    brownie run scripts/bench_gas.py main compare          # fail on regressions
+    brownie run scripts/bench_gas.py main compare 1 100    # only some state sizes
+"""
+import json
+import os
+import sys
+
+from brownie import (
+    BankingNode,
+    Contract,
+    MockERC20,
+    accounts,
+    chain,
+    config,
+    network,
+)
+
+from scripts.helper import NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS, get_account
+from scripts.deploy_helpers import (
+    BOND_AMOUNT,
+    deploy_bnpl_factory,
+    deploy_mock_pair,
+    deploy_mocks,
+    deploy_rewards_controller,
+    whitelist_usdt,
+)
+
+STATE_SIZES = [1, 100, 1000]
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "reports",
+    "gas_baseline.json",
+)
+THRESHOLD = 0.05  # an entry regresses when it grows more than 5% over the baseline
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+LOAN_AMOUNT = 100 * 10**6  # 100 USDT
+MONTHLY = 2628000
+DEPOSIT_AMOUNT = 1000 * 10**6
+COLLATERAL_AMOUNT = 100 * 10**18  # 100 DAI
+STAKE_AMOUNT = 10000 * 10**18
+UNBONDING_BLOCKS = 46523
+BATCH_SIZE = 5  # loans per approveLoans / makeLoanPayments call
+
+
+class BenchWorld:
+    """
+    Contracts and accounts shared by the benchmark cases
+    """
+
+    def __init__(self):
+        self.operator = get_account()
+        self.borrower = get_account(index=1)
+        self.lender = get_account(index=2)
+        self.staker = get_account(index=3)
+        deploy_mocks(self.operator)
+        network_config = config["networks"][network.show_active()]
+        self.usdt = MockERC20.at(network_config["usdt"])
+        self.dai = MockERC20.at(network_config["dai"])
+        self.weth = MockERC20.at(network_config["weth"])
+
+        # Mintable BNPL so any number of nodes can post the 2M bond
+        self.bnpl = MockERC20.deploy("BNPL", "BNPL", 18, {"from": self.operator})
+        self.factory = deploy_bnpl_factory(self.bnpl, self.operator)
+        whitelist_usdt(self.factory)
+        self.rewards = deploy_rewards_controller(self.factory, self.bnpl, chain.time())
+        self.node = self.create_node(self.operator)
+
+        # BNPL/WETH liquidity for collectFees and sellSlashed
+        pair = deploy_mock_pair(self.bnpl, self.weth, self.operator)
+        self.bnpl.mint(pair, 10**9 * 10**18, {"from": self.operator})
+        self.weth.mint(pair, 10**4 * 10**18, {"from": self.operator})
+        pair.sync({"from": self.operator})
+
+        for user in [self.borrower, self.lender]:
+            self.usdt.mint(user, 10**9 * 10**6, {"from": user})
+            self.usdt.approve(self.node, 2**256 - 1, {"from": user})
+        self.dai.mint(self.borrower, 10**9 * 10**18, {"from": self.borrower})
+        self.dai.approve(self.node, 2**256 - 1, {"from": self.borrower})
+        self.bnpl.mint(self.staker, 10**9 * 10**18, {"from": self.staker})
+        self.bnpl.approve(self.node, 2**256 - 1, {"from": self.staker})
+        self.bnpl.approve(self.rewards, 2**256 - 1, {"from": self.operator})
+        self.node.deposit(DEPOSIT_AMOUNT, {"from": self.lender})
+
+    def new_account(self):
+        account = accounts.add()
+        self.operator.transfer(account, "1 ether")
+        return account
+
+    def create_node(self, operator):
+        self.bnpl.mint(operator, BOND_AMOUNT, {"from": operator})
+        self.bnpl.approve(self.factory, BOND_AMOUNT, {"from": operator})
+        self.factory.createNewNode(self.usdt, False, 0, {"from": operator})
+        node_address = self.factory.operatorToNode(operator)
+        return Contract.from_abi(BankingNode._name, node_address, BankingNode.abi)
+
+    def request_loan(self, interest_only=False, payments=12, interval=MONTHLY):
+        tx = self.node.requestLoan(
+            LOAN_AMOUNT,
+            interval,
+            payments,
+            83,
+            interest_only,
+            ZERO_ADDRESS,
+            0,
+            self.operator,
+            "bench",
+            {"from": self.borrower},
+        )
+        return tx.events["LoanRequest"]["loanId"]
+
+    def current_loan(self, interest_only=False, payments=12, interval=MONTHLY):
+        """
+        Request and approve a loan, it is the last entry of currentLoans
+        """
+        loan_id = self.request_loan(interest_only, payments, interval)
+        self.node.approveLoan(loan_id, 0, {"from": self.operator})
+        return loan_id
+
+    def grow_loans(self, count):
+        """
+        Add count pending requests and count current loans to the node
+        """
+        self.node.deposit(count * LOAN_AMOUNT, {"from": self.lender})
+        for _ in range(count):
+            self.current_loan()
+        for _ in range(count):
+            self.request_loan()
+
+    def grow_pools(self, count):
+        """
+        Add count nodes, each registered as a reward pool
+        """
+        if self.rewards.poolLength() == 0:
+            self.rewards.add(self.node, {"from": self.operator})
+        while self.rewards.poolLength() < count:
+            node = self.create_node(self.new_account())
+            self.rewards.add(node, {"from": self.operator})
+
+    def pool_deposit(self):
+        """
+        Stake the lender's node tokens in the node's reward pool
+        """
+        pid = self.rewards.getPid(self.node)
+        amount = self.node.balanceOf(self.lender) // 4
+        self.node.approve(self.rewards, amount, {"from": self.lender})
+        self.rewards.deposit(pid, amount, {"from": self.lender})
+        chain.sleep(60)
+        return pid, amount
+
+
+# BANKING NODE CASES
+
+
+def request_loan(world):
+    return world.node.requestLoan(
+        LOAN_AMOUNT,
+        MONTHLY,
+        12,
+        83,
+        False,
+        ZERO_ADDRESS,
+        0,
+        world.operator,
+        "bench",
+        {"from": world.borrower},
+    )
+
+
+def request_loan_collateral(world):
+    return world.node.requestLoan(
+        LOAN_AMOUNT,
+        MONTHLY,
+        12,
+        83,
+        False,
+        world.dai,
+        COLLATERAL_AMOUNT,
+        world.operator,
+        "bench",
+        {"from": world.borrower},
+    )
+
+
+def approve_loan(world):
+    loan_id = world.request_loan()
+    return world.node.approveLoan(loan_id, 0, {"from": world.operator})
+
+
+def approve_loans(world):
+    world.node.deposit(BATCH_SIZE * LOAN_AMOUNT, {"from": world.lender})
+    loan_ids = [world.request_loan() for _ in range(BATCH_SIZE)]
+    return world.node.approveLoans(
+        loan_ids, [0] * BATCH_SIZE, {"from": world.operator}
+    )
+
+
+def payment_interest_only(world):
+    loan_id = world.current_loan(interest_only=True)
+    return world.node.makeLoanPayment(loan_id, {"from": world.borrower})
+
+
+def payment_amortizing(world):
+    loan_id = world.current_loan()
+    return world.node.makeLoanPayment(loan_id, {"from": world.borrower})
+
+
+def payment_final(world):
+    loan_id = world.current_loan(payments=1)
+    return world.node.makeLoanPayment(loan_id, {"from": world.borrower})
+
+
+def payments_batch(world):
+    world.node.deposit(BATCH_SIZE * LOAN_AMOUNT, {"from": world.lender})
+    loan_ids = [world.current_loan() for _ in range(BATCH_SIZE)]
+    return world.node.makeLoanPayments(loan_ids, {"from": world.borrower})
+
+
+def repay_early(world):
+    loan_id = world.current_loan()
+    return world.node.repayEarly(loan_id, {"from": world.borrower})
+
+
+def slash_loan(world):
+    loan_id = world.current_loan(interval=1)
+    chain.sleep(2)
+    return world.node.slashLoan(loan_id, 0, {"from": world.lender})
+
+
+def sell_slashed(world):
+    slash_loan(world)
+    return world.node.sellSlashed(0, {"from": world.lender})
+
+
+def deposit(world):
+    return world.node.deposit(LOAN_AMOUNT, {"from": world.lender})
+
+
+def withdraw(world):
+    return world.node.withdraw(LOAN_AMOUNT, {"from": world.lender})
+
+
+def stake(world):
+    return world.node.stake(STAKE_AMOUNT, {"from": world.staker})
+
+
+def initiate_unstake(world):
+    world.node.stake(STAKE_AMOUNT, {"from": world.staker})
+    shares = world.node.stakingShares(world.staker)
+    return world.node.initiateUnstake(shares, {"from": world.staker})
+
+
+def unstake(world):
+    initiate_unstake(world)
+    chain.mine(UNBONDING_BLOCKS)
+    return world.node.unstake({"from": world.staker})
+
+
+def collect_fees(world):
+    loan_id = world.current_loan(interest_only=True)
+    world.node.makeLoanPayment(loan_id, {"from": world.borrower})
+    return world.node.collectFees({"from": world.operator})
+
+
+# FACTORY AND REWARDS CASES
+
+
+def create_new_node(world):
+    operator = world.new_account()
+    world.bnpl.mint(operator, BOND_AMOUNT, {"from": operator})
+    world.bnpl.approve(world.factory, BOND_AMOUNT, {"from": operator})
+    return world.factory.createNewNode(world.usdt, False, 0, {"from": operator})
+
+
+def rewards_add(world):
+    node = world.create_node(world.new_account())
+    return world.rewards.add(node, {"from": world.operator})
+
+
+def rewards_set(world):
+    world.node.stake(STAKE_AMOUNT, {"from": world.staker})
+    return world.rewards.set(world.rewards.getPid(world.node), {"from": world.operator})
+
+
+def rewards_deposit(world):
+    pid, amount = world.pool_deposit()
+    world.node.approve(world.rewards, amount, {"from": world.lender})
+    return world.rewards.deposit(pid, amount, {"from": world.lender})
+
+
+def rewards_withdraw(world):
+    pid, amount = world.pool_deposit()
+    return world.rewards.withdraw(pid, amount, {"from": world.lender})
+
+
+def rewards_emergency_withdraw(world):
+    pid, amount = world.pool_deposit()
+    return world.rewards.emergencyWithdraw(pid, {"from": world.lender})
+
+
+def rewards_update_pool(world):
+    pid, amount = world.pool_deposit()
+    return world.rewards.updatePool(pid, {"from": world.operator})
+
+
+def rewards_mass_update_pools(world):
+    world.pool_deposit()
+    return world.rewards.massUpdatePools({"from": world.operator})
+
+
+NODE_CASES = {
+    "BankingNode.requestLoan": request_loan,
+    "BankingNode.requestLoan(collateral)": request_loan_collateral,
+    "BankingNode.approveLoan": approve_loan,
+    f"BankingNode.approveLoans({BATCH_SIZE})": approve_loans,
+    "BankingNode.makeLoanPayment(interestOnly)": payment_interest_only,
+    "BankingNode.makeLoanPayment(amortizing)": payment_amortizing,
+    "BankingNode.makeLoanPayment(final)": payment_final,
+    f"BankingNode.makeLoanPayments({BATCH_SIZE})": payments_batch,
+    "BankingNode.repayEarly": repay_early,
+    "BankingNode.slashLoan": slash_loan,
+    "BankingNode.sellSlashed": sell_slashed,
+    "BankingNode.deposit": deposit,
+    "BankingNode.withdraw": withdraw,
+    "BankingNode.stake": stake,
+    "BankingNode.initiateUnstake": initiate_unstake,
+    "BankingNode.unstake": unstake,
+    "BankingNode.collectFees": collect_fees,
+}
+POOL_CASES = {
+    "BNPLFactory.createNewNode": create_new_node,
+    "BNPLRewardsController.add": rewards_add,
+    "BNPLRewardsController.set": rewards_set,
+    "BNPLRewardsController.deposit": rewards_deposit,
+    "BNPLRewardsController.withdraw": rewards_withdraw,
+    "BNPLRewardsController.emergencyWithdraw": rewards_emergency_withdraw,
+    "BNPLRewardsController.updatePool": rewards_update_pool,
+    "BNPLRewardsController.massUpdatePools": rewards_mass_update_pools,
+}
+
+
+def _measure(world, cases, size, results):
+    """
+    Run every case against the same state, reverting after each one
+    """
+    chain.snapshot()
+    for name, case in cases.items():
+        tx = case(world)
+        results.setdefault(name, {})[str(size)] = tx.gas_used
+        print(f"{name} @ {size}: {tx.gas_used}")
+        chain.revert()
+
+
+def run_benchmarks(sizes=STATE_SIZES):
+    """
+    Measure gas_used of every case at every state size
+    Returns {case name: {state size: gas used}}
+    """
+    if network.show_active() not in NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS:
+        raise ValueError("Gas benchmarks run on the development network only")
+    results = {}
+    world = BenchWorld()
+    # State only grows, so the sizes are built in increasing order on one chain
+    for size in sorted(sizes):
+        world.grow_loans(size - world.node.getCurrentLoansCount())
+        _measure(world, NODE_CASES, size, results)
+    for size in sorted(sizes):
+        world.grow_pools(size)
+        _measure(world, POOL_CASES, size, results)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Returns a list of (case, size, baseline gas, new gas) for every entry that grew
+    more than threshold over the baseline. Entries missing from the baseline are skipped.
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, gas_used in by_size.items():
+            expected = baseline.get(name, {}).get(size)
+            if expected is not None and gas_used > expected * (1 + threshold):
+                regressions.append((name, size, expected, gas_used))
+    return regressions
+
+
+def main(mode="print", *sizes):
+    sizes = [int(size) for size in sizes] if sizes else STATE_SIZES
+    results = run_benchmarks(sizes)
+
+    if mode == "record":
+        save_baseline(results)
+        print(f"Saved gas baseline to {BASELINE_PATH}")
+    elif mode == "compare":
+        baseline = load_baseline()
+        if not baseline:
+            sys.exit(f"No gas baseline at {BASELINE_PATH}, run with 'record' first")
+        regressions = compare(results, baseline)
+        for name, size, expected, gas_used in regressions:
+            print(f"REGRESSION {name} @ {size}: {expected} -> {gas_used}")
+        if regressions:
+            sys.exit(f"{len(regressions)} gas regressions over {THRESHOLD:.0%}")
+        print("No gas regressions")
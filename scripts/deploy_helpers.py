@@ -8,17 +8,28 @@ from brownie import (
     config,
     Contract,
     BankingNode,
+    MockERC20,
+    MockWETH,
+    MockLendingPool,
+    MockLendingPoolAddressesProvider,
+    MockAaveIncentivesController,
+    MockUniswapV2Factory,
+    MockUniswapV2Pair,
     interface,
+    web3,
 )
 from web3 import Web3
 import time
 
 from scripts.helper import (
+    NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS,
     get_account, 
     approve_erc20, 
     encode_function_data, 
     upgrade
 )
+from scripts.swap_math import pair_for, sort_tokens
+from scripts.uniswap_helpers import USD_AMOUNT, WETH_AMOUNT
 
 GRACE_PERIOD = 0
 BOND_AMOUNT = Web3.toWei(2000000, "ether")
@@ -26,6 +37,18 @@ USDT_AMOUNT = 100 * 10 ** 6
 LP_AMOUNT = 10 * 10 ** 19
 LP_ETH = 10 ** 16
 START_TIME = 0  # CHANGE FOR ACTUAL DEPLOY
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Development network mocks
+MOCK_LIQUIDITY_RATE = 2 * 10**25  # 2% yearly deposit rate on every mock AAVE reserve
+MOCK_PAIR_WETH = Web3.toWei(1000, "ether")  # WETH side of each mock stablecoin pair
+MOCK_STABLECOINS = [
+    # (config key, name, symbol, decimals)
+    ("usdt", "Tether USD", "USDT", 6),
+    ("usdc", "USD Coin", "USDC", 6),
+    ("dai", "Dai Stablecoin", "DAI", 18),
+    ("busd", "Binance USD", "BUSD", 18),
+]
 
 
 def deploy_bnpl_token():
@@ -105,12 +128,57 @@ def deploy_bnpl_factory(BNPL, account):
         FACTORY.uniswapFactory() == config["networks"][network.show_active()]["factory"]
     )
 
+    deploy_banking_node_implementation(FACTORY, account)
+
     return PROXY
 
+
+def deploy_banking_node_implementation(bnpl_factory, account):
+    """
+    Deploys the BankingNode implementation and sets it on the factory,
+    every node created afterwards is an EIP-1167 clone of it
+    """
+    print("Deploying BankingNode implementation contract...")
+    implementation = BankingNode.deploy(
+        {"from": account},
+        publish_source=config["networks"][network.show_active()]["verify"],
+    )
+    print("Deployed!")
+    tx = bnpl_factory.setBankingNodeImplementation(implementation, {"from": account})
+    tx.wait(1)
+    assert bnpl_factory.bankingNodeImplementation() == implementation.address
+    return implementation
+
+
+def predict_node_address(bnpl_factory, token, require_kyc, grace_period, operator):
+    """
+    Address createNewNode will deploy the node of `operator` at, before it is created
+    Same CREATE2 address as OpenZeppelin Clones.predictDeterministicAddress
+    """
+    implementation = bnpl_factory.bankingNodeImplementation()
+    salt = Web3.solidityKeccak(
+        ["address", "bool", "uint256", "address"],
+        [str(token), require_kyc, grace_period, str(operator)],
+    )
+    init_code = (
+        bytes.fromhex("3d602d80600a3d3981f3363d3d373d3d3d363d73")
+        + bytes.fromhex(implementation[2:])
+        + bytes.fromhex("5af43d82803e903d91602b57fd5bf3")
+    )
+    address = Web3.keccak(
+        b"\xff"
+        + bytes.fromhex(str(bnpl_factory.address)[2:])
+        + salt
+        + Web3.keccak(init_code)
+    )[12:]
+    return Web3.toChecksumAddress(address)
+
 def upgrade_factory(new_implementation, account):
     """
     Upgrades BNPLFactory by deploying a new version of contract and 
     run the upgrade function of the proxy to point to the new implementation. 
+    Factories upgraded from a version without clone nodes also get a BankingNode
+    implementation, as createNewNode clones it.
     """
     print("Upgrading BNPLFactory...")
     factory_v2 = new_implementation.deploy(
@@ -123,6 +191,8 @@ def upgrade_factory(new_implementation, account):
     upgrade(account, proxy, factory_v2, proxy_admin_contract=proxy_admin)
     FACTORY_V2 = Contract.from_abi("BNPLFactoryV2", proxy.address, new_implementation.abi)
     print("Upgraded!")
+    if FACTORY_V2.bankingNodeImplementation() == ZERO_ADDRESS:
+        deploy_banking_node_implementation(FACTORY_V2, account)
     
     return FACTORY_V2
 
@@ -154,6 +224,14 @@ def create_node(bnpl_factory, account, token):
 
 def add_lp(token):
     account = get_account()
+    if network.show_active() in NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS:
+        weth = config["networks"][network.show_active()]["weth"]
+        pair = deploy_mock_pair(token, weth, account)
+        interface.IERC20(token).transfer(pair, LP_AMOUNT, {"from": account})
+        MockWETH.at(weth).mint(pair, LP_ETH, {"from": account})
+        pair.sync({"from": account}).wait(1)
+        print("Adding BNPL Liquidity to mock SushiSwap pair")
+        return
     uniswap_router = interface.IUniswapV2Router02(
         config["networks"][network.show_active()].get("router")
     )
@@ -185,6 +263,104 @@ def deploy_rewards_controller(bnpl_factory, bnpl, start_time):
     return rewards_controller
 
 
+def deploy_mocks(account=None):
+    """
+    Development network profile
+
+    Deploys local stand-ins for the stablecoins, WETH, AAVE (addresses provider, lending
+    pool, incentives controller) and the Sushiswap factory with funded WETH pairs, then
+    points the active network's config at them so every other helper works unchanged.
+    Only deploys once per chain.
+    """
+    network_config = config["networks"][network.show_active()]
+    if len(MockLendingPoolAddressesProvider) > 0:
+        return network_config
+    account = account if account else get_account()
+    print("Deploying development mocks...")
+
+    weth = MockWETH.deploy({"from": account})
+    stablecoins = {
+        key: MockERC20.deploy(name, symbol, decimals, {"from": account})
+        for key, name, symbol, decimals in MOCK_STABLECOINS
+    }
+
+    lending_pool = MockLendingPool.deploy({"from": account})
+    for token in [weth] + list(stablecoins.values()):
+        lending_pool.initReserve(token, MOCK_LIQUIDITY_RATE, {"from": account})
+    provider = MockLendingPoolAddressesProvider.deploy(lending_pool, {"from": account})
+    reward_token = MockERC20.deploy("Staked Aave", "stkAAVE", 18, {"from": account})
+    incentives = MockAaveIncentivesController.deploy(reward_token, {"from": account})
+    uniswap_factory = MockUniswapV2Factory.deploy({"from": account})
+
+    network_config["weth"] = weth.address
+    network_config["lendingPoolAddressesProvider"] = provider.address
+    network_config["aaveDistributionController"] = incentives.address
+    network_config["factory"] = uniswap_factory.address
+    for key, token in stablecoins.items():
+        network_config[key] = token.address
+
+    # Stablecoin/WETH pairs priced like the stablecoin swaps in uniswap_helpers
+    for key, name, symbol, decimals in MOCK_STABLECOINS:
+        token = stablecoins[key]
+        pair = deploy_mock_pair(token, weth, account)
+        token.mint(
+            pair,
+            MOCK_PAIR_WETH * USD_AMOUNT * 10**decimals // 10**18,
+            {"from": account},
+        )
+        weth.mint(pair, MOCK_PAIR_WETH, {"from": account})
+        pair.sync({"from": account})
+    print("Deployed!")
+    return network_config
+
+
+def deploy_mock_pair(token_a, token_b, account):
+    """
+    Places a MockUniswapV2Pair at the address UniswapV2Library.pairFor computes for the
+    mock factory, as nodes never ask the factory for pairs. The pair starts empty: send
+    it tokens and call sync() to add liquidity.
+    """
+    uniswap_factory = config["networks"][network.show_active()]["factory"]
+    pair_address = pair_for(uniswap_factory, token_a, token_b)
+    if len(web3.eth.get_code(pair_address)) > 0:
+        return MockUniswapV2Pair.at(pair_address)
+
+    # Copy the runtime code of a template pair to the CREATE2 address
+    if len(MockUniswapV2Pair) == 0:
+        MockUniswapV2Pair.deploy({"from": account})
+    set_code(pair_address, web3.eth.get_code(MockUniswapV2Pair[0].address).hex())
+    # only build the contract once it has code, brownie requires it
+    pair = MockUniswapV2Pair.at(pair_address)
+
+    token0, token1 = sort_tokens(token_a, token_b)
+    pair.initialize(uniswap_factory, token0, token1, {"from": account})
+    MockUniswapV2Factory.at(uniswap_factory).registerPair(pair, {"from": account})
+    return pair
+
+
+def set_code(address, code):
+    """
+    Sets the runtime bytecode of an address on a local chain (ganache, hardhat or anvil)
+    """
+    for method in ["evm_setAccountCode", "hardhat_setCode", "anvil_setCode"]:
+        response = web3.provider.make_request(method, [address, code])
+        if "error" not in response:
+            return
+    raise ValueError(f"{network.show_active()} does not support setting account code")
+
+
+def mint_mock_stablecoins(account):
+    """
+    Development network stand-in for uniswap_helpers.swap_to_stablecoins,
+    mints the same amount of each stablecoin the swaps would return
+    """
+    network_config = config["networks"][network.show_active()]
+    for key, name, symbol, decimals in MOCK_STABLECOINS:
+        MockERC20.at(network_config[key]).mint(
+            account, WETH_AMOUNT * USD_AMOUNT * 10**decimals, {"from": account}
+        )
+
+
 def main():
     account = get_account()
     bnpl = deploy_bnpl_token()
@@ -0,0 +1,319 @@
+"""
+Pipelined, resumable deployment of the BNPL factory
+
+The deployment is a graph of steps, each one transaction that can be sent once the
+steps it depends on are confirmed:
+
+    ProxyAdmin, BNPLFactory implementation  --> BNPLFactory (proxy)
+    BNPLFactory, BankingNode implementation --> setBankingNodeImplementation
+    BNPLFactory --> whitelist usdt, whitelist usdc, BNPLRewardsController
+
+Every step whose dependencies are done is sent back to back with consecutive nonces,
+then the whole wave is confirmed at once, so the deployment takes three rounds of
+confirmations instead of one per transaction.
+
+Each step is recorded in a JSON manifest (deployments/<network>.json) when it is sent
+and again when it is confirmed. Rerunning after a failure resumes: confirmed steps are
+skipped, and steps that were sent but not confirmed are waited for, or sent again if
+their transaction was dropped or reverted. A transaction still pending after the wait
+stops the run rather than being sent twice.
+
+    brownie run scripts/deploy_runner.py --network kovan
+    brownie run scripts/deploy_runner.py main deployments/kovan-v2.json --network kovan
+"""
+import json
+import os
+
+from brownie import (
+    BankingNode,
+    BNPLFactory,
+    BNPLRewardsController,
+    Contract,
+    ProxyAdmin,
+    TransparentUpgradeableProxy,
+    config,
+    network,
+    web3,
+)
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from scripts.helper import encode_function_data, get_account
+
+START_TIME = 1653303600  # Monday, 23 May 2022 16:00:00 GMT+07:00
+MANIFEST_DIR = "deployments"
+RECEIPT_TIMEOUT = 600  # seconds to wait for a transaction sent by a previous run
+
+
+def main(manifest_path=None):
+    network_config = config["networks"][network.show_active()]
+    steps = factory_steps(network_config["bnpl"], network_config)
+    runner = DeployRunner(steps, get_account(), manifest_path)
+    results = runner.run()
+    factory = Contract.from_abi(
+        "BNPLFactory_v0", results["BNPLFactory"], BNPLFactory.abi
+    )
+    assert factory.bankingNodeImplementation() == results["BankingNode implementation"]
+    print(f"BNPLFactory deployed at {factory.address}")
+    return factory
+
+
+class Step:
+    """
+    One transaction of the deployment
+
+    send(results, params) sends it and returns the unconfirmed transaction, where
+    results maps every finished step to its contract address (deployments) or its
+    transaction hash (calls), and params are the transaction parameters to use.
+    container is set for deployments, to verify the source once confirmed.
+    """
+
+    def __init__(self, name, depends_on, send, container=None):
+        self.name = name
+        self.depends_on = depends_on
+        self.send = send
+        self.container = container
+
+
+def factory_steps(bnpl, network_config, start_time=START_TIME):
+    """
+    Steps of deploy.py: the factory behind its proxy, the BankingNode implementation,
+    the USDT and USDC whitelists and the rewards controller
+    """
+
+    def deploy_proxy(results, params):
+        implementation = BNPLFactory.at(results["BNPLFactory implementation"])
+        initializer = encode_function_data(
+            implementation.initialize,
+            str(bnpl),
+            network_config["lendingPoolAddressesProvider"],
+            network_config["weth"],
+            network_config["aaveDistributionController"],
+            network_config["factory"],
+        )
+        return TransparentUpgradeableProxy.deploy(
+            implementation.address,
+            results["ProxyAdmin"],
+            initializer,
+            dict(params, gas_limit=1000000),
+        )
+
+    def factory(results):
+        return Contract.from_abi(
+            "BNPLFactory_v0", results["BNPLFactory"], BNPLFactory.abi
+        )
+
+    return [
+        Step("ProxyAdmin", [], lambda _, params: ProxyAdmin.deploy(params), ProxyAdmin),
+        Step(
+            "BNPLFactory implementation",
+            [],
+            lambda _, params: BNPLFactory.deploy(params),
+            BNPLFactory,
+        ),
+        Step(
+            "BankingNode implementation",
+            [],
+            lambda _, params: BankingNode.deploy(params),
+            BankingNode,
+        ),
+        Step(
+            "BNPLFactory",
+            ["ProxyAdmin", "BNPLFactory implementation"],
+            deploy_proxy,
+        ),
+        Step(
+            "setBankingNodeImplementation",
+            ["BNPLFactory", "BankingNode implementation"],
+            lambda results, params: factory(results).setBankingNodeImplementation(
+                results["BankingNode implementation"], params
+            ),
+        ),
+        Step(
+            "whitelist usdt",
+            ["BNPLFactory"],
+            lambda results, params: factory(results).whitelistToken(
+                network_config["usdt"], True, params
+            ),
+        ),
+        Step(
+            "whitelist usdc",
+            ["BNPLFactory"],
+            lambda results, params: factory(results).whitelistToken(
+                network_config["usdc"], True, params
+            ),
+        ),
+        Step(
+            "BNPLRewardsController",
+            ["BNPLFactory"],
+            lambda results, params: BNPLRewardsController.deploy(
+                results["BNPLFactory"], str(bnpl), params["from"], start_time, params
+            ),
+            BNPLRewardsController,
+        ),
+    ]
+
+
+class DeployRunner:
+    """
+    Sends the steps wave by wave, recording progress in a JSON manifest
+    """
+
+    def __init__(self, steps, account=None, manifest_path=None, required_confs=1):
+        names = [step.name for step in steps]
+        assert len(set(names)) == len(names), "step names must be unique"
+        for step in steps:
+            for name in step.depends_on:
+                assert name in names, f"{step.name} depends on unknown step {name}"
+        self.steps = steps
+        self.account = account if account else get_account()
+        self.manifest_path = manifest_path or os.path.join(
+            MANIFEST_DIR, f"{network.show_active()}.json"
+        )
+        self.required_confs = required_confs
+        self.manifest = self._load_manifest()
+
+    def run(self):
+        """
+        Send every step not yet confirmed, returns the results of all the steps
+        """
+        self._resume_sent()
+        while True:
+            ready = [
+                step
+                for step in self.steps
+                if not self._confirmed(step.name)
+                and all(self._confirmed(name) for name in step.depends_on)
+            ]
+            if not ready:
+                break
+            self._confirm(ready, self._send(ready))
+        missing = [step.name for step in self.steps if not self._confirmed(step.name)]
+        assert not missing, f"steps never became ready: {missing}"
+        return self.results()
+
+    def results(self):
+        """
+        Address (deployments) or transaction hash (calls) of every confirmed step
+        """
+        return {
+            name: entry.get("address", entry["tx"])
+            for name, entry in self.manifest["steps"].items()
+            if "block" in entry
+        }
+
+    def _send(self, steps):
+        """
+        Send the steps with consecutive nonces, without waiting for confirmations
+        """
+        results = self.results()
+        nonce = web3.eth.get_transaction_count(str(self.account), "pending")
+        sent = []
+        for step in steps:
+            params = {"from": self.account, "nonce": nonce, "required_confs": 0}
+            try:
+                tx = step.send(results, params)
+            except Exception:
+                # not sent (e.g. gas estimation reverted), keep what was sent
+                self._confirm([step for step, _ in sent], [tx for _, tx in sent])
+                raise
+            print(f"{step.name}: sent {tx.txid} (nonce {nonce})")
+            nonce += 1
+            self.manifest["steps"][step.name] = {"tx": tx.txid}
+            self._save_manifest()
+            sent.append((step, tx))
+        return [tx for _, tx in sent]
+
+    def _confirm(self, steps, txs):
+        """
+        Wait for the transactions of the steps, recording each one as it confirms
+        """
+        failed = []
+        for step, tx in zip(steps, txs):
+            tx.wait(self.required_confs)
+            if tx.status != 1:
+                print(f"{step.name}: reverted in {tx.txid}")
+                del self.manifest["steps"][step.name]
+                failed.append(step.name)
+                continue
+            entry = {"tx": tx.txid, "block": tx.block_number}
+            if tx.contract_address:
+                entry["address"] = tx.contract_address
+            self.manifest["steps"][step.name] = entry
+            self._save_manifest()
+            print(f"{step.name}: confirmed in block {tx.block_number}")
+            self._verify(step, entry)
+        self._save_manifest()
+        assert not failed, f"steps reverted, rerun to resume: {failed}"
+
+    def _resume_sent(self):
+        """
+        Wait for the transactions a previous run sent but did not see confirmed
+        Dropped or reverted transactions are removed so the step is sent again
+        Transactions still pending after RECEIPT_TIMEOUT are kept and the run stops,
+        sending the step again could deploy it twice
+        """
+        pending = []
+        for name, entry in list(self.manifest["steps"].items()):
+            if "block" in entry:
+                continue
+            try:
+                web3.eth.get_transaction(entry["tx"])
+            except TransactionNotFound:
+                print(f"{name}: {entry['tx']} was dropped, sending again")
+                del self.manifest["steps"][name]
+                continue
+            try:
+                receipt = web3.eth.wait_for_transaction_receipt(
+                    entry["tx"], timeout=RECEIPT_TIMEOUT
+                )
+            except TimeExhausted:
+                print(f"{name}: {entry['tx']} still pending")
+                pending.append(name)
+                continue
+            if receipt["status"] != 1:
+                print(f"{name}: {entry['tx']} reverted, sending again")
+                del self.manifest["steps"][name]
+                continue
+            entry["block"] = receipt["blockNumber"]
+            if receipt["contractAddress"]:
+                entry["address"] = receipt["contractAddress"]
+            print(f"{name}: confirmed in block {entry['block']}")
+        self._save_manifest()
+        assert not pending, f"transactions still pending, rerun once mined: {pending}"
+
+    def _verify(self, step, entry):
+        if step.container is None or "address" not in entry:
+            return
+        if not config["networks"][network.show_active()].get("verify"):
+            return
+        step.container.publish_source(step.container.at(entry["address"]))
+
+    def _confirmed(self, name):
+        return "block" in self.manifest["steps"].get(name, {})
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as file:
+                manifest = json.load(file)
+            assert manifest["network"] == network.show_active(), (
+                f"{self.manifest_path} is a manifest of {manifest['network']}"
+            )
+            # the deployed contracts are owned by this account, no other can resume
+            assert manifest["account"] == str(self.account), (
+                f"{self.manifest_path} was deployed from {manifest['account']}"
+            )
+            return manifest
+        return {
+            "network": network.show_active(),
+            "account": str(self.account),
+            "steps": {},
+        }
+
+    def _save_manifest(self):
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # write then rename, so an interrupted run never leaves a partial manifest
+        with open(self.manifest_path + ".tmp", "w") as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
@@ -1,3 +1,5 @@
+import os
+
 from brownie import network, accounts, interface, config
 
 
@@ -7,13 +9,29 @@ LOCAL_BLOCKCHAIN_ENVIRONMENTS = NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS + [
     "binance-fork",
     "matic-fork",
 ]
+ACCOUNTS_PER_WORKER = 5  # local accounts given to each pytest-xdist worker
+
+
+def get_worker_index():
+    """
+    Index of the pytest-xdist worker running this process ("gw3" -> 3)
+    None when the tests are not run in parallel
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return None
+    return int(worker[2:])
 
 
 def get_account(index=None, id=None):
+    # on local chains, each xdist worker uses its own range of accounts
+    offset = 0
+    if network.show_active() in LOCAL_BLOCKCHAIN_ENVIRONMENTS:
+        offset = (get_worker_index() or 0) * ACCOUNTS_PER_WORKER
     if index:
-        return accounts[index]
+        return accounts[offset + index]
     if network.show_active() in LOCAL_BLOCKCHAIN_ENVIRONMENTS:
-        return accounts[0]
+        return accounts[offset]
     if id:
         return accounts.load(id)
     if network.show_active() in config["networks"]:
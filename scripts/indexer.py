@@ -0,0 +1,295 @@
+"""
+Incremental indexer for BNPLFactory and BankingNode events, into a local SQLite database
+
+Nodes are discovered from the factory's NewNode events (and from bankingNodesList, for
+nodes created before the factory emitted NewNode). Logs are fetched with eth_getLogs in
+block ranges that grow while responses are small and halve when the RPC rejects them.
+
+Every contract has a checkpoint (last indexed block and its hash), saved in the same
+transaction as the events of each batch, so a restart resumes where it stopped. Only
+blocks at least `confirmations` deep are indexed; if a checkpointed block hash no longer
+matches the chain, that contract is rewound and re-indexed.
+
+Usage:
+
+    brownie run scripts/indexer.py                                   # BNPLFactory[-1], once
+    brownie run scripts/indexer.py main reports/bnpl.sqlite 0xFactory
+    brownie run scripts/indexer.py main reports/bnpl.sqlite 0xFactory 15   # poll every 15s
+
+Every event is stored with its loan id, user, base token amount and BNPL amount when it
+has them (see EVENT_AMOUNTS), and all of its arguments as JSON. Example report, total
+deposits per node:
+
+    SELECT address, SUM(CAST(base_amount AS INTEGER)) FROM events
+    WHERE event = 'baseTokenDeposit' GROUP BY address
+"""
+import json
+import sqlite3
+import time
+
+from requests.exceptions import RequestException
+from brownie import BankingNode, BNPLFactory, web3
+
+NODE_EVENTS = [
+    "LoanRequest",
+    "approvedLoan",
+    "loanPaymentMade",
+    "loanRepaidEarly",
+    "loanSlashed",
+    "baseTokenDeposit",
+    "baseTokenWithdrawn",
+    "bnplStaked",
+    "unbondingInitiated",
+    "slashingSale",
+    "feesCollected",
+]
+FACTORY_EVENTS = ["NewNode"]
+# (base token amount, BNPL amount) argument of each event, other arguments are only in
+# the JSON args (e.g. the staking shares of unbondingInitiated)
+EVENT_AMOUNTS = {
+    "baseTokenDeposit": ("amount", None),
+    "baseTokenWithdrawn": ("amount", None),
+    "feesCollected": ("operatorFees", "stakerFees"),
+    "slashingSale": ("baseTokenRecovered", "bnplSold"),
+    "bnplStaked": (None, "bnplStaked"),
+}
+
+DB_PATH = "reports/bnpl.sqlite"
+CONFIRMATIONS = 12
+INITIAL_BATCH = 2000  # blocks per eth_getLogs call
+MAX_BATCH = 100000
+TARGET_LOGS = 5000  # keep growing the range while a batch returns fewer logs than this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    address TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    address TEXT PRIMARY KEY,
+    operator TEXT,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    event TEXT NOT NULL,
+    loan_id INTEGER,
+    user TEXT,
+    base_amount TEXT,
+    bnpl_amount TEXT,
+    args TEXT NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_address ON events (address, event, block_number);
+CREATE INDEX IF NOT EXISTS events_by_loan ON events (address, loan_id);
+"""
+
+
+def main(db_path=DB_PATH, factory=None, poll_interval=None):
+    if factory is None:
+        factory = BNPLFactory[-1]
+    indexer = Indexer(db_path, factory)
+    while True:
+        block = indexer.sync()
+        print(f"Indexed {indexer.node_count()} nodes up to block {block}")
+        if poll_interval is None:
+            return indexer
+        time.sleep(float(poll_interval))
+
+
+class Indexer:
+    """
+    Follows one BNPLFactory and all of its nodes
+    """
+
+    def __init__(
+        self, db_path, factory, confirmations=CONFIRMATIONS, start_block=0
+    ):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.factory = web3.eth.contract(address=str(factory), abi=BNPLFactory.abi)
+        self.confirmations = confirmations
+        self.start_block = start_block
+        self.batch_size = INITIAL_BATCH
+        self._factory_topics = event_topics(self.factory, FACTORY_EVENTS)
+        self._node_contract = web3.eth.contract(abi=BankingNode.abi)
+        self._node_topics = event_topics(self._node_contract, NODE_EVENTS)
+        with self.db:
+            self._add_checkpoint(self.factory.address, start_block - 1)
+
+    def sync(self):
+        """
+        Index the factory and every node up to the last confirmed block, returns that block
+        """
+        head = web3.eth.block_number - self.confirmations
+        if head < self.start_block:
+            return head
+        self._check_reorgs()
+        self._index([self.factory.address], self.factory, self._factory_topics, head)
+        self._add_listed_nodes(head)
+        for checkpoint, addresses in self._node_groups():
+            if checkpoint < head:
+                self._index(addresses, self._node_contract, self._node_topics, head)
+        return head
+
+    def node_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def _index(self, addresses, contract, topics, head):
+        # all addresses share the same checkpoint
+        from_block = self._checkpoint(addresses[0]) + 1
+        while from_block <= head:
+            to_block = min(from_block + self.batch_size - 1, head)
+            try:
+                logs = web3.eth.get_logs(
+                    {
+                        "fromBlock": from_block,
+                        "toBlock": to_block,
+                        "address": addresses,
+                        "topics": [list(topics)],
+                    }
+                )
+            except (ValueError, RequestException):
+                # range too large or too many logs for the RPC, retry with half the range
+                if self.batch_size == 1:
+                    raise
+                self.batch_size //= 2
+                continue
+
+            block_hash = web3.eth.get_block(to_block)["hash"].hex()
+            with self.db:
+                for log in logs:
+                    self._save_event(contract, topics, log)
+                self.db.executemany(
+                    "UPDATE checkpoints SET block_number = ?, block_hash = ? "
+                    "WHERE address = ?",
+                    [(to_block, block_hash, address) for address in addresses],
+                )
+            if len(logs) < TARGET_LOGS:
+                self.batch_size = min(self.batch_size * 2, MAX_BATCH)
+            from_block = to_block + 1
+
+    def _save_event(self, contract, topics, log):
+        name = topics[log["topics"][0].hex()]
+        args = dict(getattr(contract.events, name)().processLog(log)["args"])
+        if name == "NewNode":
+            self._add_node(args["_node"], args["_operator"], log["blockNumber"])
+        # amounts are stored as text, they overflow SQLite integers
+        amounts = [
+            str(args[key]) if key else None
+            for key in EVENT_AMOUNTS.get(name, (None, None))
+        ]
+        self.db.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                log["blockNumber"],
+                log["transactionHash"].hex(),
+                log["logIndex"],
+                log["address"],
+                name,
+                args.get("loanId"),
+                args.get("user"),
+                *amounts,
+                json.dumps(args, default=str),
+            ),
+        )
+
+    def _add_node(self, address, operator, block_number):
+        self.db.execute(
+            "INSERT OR IGNORE INTO nodes VALUES (?, ?, ?)",
+            (address, operator, block_number),
+        )
+        self._add_checkpoint(address, block_number - 1)
+
+    def _add_listed_nodes(self, head):
+        # nodes created before NewNode was emitted are only found in bankingNodesList
+        count = self.factory.functions.bankingNodeCount().call(block_identifier=head)
+        if count == self.node_count():
+            return
+        with self.db:
+            for i in range(count):
+                address = self.factory.functions.bankingNodesList(i).call(
+                    block_identifier=head
+                )
+                self._add_node(address, None, self.start_block)
+
+    def _add_checkpoint(self, address, block_number):
+        self.db.execute(
+            "INSERT OR IGNORE INTO checkpoints VALUES (?, ?, NULL)",
+            (address, block_number),
+        )
+
+    def _checkpoint(self, address):
+        return self.db.execute(
+            "SELECT block_number FROM checkpoints WHERE address = ?", (address,)
+        ).fetchone()[0]
+
+    def _node_groups(self):
+        groups = {}
+        for address, checkpoint in self.db.execute(
+            "SELECT address, block_number FROM checkpoints WHERE address != ?",
+            (self.factory.address,),
+        ):
+            groups.setdefault(checkpoint, []).append(address)
+        return sorted(groups.items())
+
+    def _check_reorgs(self):
+        """
+        Rewind every contract whose checkpointed block is no longer on the chain
+        """
+        rows = self.db.execute(
+            "SELECT DISTINCT block_number, block_hash FROM checkpoints "
+            "WHERE block_hash IS NOT NULL"
+        ).fetchall()
+        for block_number, block_hash in rows:
+            if web3.eth.get_block(block_number)["hash"].hex() == block_hash:
+                continue
+            rewind_to = max(
+                block_number - 2 * max(self.confirmations, 1), self.start_block - 1
+            )
+            print(f"Reorg at block {block_number}, rewinding to {rewind_to}")
+            with self.db:
+                addresses = [
+                    row[0]
+                    for row in self.db.execute(
+                        "SELECT address FROM checkpoints WHERE block_hash = ?",
+                        (block_hash,),
+                    )
+                ]
+                if self.factory.address in addresses:
+                    # nodes created in the dropped blocks may not exist anymore
+                    for table in ["events", "checkpoints"]:
+                        self.db.execute(
+                            f"DELETE FROM {table} WHERE address IN "
+                            "(SELECT address FROM nodes WHERE block_number > ?)",
+                            (rewind_to,),
+                        )
+                    self.db.execute(
+                        "DELETE FROM nodes WHERE block_number > ?", (rewind_to,)
+                    )
+                for address in addresses:
+                    self.db.execute(
+                        "DELETE FROM events WHERE address = ? AND block_number > ?",
+                        (address, rewind_to),
+                    )
+                    self.db.execute(
+                        "UPDATE checkpoints SET block_number = ?, block_hash = NULL "
+                        "WHERE address = ? AND block_number > ?",
+                        (rewind_to, address, rewind_to),
+                    )
+
+
+def event_topics(contract, names):
+    """
+    Map of event signature hash (hex) to event name
+    """
+    topics = {}
+    for abi in contract.abi:
+        if abi["type"] == "event" and abi["name"] in names:
+            types = ",".join(i["type"] for i in abi["inputs"])
+            topics[web3.keccak(text=f"{abi['name']}({types})").hex()] = abi["name"]
+    return topics
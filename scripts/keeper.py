@@ -0,0 +1,317 @@
+"""
+Default detection keeper, slashes loans as soon as they pass their grace period
+
+A loan can be slashed by anyone once block.timestamp > getNextDueDate + gracePeriod.
+The keeper keeps these slash deadlines in a min-heap:
+
+    - load() reads every current loan of every node of the factory (with multicall)
+    - sync() updates only the loans touched by new events: approvedLoan adds a loan,
+      loanPaymentMade moves its deadline, loanRepaidEarly / loanSlashed remove it and
+      NewNode adds a node
+    - due() pops the loans whose deadline has passed
+
+Due loans are slashed with slashLoan, then sellSlashed is called once per node.
+With `slippage` set, the minOut of each sale is quoted from the pair reserves with
+scripts/quotes.py, otherwise every sale uses the fixed `min_out`.
+Transactions get consecutive nonces and at most `max_pending` are in flight at a time.
+Between rounds the keeper sleeps until the next deadline, or `poll_interval` seconds
+for new events if that is sooner.
+
+    brownie run scripts/keeper.py                              # BNPLFactory[-1]
+    brownie run scripts/keeper.py main 0xFactory 15 0.01     # 1% slippage
+"""
+import heapq
+import time
+from collections import deque
+
+from brownie import BankingNode, BNPLFactory, Contract, web3
+from brownie.exceptions import VirtualMachineError
+
+from scripts.helper import get_account
+from scripts.indexer import event_topics
+from scripts.multicall import CallFailed, multicall, read_loan_books
+from scripts.quotes import Quotes, apply_slippage
+from scripts.swap_math import Revert
+
+POLL_INTERVAL = 15  # seconds between event syncs when no deadline is sooner
+MAX_PENDING = 8  # transactions in flight at a time
+ADDRESSES_PER_CALL = 500  # node addresses per eth_getLogs call
+LOAN_EVENTS = ["approvedLoan", "loanPaymentMade", "loanRepaidEarly", "loanSlashed"]
+
+
+def main(factory=None, poll_interval=POLL_INTERVAL, slippage=None):
+    if factory is None:
+        factory = BNPLFactory[-1]
+    slippage = None if slippage is None else float(slippage)
+    keeper = Keeper(factory, slippage=slippage)
+    keeper.load()
+    print(f"Watching {len(keeper.deadlines)} loans on {len(keeper.nodes)} nodes")
+    while True:
+        for node, loan_id in keeper.run_once():
+            print(f"Slashed loan {loan_id} of node {node}")
+        time.sleep(keeper.seconds_to_next_deadline(float(poll_interval)))
+
+
+class Keeper:
+    """
+    Slash deadlines of every current loan of one BNPLFactory
+    """
+
+    def __init__(
+        self,
+        factory,
+        account=None,
+        max_pending=MAX_PENDING,
+        min_out=0,
+        slippage=None,
+    ):
+        self.factory = Contract.from_abi(
+            BNPLFactory._name, str(factory), BNPLFactory.abi
+        )
+        self.account = account if account else get_account()
+        self.max_pending = max_pending
+        # swaps are sold at any price by default, set a slippage on forks / mainnet
+        self.min_out = min_out
+        self.slippage = slippage
+        self.quotes = None if slippage is None else Quotes.for_factory(self.factory)
+        self.bnpl = self.factory.BNPL()
+        self.nodes = {}  # address: BankingNode
+        self.grace_periods = {}  # address: gracePeriod
+        self.base_tokens = {}  # address: baseToken
+        self.collateral = {}  # (node address, loan_id): (collateral, collateralAmount)
+        self.deadlines = {}  # (node address, loan_id): slash deadline
+        self.heap = []  # (deadline, node address, loan_id), may hold stale entries
+        self.last_block = None
+        self._factory_contract = web3.eth.contract(
+            address=self.factory.address, abi=BNPLFactory.abi
+        )
+        self._factory_topics = event_topics(self._factory_contract, ["NewNode"])
+        self._node_contract = web3.eth.contract(abi=BankingNode.abi)
+        self._node_topics = event_topics(self._node_contract, LOAN_EVENTS)
+
+    def load(self):
+        """
+        Read every current loan and its deadline, at the latest block
+        """
+        block = web3.eth.block_number
+        books = read_loan_books(self.factory, block)
+        self._add_nodes(list(books), block)
+        self._update_loans(
+            [(node, loan_id) for node, loans in books.items() for loan_id in loans],
+            block,
+        )
+        self.last_block = block
+
+    def sync(self):
+        """
+        Update the deadlines of the loans and nodes in the events since the last sync
+        """
+        block = web3.eth.block_number
+        if block <= self.last_block:
+            return
+        from_block = self.last_block + 1
+        logs = self._get_logs(
+            [self.factory.address], self._factory_topics, from_block, block
+        )
+        new_nodes = [
+            self._factory_contract.events.NewNode().processLog(log)["args"]["_node"]
+            for log in logs
+        ]
+        self._add_nodes(new_nodes, block)
+
+        touched = set()
+        logs = self._get_logs(list(self.nodes), self._node_topics, from_block, block)
+        for log in logs:
+            name = self._node_topics[log["topics"][0].hex()]
+            event = getattr(self._node_contract.events, name)().processLog(log)
+            touched.add((log["address"], event["args"]["loanId"]))
+        self._update_loans(sorted(touched), block)
+        self.last_block = block
+
+    def due(self, timestamp):
+        """
+        Pop every loan that can be slashed in a block after `timestamp`
+        """
+        due = []
+        while self.heap and self.heap[0][0] < timestamp:
+            deadline, node, loan_id = heapq.heappop(self.heap)
+            if self.deadlines.get((node, loan_id)) == deadline:
+                del self.deadlines[(node, loan_id)]
+                due.append((node, loan_id))
+        return due
+
+    def run_once(self):
+        """
+        Sync, then slash every due loan and sell the slashed BNPL of their nodes
+        Returns the loans slashed
+        """
+        if self.last_block is None:
+            self.load()
+        else:
+            self.sync()
+        due = self.due(web3.eth.get_block("latest")["timestamp"])
+        if not due:
+            return []
+        if self.quotes:
+            self.quotes.refresh()
+        slashes = self._send(
+            [
+                (
+                    self.nodes[node].slashLoan,
+                    (loan_id, self._min_out(node, *self.collateral[(node, loan_id)])),
+                )
+                for node, loan_id in due
+            ]
+        )
+        slashed = [loan for loan, ok in zip(due, slashes) if ok]
+        failed = [loan for loan, ok in zip(due, slashes) if not ok]
+        # paid or slashed by someone else in the meantime, the next sync removes them
+        self._update_loans(failed, web3.eth.block_number)
+
+        nodes = sorted({node for node, _ in slashed})
+        balances = multicall([(self.nodes[node].slashingBalance,) for node in nodes])
+        sales = []
+        for node, balance in zip(nodes, balances):
+            if isinstance(balance, CallFailed):
+                print(f"slashingBalance of node {node} not read: {balance.revert_msg}")
+            elif balance > 0:
+                sales.append((node, balance))
+        if self.quotes:
+            self.quotes.refresh()
+        self._send(
+            [
+                (
+                    self.nodes[node].sellSlashed,
+                    (self._min_out(node, self.bnpl, balance),),
+                )
+                for node, balance in sales
+            ]
+        )
+        return slashed
+
+    def seconds_to_next_deadline(self, poll_interval=POLL_INTERVAL):
+        """
+        Seconds until the earliest deadline passes, at most poll_interval
+        """
+        while self.heap:
+            deadline, node, loan_id = self.heap[0]
+            if self.deadlines.get((node, loan_id)) == deadline:
+                now = web3.eth.get_block("latest")["timestamp"]
+                return max(min(deadline + 1 - now, poll_interval), 0)
+            heapq.heappop(self.heap)
+        return poll_interval
+
+    def _add_nodes(self, addresses, block):
+        addresses = [address for address in addresses if address not in self.nodes]
+        for address in addresses:
+            self.nodes[address] = Contract.from_abi(
+                BankingNode._name, address, BankingNode.abi
+            )
+        results = multicall(
+            [
+                method
+                for address in addresses
+                for method in [
+                    (self.nodes[address].gracePeriod,),
+                    (self.nodes[address].baseToken,),
+                ]
+            ],
+            block,
+        )
+        self.grace_periods.update(zip(addresses, results[::2]))
+        self.base_tokens.update(zip(addresses, results[1::2]))
+
+    def _update_loans(self, loans, block):
+        """
+        Read the deadlines of the given loans, removing the loans that are not current
+        """
+        results = multicall(
+            [
+                method
+                for node, loan_id in loans
+                for method in [
+                    (self.nodes[node].getNextDueDate, loan_id),
+                    (self.nodes[node].idToLoan, loan_id),
+                ]
+            ],
+            block,
+        )
+        for i, (node, loan_id) in enumerate(loans):
+            due_date, terms = results[2 * i], results[2 * i + 1]
+            # not yet approved, paid off or slashed
+            if due_date == 0 or terms[2] == 0 or terms[11]:
+                self.deadlines.pop((node, loan_id), None)
+                self.collateral.pop((node, loan_id), None)
+                continue
+            self.collateral[(node, loan_id)] = (terms[9], terms[10])
+            if self.quotes and terms[10] > 0:
+                self.quotes.add_tokens(terms[9])
+            deadline = due_date + self.grace_periods[node]
+            if self.deadlines.get((node, loan_id)) != deadline:
+                self.deadlines[(node, loan_id)] = deadline
+                heapq.heappush(self.heap, (deadline, node, loan_id))
+
+    def _min_out(self, node, token_in, amount_in):
+        """
+        minOut of selling amount_in of token_in for the base token of the node
+        Quotes are applied to the cached reserves, as the sales of a round follow
+        each other in the same few blocks
+        """
+        if amount_in == 0:
+            # nothing to sell, e.g. a loan without collateral
+            return 0
+        if self.quotes is None:
+            return self.min_out
+        try:
+            amount_out = self.quotes.swap(amount_in, token_in, self.base_tokens[node])
+        except Revert as error:
+            print(f"No quote for {amount_in} of {token_in}: {error}")
+            return self.min_out
+        return apply_slippage(amount_out, self.slippage)
+
+    def _get_logs(self, addresses, topics, from_block, to_block):
+        logs = []
+        for start in range(0, len(addresses), ADDRESSES_PER_CALL):
+            logs += web3.eth.get_logs(
+                {
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "address": addresses[start : start + ADDRESSES_PER_CALL],
+                    "topics": [list(topics)],
+                }
+            )
+        return logs
+
+    def _send(self, calls):
+        """
+        Send the transactions with consecutive nonces, max_pending at a time
+        Returns whether each transaction succeeded
+        """
+        nonce = web3.eth.get_transaction_count(str(self.account), "pending")
+        pending = deque()
+        results = []
+        for method, args in calls:
+            if len(pending) >= self.max_pending:
+                results.append(_confirmed(pending.popleft()))
+            try:
+                tx = method(
+                    *args,
+                    {"from": self.account, "nonce": nonce, "required_confs": 0},
+                )
+            except (VirtualMachineError, ValueError) as error:
+                # reverts when estimating gas, no nonce used
+                print(f"{method._name}{args} not sent: {error}")
+                pending.append(None)
+                continue
+            nonce += 1
+            pending.append(tx)
+        while pending:
+            results.append(_confirmed(pending.popleft()))
+        return results
+
+
+def _confirmed(tx):
+    if tx is None:
+        return False
+    tx.wait(1)
+    return tx.status == 1
@@ -0,0 +1,190 @@
+"""
+Client for contracts/NodeLens.sol, reads a whole BankingNode in one eth_call
+
+The lens does not need to be deployed: by default its runtime bytecode is placed at
+LENS_OVERRIDE_ADDRESS with an eth_call state override (supported by geth, erigon,
+anvil and most RPC providers). Pass a deployed NodeLens as `lens` on nodes that do
+not support state overrides.
+
+    from scripts.lens import get_node_snapshot
+    snapshot = get_node_snapshot(node)
+    for loan in snapshot.current_loans:
+        print(loan.loan_id, loan.next_payment, loan.next_due_date)
+
+Nodes with too many loans for one call are read a page at a time with iter_loans, from
+BankingNode.getCurrentLoans / getPendingRequests:
+
+    for loan in iter_loans(node):
+        print(loan.loan_id, loan.next_payment, loan.next_due_date)
+"""
+from dataclasses import dataclass
+from typing import List
+
+from brownie import NodeLens, web3
+from brownie.convert.normalize import format_output
+from brownie.convert.utils import get_type_strings
+from eth_abi import decode_abi
+from hexbytes import HexBytes
+
+# Arbitrary address the lens bytecode is placed at when it is not deployed
+LENS_OVERRIDE_ADDRESS = "0x0000000000000000000000000000000000001e05"
+# Loans per getCurrentLoans / getPendingRequests call, about 15M gas at 30k gas a loan
+PAGE_SIZE = 500
+
+
+@dataclass(frozen=True)
+class LoanTerms:
+    borrower: str
+    interest_only: bool
+    loan_start_time: int
+    loan_amount: int
+    payment_interval: int
+    interest_rate: int
+    number_of_payments: int
+    principal_remaining: int
+    payments_made: int
+    collateral: str
+    collateral_amount: int
+    is_slashed: bool
+
+    @classmethod
+    def from_packed(cls, values):
+        """
+        Terms, agent and periodic payment from the packed BankingNode.Loan struct
+        """
+        (
+            borrower,
+            loan_amount,
+            agent,
+            principal_remaining,
+            collateral,
+            collateral_amount,
+            payment_amount,
+            loan_start_time,
+            payment_interval,
+            interest_rate,
+            number_of_payments,
+            payments_made,
+            interest_only,
+            is_slashed,
+        ) = values
+        terms = cls(
+            borrower,
+            interest_only,
+            loan_start_time,
+            loan_amount,
+            payment_interval,
+            interest_rate,
+            number_of_payments,
+            principal_remaining,
+            payments_made,
+            collateral,
+            collateral_amount,
+            is_slashed,
+        )
+        return terms, agent, payment_amount
+
+
+@dataclass(frozen=True)
+class LoanSnapshot:
+    loan_id: int
+    terms: LoanTerms
+    agent: str
+    payment_amount: int
+    next_payment: int
+    next_due_date: int
+
+    @classmethod
+    def from_tuple(cls, values):
+        loan_id, terms, *values = values
+        return cls(loan_id, LoanTerms(*terms), *values)
+
+
+@dataclass(frozen=True)
+class NodeSnapshot:
+    node: str
+    operator: str
+    base_token: str
+    grace_period: int
+    require_kyc: bool
+    time_created: int
+    total_supply: int
+    total_asset_value: int
+    accounts_receiveable: int
+    staked_bnpl: int
+    total_staking_shares: int
+    unbonding_amount: int
+    slashing_balance: int
+    defaulted_loan_count: int
+    total_default_loss: int
+    pending_requests: List[int]
+    current_loans: List[LoanSnapshot]
+    block_number: int
+    timestamp: int
+
+    @classmethod
+    def from_tuple(cls, values):
+        values = list(values)
+        values[15] = list(values[15])
+        values[16] = [LoanSnapshot.from_tuple(loan) for loan in values[16]]
+        return cls(*values)
+
+
+def get_node_snapshot(node, lens=None, block_identifier="latest"):
+    """
+    Snapshot of a node: balances, staking, defaults, pending request ids and every
+    current loan with its next payment and due date, all read at the same block
+    """
+    address = lens.address if lens else LENS_OVERRIDE_ADDRESS
+    # encoded from the ABI, brownie cannot load a Contract at the empty override address
+    calldata = web3.eth.contract(abi=NodeLens.abi).encodeABI(
+        fn_name="getNodeSnapshot", args=[str(node)]
+    )
+    output = _eth_call(address, calldata, block_identifier, lens is None)
+    return NodeSnapshot.from_tuple(_decode_output("getNodeSnapshot", output))
+
+
+def _decode_output(fn_name, output):
+    """
+    Return value of a NodeLens function, formatted like a brownie contract call
+    """
+    abi = next(item for item in NodeLens.abi if item.get("name") == fn_name)
+    values = decode_abi(get_type_strings(abi["outputs"]), HexBytes(output))
+    return format_output(abi, values)[0]
+
+
+def _eth_call(address, calldata, block_identifier, override):
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+    params = [{"to": address, "data": calldata}, block_identifier]
+    if override:
+        code = "0x" + NodeLens._build["deployedBytecode"].replace("0x", "", 1)
+        params.append({address: {"code": code}})
+    response = web3.provider.make_request("eth_call", params)
+    if "error" in response:
+        raise ValueError(f"NodeLens call failed: {response['error']}")
+    return response["result"]
+
+
+def iter_loans(node, pending=False, page_size=PAGE_SIZE, block_identifier=None):
+    """
+    Every current loan (or pending request) of a node as a LoanSnapshot, a page per call
+    All pages are read at the same block
+    """
+    if block_identifier is None:
+        block_identifier = web3.eth.block_number
+    get_loans = node.getPendingRequests if pending else node.getCurrentLoans
+    offset = 0
+    while True:
+        loan_ids, loans, next_payments, next_due_dates = get_loans(
+            offset, page_size, block_identifier=block_identifier
+        )
+        for values in zip(loan_ids, loans, next_payments, next_due_dates):
+            loan_id, loan, next_payment, next_due_date = values
+            terms, agent, payment_amount = LoanTerms.from_packed(loan)
+            yield LoanSnapshot(
+                loan_id, terms, agent, payment_amount, next_payment, next_due_date
+            )
+        if len(loan_ids) < page_size:
+            return
+        offset += page_size
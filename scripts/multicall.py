@@ -0,0 +1,173 @@
+"""
+Batched view calls through a Multicall3 aggregator, many reads in one eth_call
+
+Calls are any brownie contract method (BankingNode, BNPLFactory, BNPLRewardsController
+...) with its arguments. Results are decoded like a direct call. A call that reverts
+returns a CallFailed instead of failing the whole batch, as does a call to an address
+without code. Batches larger than `batch_size` calls are split over several eth_calls.
+
+    from scripts.multicall import Multicall
+    multicall = Multicall()
+    balance = multicall.add(node.getBaseTokenBalance, account)
+    node_address = multicall.add(factory.operatorToNode, account)
+    results = multicall.call()
+    results[balance], results[node_address]
+
+On networks without Multicall3 (the development network) an aggregator is deployed
+the first time it is needed.
+"""
+from eth_abi import decode_abi
+from brownie import BankingNode, Contract, Multicall3, web3
+
+from scripts.helper import get_account
+
+# Multicall3 is deployed at the same address on mainnet, kovan and most other networks
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+BATCH_SIZE = 500  # calls per eth_call, keeps each call well under RPC gas caps
+ERROR_SELECTOR = "0x08c379a0"  # Error(string)
+
+
+class CallFailed:
+    """
+    Result of a call that reverted, in place of its decoded output
+    """
+
+    def __init__(self, method, args, return_data):
+        self.method = method
+        self.args = args
+        self.return_data = return_data
+
+    @property
+    def revert_msg(self):
+        data = self.return_data.hex()
+        if not data.startswith("0x"):
+            data = "0x" + data
+        if data.startswith(ERROR_SELECTOR):
+            return decode_abi(["string"], bytes.fromhex(data[10:]))[0]
+        # custom error or no reason, the selector is left to the caller to decode
+        return data
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"<CallFailed {self.method._name}{tuple(self.args)}: {self.revert_msg}>"
+
+
+def get_multicall(account=None):
+    """
+    The canonical Multicall3, or a Multicall3 deployed from this project
+    """
+    if len(web3.eth.get_code(MULTICALL3_ADDRESS)) > 0:
+        return Contract.from_abi("Multicall3", MULTICALL3_ADDRESS, Multicall3.abi)
+    if len(Multicall3) > 0:
+        return Multicall3[-1]
+    print("Deploying Multicall3...")
+    return Multicall3.deploy({"from": account if account else get_account()})
+
+
+class Multicall:
+    """
+    Collects view calls, then makes all of them with call()
+    """
+
+    def __init__(self, aggregator=None, batch_size=BATCH_SIZE):
+        self.aggregator = aggregator if aggregator else get_multicall()
+        self.batch_size = batch_size
+        self.calls = []
+
+    def add(self, method, *args):
+        """
+        Queue `method(*args)`, returns the index of its result
+        """
+        self.calls.append((method, args))
+        return len(self.calls) - 1
+
+    def call(self, block_identifier=None):
+        """
+        Results of every queued call in order, then clears the queue
+        Failed calls are returned as CallFailed
+        """
+        calls, self.calls = self.calls, []
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            batch = calls[start : start + self.batch_size]
+            encoded = [
+                (method._address, True, method.encode_input(*args))
+                for method, args in batch
+            ]
+            returned = self.aggregator.aggregate3.call(
+                encoded, block_identifier=block_identifier
+            )
+            for (method, args), (success, return_data) in zip(batch, returned):
+                # calls to an address without code succeed with no return data
+                if success and (return_data or not method.abi["outputs"]):
+                    results.append(method.decode_output(return_data.hex()))
+                else:
+                    results.append(CallFailed(method, args, return_data))
+        return results
+
+
+def multicall(calls, block_identifier=None):
+    """
+    Results of a list of (method, *args) tuples, in one or a few eth_calls
+    """
+    batch = Multicall()
+    for method, *args in calls:
+        batch.add(method, *args)
+    return batch.call(block_identifier)
+
+
+def read_loan_books(factory, block_identifier=None):
+    """
+    Every current loan of every node of a factory, as {node: {loan_id: idToLoan}}
+    Four round trips whatever the number of nodes and loans, read at the same block
+    Raises ValueError naming the node index, node or loan whose call failed
+    """
+    if block_identifier is None:
+        block_identifier = web3.eth.block_number
+    node_count = factory.bankingNodeCount(block_identifier=block_identifier)
+    addresses = multicall(
+        [(factory.bankingNodesList, i) for i in range(node_count)], block_identifier
+    )
+    for i, address in enumerate(addresses):
+        if isinstance(address, CallFailed):
+            raise ValueError(
+                f"bankingNodesList failed at index {i}: {address.revert_msg}"
+            )
+    nodes = [
+        Contract.from_abi(BankingNode._name, address, BankingNode.abi)
+        for address in addresses
+    ]
+    counts = multicall(
+        [(node.getCurrentLoansCount,) for node in nodes], block_identifier
+    )
+    for node, count in zip(nodes, counts):
+        if isinstance(count, CallFailed):
+            raise ValueError(
+                f"getCurrentLoansCount failed on node {node.address}: "
+                f"{count.revert_msg}"
+            )
+    positions = [(node, i) for node, count in zip(nodes, counts) for i in range(count)]
+    loan_ids = multicall(
+        [(node.currentLoans, i) for node, i in positions], block_identifier
+    )
+    for (node, i), loan_id in zip(positions, loan_ids):
+        if isinstance(loan_id, CallFailed):
+            raise ValueError(
+                f"currentLoans({i}) failed on node {node.address}: "
+                f"{loan_id.revert_msg}"
+            )
+    loans = multicall(
+        [(node.idToLoan, loan_id) for (node, _), loan_id in zip(positions, loan_ids)],
+        block_identifier,
+    )
+    books = {node.address: {} for node in nodes}
+    for (node, _), loan_id, loan in zip(positions, loan_ids, loans):
+        if isinstance(loan, CallFailed):
+            raise ValueError(
+                f"idToLoan({loan_id}) failed on node {node.address}: "
+                f"{loan.revert_msg}"
+            )
+        books[node.address][loan_id] = loan
+    return books
@@ -0,0 +1,174 @@
+"""
+Local swap quotes for the tokenIn -> WETH -> tokenOut route of BankingNode._swapToken
+
+refresh() reads the reserves of the token/WETH pair of every token in one multicall
+and caches them for the block. Quotes are then computed locally with the integer
+maths of UniswapV2Library.getAmountOut, so any number of them costs no RPC call and
+matches what the node receives when the swap is mined in that block.
+
+    from scripts.quotes import Quotes
+    quotes = Quotes.for_factory(factory)          # BNPL and every stablecoin
+    quotes.refresh()
+    min_out = quotes.min_out(collateral_amount, dai, usdt, slippage=0.01)
+    node.slashLoan(loan_id, min_out, {"from": account})
+
+swap() also applies a quoted swap to the cached reserves, for quoting several swaps
+made one after the other in the same block (e.g. slashLoan then sellSlashed).
+"""
+from brownie import config, interface, network, web3
+from brownie.network.contract import ContractCall
+
+from scripts.multicall import multicall
+from scripts.swap_math import Revert, get_amount_out, pair_for
+
+SLIPPAGE = 0.005  # default tolerance of min_out, 0.5%
+STABLECOINS = ["usdt", "usdc", "dai", "busd"]
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def apply_slippage(amount_out, slippage=SLIPPAGE):
+    """
+    amount_out less `slippage` (e.g. 0.005 for 0.5%), rounded down to the basis point
+    """
+    return amount_out * (10000 - round(slippage * 10000)) // 10000
+
+
+class Quotes:
+    """
+    Reserves of the token/WETH pairs of a set of tokens, cached per block
+    """
+
+    def __init__(self, tokens, weth=None, uniswap_factory=None):
+        network_config = config["networks"][network.show_active()]
+        self.weth = web3.toChecksumAddress(
+            str(weth if weth else network_config["weth"])
+        )
+        self.uniswap_factory = str(
+            uniswap_factory if uniswap_factory else network_config["factory"]
+        )
+        self.tokens = []
+        self.block = None
+        self.reserves = {}  # token: (token reserve, WETH reserve), None without a pair
+        self.add_tokens(*tokens)
+
+    @classmethod
+    def for_factory(cls, bnpl_factory):
+        """
+        Quotes for the BNPL token of the factory and every stablecoin of the network
+        """
+        network_config = config["networks"][network.show_active()]
+        tokens = [bnpl_factory.BNPL()] + [
+            network_config[key]
+            for key in STABLECOINS
+            if network_config.get(key, ZERO_ADDRESS) != ZERO_ADDRESS
+        ]
+        return cls(tokens, bnpl_factory.WETH(), bnpl_factory.uniswapFactory())
+
+    def add_tokens(self, *tokens):
+        """
+        Add tokens to quote, their reserves are read on the next refresh
+        """
+        for token in tokens:
+            token = web3.toChecksumAddress(str(token))
+            if token != self.weth and token not in self.tokens:
+                self.tokens.append(token)
+                self.block = None
+
+    def refresh(self, block_identifier=None):
+        """
+        Read the reserves of every pair, unless they were read at this block already
+        """
+        block = block_identifier
+        if block is None:
+            block = web3.eth.block_number
+        if block == self.block:
+            return
+        abi = next(
+            item
+            for item in interface.IUniswapV2Pair.abi
+            if item.get("name") == "getReserves"
+        )
+        # built from the ABI, brownie cannot load a contract where no pair is deployed
+        calls = [
+            (
+                ContractCall(
+                    pair_for(self.uniswap_factory, token, self.weth),
+                    abi,
+                    "IUniswapV2Pair.getReserves",
+                    None,
+                ),
+            )
+            for token in self.tokens
+        ]
+        results = multicall(calls, block)
+        self.reserves = {}
+        for token, result in zip(self.tokens, results):
+            # no pair deployed for this token
+            if not result:
+                self.reserves[token] = None
+                continue
+            reserve0, reserve1, _ = result
+            if int(token, 16) < int(self.weth, 16):
+                self.reserves[token] = (reserve0, reserve1)
+            else:
+                self.reserves[token] = (reserve1, reserve0)
+        self.block = block
+
+    def get_amount_out(self, amount_in, token_in, token_out):
+        """
+        Output of _swapToken(token_in, token_out, 0, amount_in) at the cached block
+        Raises Revert where the swap would revert (no pair, no liquidity, no input)
+        """
+        amount = amount_in
+        for token, to_weth in self._route(token_in, token_out):
+            amount = get_amount_out(amount, *self._hop_reserves(token, to_weth))
+        return amount
+
+    def min_out(self, amount_in, token_in, token_out, slippage=SLIPPAGE):
+        """
+        minOut for the swap, the quoted output less `slippage` (e.g. 0.005 for 0.5%)
+        """
+        return apply_slippage(
+            self.get_amount_out(amount_in, token_in, token_out), slippage
+        )
+
+    def swap(self, amount_in, token_in, token_out):
+        """
+        Quote the swap and apply it to the cached reserves, returns the output
+        """
+        amount = amount_in
+        for token, to_weth in self._route(token_in, token_out):
+            amount_out = get_amount_out(amount, *self._hop_reserves(token, to_weth))
+            token_reserve, weth_reserve = self.reserves[token]
+            if to_weth:
+                token_reserve += amount
+                weth_reserve -= amount_out
+            else:
+                token_reserve -= amount_out
+                weth_reserve += amount
+            self.reserves[token] = (token_reserve, weth_reserve)
+            amount = amount_out
+        return amount
+
+    def _route(self, token_in, token_out):
+        """
+        Hops of the swap as (token of the pair, whether the hop sells it for WETH)
+        """
+        if self.block is None:
+            self.refresh()
+        token_in = web3.toChecksumAddress(str(token_in))
+        token_out = web3.toChecksumAddress(str(token_out))
+        route = [(token_out, False)]
+        # _swapToken skips the first hop when selling WETH
+        if token_in != self.weth:
+            route.insert(0, (token_in, True))
+        return route
+
+    def _hop_reserves(self, token, to_weth):
+        reserves = self.reserves.get(token)
+        if reserves is None:
+            raise Revert(f"no {token}/WETH pair quoted")
+        token_reserve, weth_reserve = reserves
+        if to_weth:
+            return token_reserve, weth_reserve
+        return weth_reserve, token_reserve
@@ -0,0 +1,828 @@
+"""
+Integer simulator of BankingNode economics, for fast stress scenarios
+
+Reproduces the share, staking, loan and slashing maths of contracts/BankingNode.sol wei
+for wei, with the AAVE lending pool replaced by the linear yield of
+contracts/mocks/MockLendingPool.sol and Sushiswap by constant product pairs with the
+0.3% fee (the two hop tokenIn -> WETH -> tokenOut route of _swapToken). Calls that the
+contract would revert raise Revert with the contract's error name.
+
+Nothing here needs brownie, so scenarios run in plain Python processes:
+
+    brownie run scripts/simulator.py                        # 1000 scenarios
+    brownie run scripts/simulator.py main 100000 200 8      # 200 steps, 8 processes
+
+    from scripts.simulator import Simulator
+    sim = Simulator()
+    sim.deposit("lender", 1000 * 10**6)
+    loan_id = sim.request_loan("borrower", 100 * 10**6, 2628000, 12, 83)
+    sim.approve_loan(loan_id)
+    sim.sleep(2628000 * 2)
+    sim.slash_loan(loan_id)
+
+tests/test_simulator_parity.py replays random traces against the contracts on the
+development network and checks the state matches after every step.
+
+Every action checks all of its requirements before changing any state, so like a
+reverted transaction, an action that raises Revert leaves the state unchanged.
+"""
+import random
+import statistics
+from multiprocessing import Pool
+
+from scripts.amortization import payment_amount
+from scripts.swap_math import Revert, get_amount_out
+
+RAY = 10**27
+SECONDS_PER_YEAR = 365 * 24 * 3600
+ACTIVE_BOND = 0x13DA329B6336471800000  # 1.5M BNPL, for the node to be active
+UNBONDING_BLOCKS = 46523
+MAX_LOAN_DURATION = 157680000
+MIN_LOAN_AMOUNT = 10000000
+MAX_UINT96 = 2**96 - 1
+MAX_UINT16 = 2**16 - 1
+BLOCK_TIME = 13
+
+OPERATOR = "operator"
+TREASURY = "treasury"
+BASE = "base"
+BNPL = "bnpl"
+WETH = "weth"
+COLLATERAL = "collateral"
+
+
+def _require(condition, error):
+    if not condition:
+        raise Revert(error)
+
+
+def _sub(a, b):
+    # checked arithmetic underflow
+    _require(a >= b, "Panic")
+    return a - b
+
+
+def ray_mul(a, b):
+    return (a * b + RAY // 2) // RAY
+
+
+def ray_div(a, b):
+    return (a * RAY + b // 2) // b
+
+
+class LendingPool:
+    """
+    Same integer maths as MockLendingPool / MockAToken: a ray liquidity index growing
+    linearly at a yearly rate, and balances stored scaled by the index
+    """
+
+    def __init__(self):
+        self.reserves = {}
+
+    def add_reserve(self, asset, liquidity_rate, liquidity_index=RAY, last_update=0):
+        self.reserves[asset] = {
+            "index": liquidity_index,
+            "rate": liquidity_rate,
+            "last_update": last_update,
+            "scaled": {},
+        }
+
+    def normalized_income(self, asset, now):
+        reserve = self.reserves[asset]
+        time_delta = now - reserve["last_update"]
+        if time_delta == 0:
+            return reserve["index"]
+        linear_interest = RAY + (reserve["rate"] * time_delta) // SECONDS_PER_YEAR
+        return (reserve["index"] * linear_interest + RAY // 2) // RAY
+
+    def balance_of(self, asset, user, now):
+        scaled = self.reserves[asset]["scaled"].get(user, 0)
+        return ray_mul(scaled, self.normalized_income(asset, now))
+
+    def deposit(self, asset, amount, user, now):
+        scaled_amount = self.check_deposit(asset, amount, now)
+        self._update_index(asset, now)
+        scaled = self.reserves[asset]["scaled"]
+        scaled[user] = scaled.get(user, 0) + scaled_amount
+
+    def withdraw(self, asset, amount, user, now):
+        scaled_amount = self.check_withdraw(asset, [amount], user, now)
+        self._update_index(asset, now)
+        scaled = self.reserves[asset]["scaled"]
+        scaled[user] = scaled.get(user, 0) - scaled_amount
+
+    def check_deposit(self, asset, amount, now):
+        """
+        Reverts where deposit would, returns the scaled amount it would mint
+        """
+        scaled_amount = ray_div(amount, self._index(asset, now))
+        _require(scaled_amount != 0, "aToken mint")
+        return scaled_amount
+
+    def check_withdraw(self, asset, amounts, user, now, deposited=0):
+        """
+        Reverts where withdrawing each of amounts in turn would, after a deposit of
+        `deposited`, returns the total scaled amount it would burn
+        """
+        index = self._index(asset, now)
+        balance = self.reserves[asset]["scaled"].get(user, 0)
+        if deposited:
+            balance += ray_div(deposited, index)
+        total = 0
+        for amount in amounts:
+            scaled_amount = ray_div(amount, index)
+            _require(scaled_amount != 0, "aToken burn")
+            balance = _sub(balance, scaled_amount)
+            total += scaled_amount
+        return total
+
+    def _index(self, asset, now):
+        _require(asset in self.reserves, "reserve not listed")
+        return self.normalized_income(asset, now)
+
+    def _update_index(self, asset, now):
+        reserve = self.reserves[asset]
+        reserve["index"] = self.normalized_income(asset, now)
+        reserve["last_update"] = now
+
+
+class Exchange:
+    """
+    Constant product token/WETH pairs, swapped through like BankingNode._swapToken
+    """
+
+    def __init__(self):
+        self.pairs = {}  # token: {token: reserve, WETH: reserve}
+
+    def add_pair(self, token, token_reserve, weth_reserve):
+        self.pairs[token] = {token: token_reserve, WETH: weth_reserve}
+
+    def quote(self, token_in, token_out, amount_in):
+        """
+        Output of swap_token without changing the reserves
+        """
+        amount = amount_in
+        for pair, token_a, token_b in self._route(token_in, token_out):
+            amount = get_amount_out(amount, pair[token_a], pair[token_b])
+        return amount
+
+    def check_swap(self, token_in, token_out, min_out, amount_in):
+        """
+        Reverts where swap_token would, returns its output
+        """
+        _require(amount_in != 0, "ZeroInput")
+        amount = amount_in
+        for pair, token_a, token_b in self._route(token_in, token_out):
+            amount = get_amount_out(amount, pair[token_a], pair[token_b])
+            _require(amount > 0, "UniswapV2: INSUFFICIENT_OUTPUT_AMOUNT")
+        _require(min_out <= amount, "InsufficentOutput")
+        return amount
+
+    def swap_token(self, token_in, token_out, min_out, amount_in):
+        amount_out = self.check_swap(token_in, token_out, min_out, amount_in)
+        amount = amount_in
+        for pair, token_a, token_b in self._route(token_in, token_out):
+            hop_out = get_amount_out(amount, pair[token_a], pair[token_b])
+            pair[token_a] += amount
+            pair[token_b] -= hop_out
+            amount = hop_out
+        return amount_out
+
+    def _route(self, token_in, token_out):
+        route = []
+        if token_in != WETH:
+            route.append((self.pairs[token_in], token_in, WETH))
+        route.append((self.pairs[token_out], WETH, token_out))
+        return route
+
+
+class Loan:
+    """
+    Same fields as BankingNode.Loan
+    """
+
+    def __init__(
+        self,
+        borrower,
+        loan_amount,
+        agent,
+        payment_interval,
+        interest_rate,
+        number_of_payments,
+        interest_only,
+        collateral,
+        collateral_amount,
+    ):
+        self.borrower = borrower
+        self.loan_amount = loan_amount
+        self.agent = agent
+        self.principal_remaining = 0
+        self.collateral = collateral
+        self.collateral_amount = collateral_amount
+        self.payment_amount = 0
+        self.loan_start_time = 0
+        self.payment_interval = payment_interval
+        self.interest_rate = interest_rate
+        self.number_of_payments = number_of_payments
+        self.payments_made = 0
+        self.interest_only = interest_only
+        self.is_slashed = False
+
+
+class Simulator:
+    """
+    State of one banking node, its lending pool and its swap pairs
+    Users are any hashable names, token balances of users are not tracked
+    """
+
+    def __init__(
+        self,
+        decimals=6,
+        grace_period=0,
+        liquidity_rate=2 * 10**25,
+        bond=2000000 * 10**18,
+        pairs=None,
+        now=0,
+        block=0,
+    ):
+        self.now = now
+        self.block = block
+        self.decimals = decimals
+        self.decimal_adjust = 10 ** (18 - decimals)
+        self.grace_period = grace_period
+        self.pool = LendingPool()
+        self.pool.add_reserve(BASE, liquidity_rate, last_update=now)
+        self.pool.add_reserve(COLLATERAL, liquidity_rate, last_update=now)
+        self.exchange = Exchange()
+        if pairs is None:
+            # 1 WETH = 1000 base tokens = 1000 collateral = 10,000 BNPL
+            pairs = {
+                BASE: (10**6 * 10**decimals, 1000 * 10**18),
+                COLLATERAL: (10**6 * 10**18, 1000 * 10**18),
+                BNPL: (10**7 * 10**18, 1000 * 10**18),
+            }
+        for token, (token_reserve, weth_reserve) in pairs.items():
+            self.exchange.add_pair(token, token_reserve, weth_reserve)
+
+        # pUSD
+        self.balances = {}
+        self.total_supply = 0
+        # tokens held by the node, outside of the lending pool
+        self.base_balance = 0
+        self.bnpl_balance = 0
+        # loans
+        self.loans = {}
+        self.pending_requests = []
+        self.current_loans = []
+        self._pending_index = {}
+        self._current_index = {}
+        self.defaulted_loans = []
+        self.total_default_loss = 0
+        self.collateral_owed = 0
+        self.incrementor = 0
+        self.accounts_receiveable = 0
+        # staking
+        self.staking_shares = {}
+        self.total_staking_shares = 0
+        self.unbonding_shares = {}
+        self.total_unbonding_shares = 0
+        self.unbonding_amount = 0
+        self.slashing_balance = 0
+        self.unbond_block = {}
+        if bond:
+            self.stake(OPERATOR, bond, from_factory=True)
+
+    # TIME
+
+    def sleep(self, seconds, blocks=None):
+        self.now += seconds
+        self.block += seconds // BLOCK_TIME if blocks is None else blocks
+
+    # VIEWS
+
+    def get_total_asset_value(self):
+        return (
+            self.pool.balance_of(BASE, "node", self.now) + self.accounts_receiveable
+        )
+
+    def get_staked_bnpl(self):
+        return _sub(
+            _sub(self.bnpl_balance, self.unbonding_amount), self.slashing_balance
+        )
+
+    def get_bnpl_balance(self, user):
+        if self.total_staking_shares == 0:
+            return 0
+        return (
+            self.staking_shares.get(user, 0)
+            * self.get_staked_bnpl()
+            // self.total_staking_shares
+        )
+
+    def get_base_token_balance(self, user):
+        if self.total_supply == 0:
+            return 0
+        return (
+            self.balances.get(user, 0) * self.get_total_asset_value()
+        ) // self.total_supply
+
+    def get_unbonding_balance(self, user):
+        if self.total_unbonding_shares == 0:
+            return 0
+        return (
+            self.unbonding_shares.get(user, 0)
+            * self.unbonding_amount
+            // self.total_unbonding_shares
+        )
+
+    def get_next_payment(self, loan_id):
+        loan = self.loans[loan_id]
+        if loan.principal_remaining == 0:
+            return 0
+        payoff = (
+            loan.principal_remaining
+            + loan.principal_remaining * loan.interest_rate // 10000
+        )
+        if loan.payments_made + 1 == loan.number_of_payments:
+            return payoff
+        return min(loan.payment_amount, payoff)
+
+    def get_next_due_date(self, loan_id):
+        loan = self.loans[loan_id]
+        if loan.principal_remaining == 0:
+            return 0
+        return loan.loan_start_time + (loan.payments_made + 1) * loan.payment_interval
+
+    def share_price(self):
+        """
+        Base tokens per 1e18 pUSD, scaled by 1e18
+        """
+        if self.total_supply == 0:
+            return 0
+        return self.get_total_asset_value() * self.decimal_adjust * 10**18 // (
+            self.total_supply
+        )
+
+    # LENDERS
+
+    def deposit(self, user, amount):
+        self._ensure_node_active(user)
+        _require(amount != 0, "ZeroInput")
+        total_asset_value = self.get_total_asset_value()
+        _require(
+            not (total_asset_value == 0 and amount < 10000000),
+            "InvalidInitialDeposit",
+        )
+        what = amount * self.decimal_adjust
+        if self.total_supply != 0:
+            _require(total_asset_value != 0, "Panic")
+            what = amount * self.total_supply // total_asset_value
+        self.pool.check_deposit(BASE, amount, self.now)
+        self.balances[user] = self.balances.get(user, 0) + what
+        self.total_supply += what
+        self.pool.deposit(BASE, amount, "node", self.now)
+        return what
+
+    def withdraw(self, user, amount):
+        _require(amount != 0, "ZeroInput")
+        balance = self.balances.get(user, 0)
+        total_asset_value = self.get_total_asset_value()
+        _require(
+            self.total_supply != 0
+            and balance * total_asset_value // self.total_supply >= amount,
+            "InsufficientBalance",
+        )
+        what = amount * self.total_supply // total_asset_value
+        _require(balance >= what, "ERC20: burn amount exceeds balance")
+        self.pool.check_withdraw(BASE, [amount], "node", self.now)
+        self.balances[user] = balance - what
+        self.total_supply -= what
+        self.pool.withdraw(BASE, amount, "node", self.now)
+        return what
+
+    # STAKERS
+
+    def stake(self, user, amount, from_factory=False):
+        staker = OPERATOR if from_factory else user
+        if not from_factory:
+            self._ensure_node_active(user)
+        _require(amount != 0, "ZeroInput")
+        what = amount
+        if self.total_staking_shares > 0:
+            total_staked_bnpl = self.get_staked_bnpl()
+            _require(total_staked_bnpl != 0, "DonationRequired")
+            what = amount * self.total_staking_shares // total_staked_bnpl
+        self.bnpl_balance += amount
+        self.staking_shares[staker] = self.staking_shares.get(staker, 0) + what
+        self.total_staking_shares += what
+        return what
+
+    def initiate_unstake(self, user, amount):
+        _require(amount != 0, "ZeroInput")
+        _require(
+            not (user == OPERATOR and self.current_loans), "ActiveLoansOngoing"
+        )
+        _require(self.staking_shares.get(user, 0) >= amount, "InsufficientBalance")
+        what = amount * self.get_staked_bnpl() // self.total_staking_shares
+        self.unbond_block[user] = self.block
+        self.staking_shares[user] -= amount
+        self.total_staking_shares -= amount
+        new_unbonding_shares = what
+        if self.unbonding_amount != 0:
+            new_unbonding_shares = (
+                what * self.total_unbonding_shares // self.unbonding_amount
+            )
+        self.unbonding_shares[user] = (
+            self.unbonding_shares.get(user, 0) + new_unbonding_shares
+        )
+        self.total_unbonding_shares += new_unbonding_shares
+        self.unbonding_amount += what
+        return what
+
+    def unstake(self, user):
+        user_amount = self.unbonding_shares.get(user, 0)
+        _require(user_amount != 0, "ZeroInput")
+        _require(
+            self.block >= self.unbond_block.get(user, 0) + UNBONDING_BLOCKS,
+            "LoanStillUnbonding",
+        )
+        what = user_amount * self.unbonding_amount // self.total_unbonding_shares
+        unbonding_amount = _sub(self.unbonding_amount, what)
+        bnpl_balance = _sub(self.bnpl_balance, what)
+        self.unbonding_shares[user] = 0
+        self.unbonding_amount = unbonding_amount
+        self.total_unbonding_shares -= user_amount
+        self.bnpl_balance = bnpl_balance
+        return what
+
+    # LOANS
+
+    def request_loan(
+        self,
+        borrower,
+        loan_amount,
+        payment_interval,
+        number_of_payments,
+        interest_rate,
+        interest_only=False,
+        collateral_amount=0,
+        agent=None,
+    ):
+        self._ensure_node_active(borrower)
+        _require(
+            loan_amount >= MIN_LOAN_AMOUNT
+            and payment_interval != 0
+            and interest_rate != 0
+            and number_of_payments != 0,
+            "InvalidLoanInput",
+        )
+        _require(
+            loan_amount <= MAX_UINT96
+            and collateral_amount <= MAX_UINT96
+            and interest_rate <= MAX_UINT16
+            and number_of_payments <= MAX_UINT16,
+            "InvalidLoanInput",
+        )
+        _require(
+            payment_interval * number_of_payments <= MAX_LOAN_DURATION,
+            "MaximumLoanDurationExceeded",
+        )
+        if collateral_amount > 0:
+            self.pool.check_deposit(COLLATERAL, collateral_amount, self.now)
+        loan_id = self.incrementor
+        self.incrementor += 1
+        self._add_loan(self.pending_requests, self._pending_index, loan_id)
+        self.loans[loan_id] = Loan(
+            borrower,
+            loan_amount,
+            borrower if agent is None else agent,
+            payment_interval,
+            interest_rate,
+            number_of_payments,
+            interest_only,
+            COLLATERAL if collateral_amount else None,
+            collateral_amount,
+        )
+        if collateral_amount > 0:
+            self.collateral_owed += collateral_amount
+            self.pool.deposit(COLLATERAL, collateral_amount, "node", self.now)
+        return loan_id
+
+    def approve_loan(self, loan_id, required_collateral_amount=0):
+        _require(self.get_bnpl_balance(OPERATOR) >= ACTIVE_BOND, "NodeInactive")
+        loan = self.loans.get(loan_id)
+        # loans that were never requested are not simulated
+        _require(loan is not None, "Panic")
+        loan_size = loan.loan_amount
+        _require(loan.loan_start_time == 0, "LoanAlreadyStarted")
+        _require(
+            loan.collateral_amount >= required_collateral_amount,
+            "InsufficientCollateral",
+        )
+        payment = payment_amount(
+            loan_size, loan.interest_rate, loan.number_of_payments, loan.interest_only
+        )
+        _require(payment is not None, "Panic")
+        _require(payment <= MAX_UINT96, "InvalidLoanInput")
+        self.pool.check_withdraw(
+            BASE,
+            [loan_size * 199 // 200, loan_size // 400, loan_size // 400],
+            "node",
+            self.now,
+        )
+        self._remove_loan(self.pending_requests, self._pending_index, loan_id)
+        self._add_loan(self.current_loans, self._current_index, loan_id)
+        loan.principal_remaining = loan_size
+        loan.loan_start_time = self.now
+        loan.payment_amount = payment
+        self.pool.withdraw(BASE, loan_size * 199 // 200, "node", self.now)
+        self.accounts_receiveable += loan_size
+        self.pool.withdraw(BASE, loan_size // 400, "node", self.now)
+        self.pool.withdraw(BASE, loan_size // 400, "node", self.now)
+
+    def make_loan_payment(self, loan_id):
+        loan = self._loan_with_principal(loan_id)
+        _require(not loan.is_slashed, "LoanAlreadySlashed")
+        payment = self.get_next_payment(loan_id)
+        interest = loan.principal_remaining * loan.interest_rate // 10000
+        payments_made = loan.payments_made + 1
+        final_payment = payments_made == loan.number_of_payments
+        principal = 0
+        if not loan.interest_only:
+            principal = _sub(payment, interest)
+        elif final_payment:
+            principal = loan.principal_remaining
+        principal_remaining = _sub(loan.principal_remaining, principal)
+        if principal_remaining == 0:
+            # a payment capped at the payoff is the final one
+            payments_made = loan.number_of_payments
+            final_payment = True
+        deposit = payment - interest * 3 // 10
+        accounts_receiveable = _sub(self.accounts_receiveable, principal)
+        self.pool.check_deposit(BASE, deposit, self.now)
+        loan.payments_made = payments_made
+        loan.principal_remaining = principal_remaining
+        if final_payment:
+            self._remove_loan(self.current_loans, self._current_index, loan_id)
+        self.accounts_receiveable = accounts_receiveable
+        self.base_balance += payment - deposit
+        self.pool.deposit(BASE, deposit, "node", self.now)
+        return payment
+
+    def repay_early(self, loan_id):
+        loan = self._loan_with_principal(loan_id)
+        _require(not loan.is_slashed, "LoanAlreadySlashed")
+        principal = loan.principal_remaining
+        interest = principal * loan.interest_rate // 10000
+        payment = principal + interest
+        deposit = payment - interest * 3 // 10
+        accounts_receiveable = _sub(self.accounts_receiveable, principal)
+        self.pool.check_deposit(BASE, deposit, self.now)
+        self.accounts_receiveable = accounts_receiveable
+        loan.principal_remaining = 0
+        loan.payments_made = loan.number_of_payments
+        self._remove_loan(self.current_loans, self._current_index, loan_id)
+        self.base_balance += payment - deposit
+        self.pool.deposit(BASE, deposit, "node", self.now)
+        return payment
+
+    # DEFAULTS
+
+    def slash_loan(self, loan_id, min_out=0):
+        loan = self._loan_with_principal(loan_id)
+        _require(not loan.is_slashed, "LoanAlreadySlashed")
+        _require(
+            self.now > self.get_next_due_date(loan_id) + self.grace_period,
+            "LoanNotExpired",
+        )
+        # checks, in the order the contract makes the calls that can revert
+        base_token_out = 0
+        collateral_posted = loan.collateral_amount
+        if collateral_posted > 0:
+            self.pool.check_withdraw(COLLATERAL, [collateral_posted], "node", self.now)
+            base_token_out = self.exchange.check_swap(
+                COLLATERAL, BASE, min_out, collateral_posted
+            )
+            self.pool.check_deposit(BASE, base_token_out, self.now)
+        principal_lost = loan.principal_remaining
+        full_recovery = base_token_out >= principal_lost
+        if full_recovery:
+            # excess returned to the borrower, reverts if there is no excess
+            excess = base_token_out - principal_lost
+            _require(excess != 0, "ZeroInput")
+            self.pool.check_withdraw(
+                BASE, [excess], "node", self.now, deposited=base_token_out
+            )
+        else:
+            principal_lost -= base_token_out
+            accounts_receiveable = _sub(self.accounts_receiveable, principal_lost)
+            staked_bnpl = self.get_staked_bnpl()
+
+        if collateral_posted > 0:
+            self.collateral_owed -= collateral_posted
+            loan.collateral_amount = 0
+            self.pool.withdraw(COLLATERAL, collateral_posted, "node", self.now)
+            self.exchange.swap_token(COLLATERAL, BASE, min_out, collateral_posted)
+            self.pool.deposit(BASE, base_token_out, "node", self.now)
+        if full_recovery:
+            self.pool.withdraw(BASE, excess, "node", self.now)
+        else:
+            slash_percent = 10**12 * principal_lost // self.get_total_asset_value()
+            unbonding_slash = self.unbonding_amount * slash_percent // 10**12
+            staking_slash = staked_bnpl * slash_percent // 10**12
+            self.accounts_receiveable = accounts_receiveable
+            self.slashing_balance += unbonding_slash + staking_slash
+            self.unbonding_amount -= unbonding_slash
+        self.defaulted_loans.append(loan_id)
+        self.total_default_loss += loan.principal_remaining
+        loan.is_slashed = True
+        self._remove_loan(self.current_loans, self._current_index, loan_id)
+
+    def sell_slashed(self, min_out=0):
+        slashing_balance = self.slashing_balance
+        _require(slashing_balance != 0, "ZeroInput")
+        base_token_out = self.exchange.check_swap(BNPL, BASE, min_out, slashing_balance)
+        self.pool.check_deposit(BASE, base_token_out, self.now)
+        self.exchange.swap_token(BNPL, BASE, min_out, slashing_balance)
+        self.bnpl_balance -= slashing_balance
+        self.slashing_balance = 0
+        self.pool.deposit(BASE, base_token_out, "node", self.now)
+        return base_token_out
+
+    def collect_fees(self):
+        operator_fees = self.base_balance // 3
+        staking_rewards = self.exchange.swap_token(
+            BASE, BNPL, 0, self.base_balance - operator_fees
+        )
+        self.base_balance = 0
+        self.bnpl_balance += staking_rewards
+        return operator_fees, staking_rewards
+
+    # HELPERS
+
+    def apply(self, action, *args):
+        """
+        Call the action named `action`, returns the Revert instead of raising it
+        """
+        try:
+            return getattr(self, action)(*args)
+        except Revert as error:
+            return error
+
+    def _ensure_node_active(self, user):
+        if user != OPERATOR:
+            _require(self.get_bnpl_balance(OPERATOR) >= ACTIVE_BOND, "NodeInactive")
+
+    def _loan_with_principal(self, loan_id):
+        loan = self.loans.get(loan_id)
+        _require(
+            loan is not None and loan.principal_remaining != 0, "NoPrincipalRemaining"
+        )
+        return loan
+
+    @staticmethod
+    def _add_loan(loans, index, loan_id):
+        loans.append(loan_id)
+        index[loan_id] = len(loans)
+
+    @staticmethod
+    def _remove_loan(loans, index, loan_id):
+        position = index.get(loan_id, 0)
+        if position == 0 or position > len(loans) or loans[position - 1] != loan_id:
+            return
+        last_loan_id = loans[-1]
+        loans[position - 1] = last_loan_id
+        index[last_loan_id] = position
+        loans.pop()
+        del index[loan_id]
+
+
+# SCENARIOS
+
+USERS = ["user1", "user2", "user3"]
+MONTHLY = 2628000
+ACTIONS = [
+    "deposit",
+    "withdraw",
+    "stake",
+    "initiate_unstake",
+    "unstake",
+    "request_loan",
+    "approve_loan",
+    "make_loan_payment",
+    "repay_early",
+    "slash_loan",
+    "sell_slashed",
+    "collect_fees",
+    "sleep",
+]
+
+
+def random_action(sim, rng, users=USERS):
+    """
+    A random action that is likely, but not certain, to succeed in the state of sim
+    """
+    units = 10**sim.decimals
+    action = rng.choice(ACTIONS)
+    user = rng.choice(users)
+    if action == "deposit":
+        return action, (user, rng.randint(10, 1000) * units)
+    if action == "withdraw":
+        percent = rng.randint(1, 100)
+        return action, (user, max(sim.get_base_token_balance(user) * percent // 100, 1))
+    if action == "stake":
+        return action, (user, rng.randint(1, 100000) * 10**18)
+    if action == "initiate_unstake":
+        staker = rng.choice(users + [OPERATOR])
+        shares = sim.staking_shares.get(staker, 0)
+        if staker == OPERATOR:
+            # mostly keep the node active
+            shares = shares // 10
+        return action, (staker, max(shares * rng.randint(1, 100) // 100, 1))
+    if action == "unstake":
+        return action, (rng.choice(users + [OPERATOR]),)
+    if action == "request_loan":
+        return action, (
+            user,
+            rng.randint(10, 100) * units,
+            MONTHLY,
+            rng.randint(1, 24),
+            rng.randint(1, 500),
+            rng.random() < 0.3,
+            rng.choice([0, rng.randint(1, 200) * 10**18]),
+        )
+    if action == "approve_loan" and sim.pending_requests:
+        return action, (rng.choice(sim.pending_requests),)
+    loan_actions = ["make_loan_payment", "repay_early", "slash_loan"]
+    if action in loan_actions and sim.current_loans:
+        return action, (rng.choice(sim.current_loans),)
+    if action in ["sell_slashed", "collect_fees"]:
+        return action, ()
+    return "sleep", (rng.randint(1, MONTHLY),)
+
+
+def random_trace(seed, steps, sim=None, users=USERS):
+    """
+    A random list of (action, args), generated while running it on sim
+    """
+    rng = random.Random(seed)
+    sim = sim if sim else Simulator()
+    trace = []
+    for _ in range(steps):
+        action, args = random_action(sim, rng, users)
+        trace.append((action, args))
+        sim.apply(action, *args)
+    return trace
+
+
+def run_scenario(seed, steps=100):
+    """
+    Summary of the final state of a random scenario
+    """
+    sim = Simulator()
+    reverts = 0
+    rng = random.Random(seed)
+    for _ in range(steps):
+        action, args = random_action(sim, rng)
+        if isinstance(sim.apply(action, *args), Revert):
+            reverts += 1
+    return {
+        "seed": seed,
+        "share_price": sim.share_price(),
+        "staked_bnpl": sim.get_staked_bnpl(),
+        "total_default_loss": sim.total_default_loss,
+        "defaults": len(sim.defaulted_loans),
+        "reverts": reverts,
+    }
+
+
+def run_scenarios(count, steps=100, processes=None):
+    """
+    Run `count` random scenarios, in `processes` worker processes if given
+    """
+    seeds = range(count)
+    if not processes or int(processes) <= 1:
+        return [run_scenario(seed, steps) for seed in seeds]
+    with Pool(int(processes)) as pool:
+        return pool.starmap(
+            run_scenario, [(seed, steps) for seed in seeds], chunksize=256
+        )
+
+
+def main(count=1000, steps=100, processes=None):
+    """
+    Run random scenarios and print the spread of lender and staker outcomes
+    """
+    results = run_scenarios(int(count), int(steps), processes)
+    share_prices = [result["share_price"] for result in results]
+    share_prices = [share_price for share_price in share_prices if share_price]
+    print(f"{len(results)} scenarios of {steps} steps")
+    if share_prices:
+        print(
+            f"share price: min {min(share_prices) / 1e18:.6f}"
+            f" median {statistics.median(share_prices) / 1e18:.6f}"
+            f" max {max(share_prices) / 1e18:.6f}"
+        )
+    worst = max(results, key=lambda result: result["total_default_loss"])
+    print(f"worst default loss: {worst['total_default_loss']} (seed {worst['seed']})")
+    return results
@@ -0,0 +1,56 @@
+"""
+Sushiswap maths shared by the simulator, quotes and the keeper, without any call
+
+pair_for computes the address of a token pair like UniswapV2Library.pairFor, and
+get_amount_out the output of a swap like UniswapV2Library.getAmountOut, raising
+Revert where the library reverts.
+"""
+from web3 import Web3
+
+# Sushiswap pair init code hash, same as the one hardcoded in UniswapV2Library.pairFor
+PAIR_INIT_CODE_HASH = "0xe18a34eb0e04b04f7a0ac29a6e80748dca96319b42c54d679cb821dca90c6303"
+
+
+class Revert(Exception):
+    """
+    The contract call reverts, args[0] is the error name
+    """
+
+
+def sort_tokens(token_a, token_b):
+    """
+    Sorts two token addresses the way the pairs do (token0 < token1)
+    """
+    token_a = Web3.toChecksumAddress(str(token_a))
+    token_b = Web3.toChecksumAddress(str(token_b))
+    assert token_a != token_b
+    if int(token_a, 16) < int(token_b, 16):
+        return token_a, token_b
+    return token_b, token_a
+
+
+def pair_for(factory, token_a, token_b):
+    """
+    Computes the CREATE2 address of a pair without making any calls,
+    mirrors UniswapV2Library.pairFor used by BankingNode._swapToken
+    """
+    token0, token1 = sort_tokens(token_a, token_b)
+    salt = Web3.solidityKeccak(["address", "address"], [token0, token1])
+    pair = Web3.solidityKeccak(
+        ["bytes1", "address", "bytes32", "bytes32"],
+        ["0xff", Web3.toChecksumAddress(str(factory)), salt, PAIR_INIT_CODE_HASH],
+    )
+    return Web3.toChecksumAddress(pair[12:])
+
+
+def get_amount_out(amount_in, reserve_in, reserve_out):
+    """
+    UniswapV2Library.getAmountOut
+    """
+    if amount_in <= 0:
+        raise Revert("UniswapV2Library: INSUFFICIENT_INPUT_AMOUNT")
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise Revert("UniswapV2Library: INSUFFICIENT_LIQUIDITY")
+    amount_in_with_fee = amount_in * 997
+    denominator = reserve_in * 1000 + amount_in_with_fee
+    return (amount_in_with_fee * reserve_out) // denominator
@@ -1,5 +1,4 @@
 from scripts.helper import get_account, approve_erc20, get_weth
-from decimal import Decimal
 from brownie import (
     config,
     network,
@@ -7,6 +6,8 @@ from brownie import (
 )
 import datetime
 
+from scripts.quotes import Quotes
+
 current_time = datetime.datetime.now(datetime.timezone.utc)
 MINUTES = 60
 SLIPPAGE = 0.10
@@ -45,17 +46,12 @@ def swap_to_stablecoins(account):
     approve_erc20(MAX_ALLOWANCE, IROUTER_02, WETH, account)
 
     weth_decimals = 18
-    usdt_decimals = 6
-    usdc_decimals = 6
-    dai_decimals = 18
     
     tx = token_swap(
         WETH_AMOUNT,
         WETH,
         weth_decimals,
-        USD_AMOUNT,
         USDT,
-        usdt_decimals,
         IROUTER_02,
         account,
     )
@@ -66,9 +62,7 @@ def swap_to_stablecoins(account):
         WETH_AMOUNT,
         WETH,
         weth_decimals,
-        USD_AMOUNT,
         USDC,
-        usdc_decimals,
         IROUTER_02,
         account,
     )
@@ -79,9 +73,7 @@ def swap_to_stablecoins(account):
         WETH_AMOUNT,
         WETH,
         weth_decimals,
-        USD_AMOUNT,
         DAI,
-        dai_decimals,
         IROUTER_02,
         account,
     )
@@ -92,35 +84,38 @@ def token_swap(
     token_in_quantity: float,
     token_in: str,
     token_in_decimals: int,
-    token_out_quantity: float,
     token_out: str,
-    token_out_decimals: int,
     router: object,
     user: object,
 ):
     """
     Swaps an exact amount of input tokens for as many output tokens as possible,
-    along the route determined by the path. The first element of path is the
-    input token, the last is the output token, and any intermediate elements
-    represent intermediate pairs to trade through (if, for example, a direct
-    pair does not exist).
+    along the tokenIn -> WETH -> tokenOut route BankingNode._swapToken uses (a single
+    hop when selling WETH). The minimum output is the exact quote from the pair
+    reserves at the latest block, less SLIPPAGE.
 
     Ref: https://docs.uniswap.org/protocol/V2/reference/smart-contracts/router-02#swapexacttokensfortokens
     """
-    token_in_quantity_wei = token_in_quantity * (10**token_in_decimals)
-    token_out_quantity_wei = token_out_quantity * (10**token_out_decimals)
+    token_in_quantity_wei = int(token_in_quantity * (10**token_in_decimals))
 
     assert(token_in.allowance(user, router) >= token_in_quantity_wei)
-    # if token_in.allowance(router, user) >= token_in_quantity_wei:
-    #     print('!allowance:', token_in.allowance(router, user))
 
+    quotes = Quotes([token_in, token_out])
+    quotes.refresh()
+    min_out = quotes.min_out(
+        token_in_quantity_wei, token_in.address, token_out.address, SLIPPAGE
+    )
+    path = [token_in.address, token_out.address]
+    if token_in.address != quotes.weth:
+        path.insert(1, quotes.weth)
 
     tx = router.swapExactTokensForTokens(
         token_in_quantity_wei,
-        int(token_out_quantity_wei * (1 - Decimal(SLIPPAGE))),
-        [token_in.address, token_out.address],
+        min_out,
+        path,
         user.address,
         current_time.timestamp() + (5 * MINUTES),
         {"from": user},
     )
-    return tx
\ No newline at end of file
+    return tx
+
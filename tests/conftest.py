@@ -0,0 +1,252 @@
+"""
+Shared fixtures for the test suite
+
+The funded world is built once per session and every deeper layer is built on
+top of it, so each test only pays for the state it actually needs:
+
+    funded_world --> factory_world --> node_world --> liquid_node_world
+
+Every layer is saved with a chain snapshot, and each test starts from a clean
+copy of the layer it asks for (chain.revert() to that layer's snapshot).
+
+The suite runs in parallel with pytest-xdist (pytest -n auto). Brownie's xdist plugin
+starts every worker's local chain (or fork) on its own port; each worker then uses its
+own range of accounts on it, and the session scoped fixtures below are built once per
+worker.
+
+Keeping a snapshot per layer and launching extra accounts need private brownie APIs,
+they are all in BrownieInternals.
+"""
+from types import SimpleNamespace
+
+import pytest
+from brownie import (
+    BankingNode,
+    Contract,
+    chain,
+    config,
+    interface,
+    network,
+)
+from brownie._config import CONFIG
+
+from scripts.helper import (
+    ACCOUNTS_PER_WORKER,
+    NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS,
+    get_account,
+    get_worker_index,
+    approve_erc20,
+    get_weth,
+)
+from scripts.uniswap_helpers import swap_to_stablecoins
+from scripts.deploy_helpers import (
+    BOND_AMOUNT,
+    USDT_AMOUNT,
+    create_node,
+    deploy_mocks,
+    mint_mock_stablecoins,
+    whitelist_usdt,
+    deploy_bnpl_factory,
+    deploy_bnpl_token,
+)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "bench: gas benchmarks, only run when selected with -m bench"
+    )
+    BrownieInternals.check()
+    _launch_worker_accounts()
+
+
+def _launch_worker_accounts():
+    """
+    Launch enough accounts on this xdist worker's chain for its range of accounts
+    (see helper.get_account), runs before brownie connects
+    """
+    worker = get_worker_index()
+    if worker is None:
+        return
+    BrownieInternals.launch_accounts((worker + 1) * ACCOUNTS_PER_WORKER)
+
+
+class BrownieInternals:
+    """
+    The only private brownie APIs the suite uses, tested with eth-brownie 1.19
+
+    - chain._snapshot_id: brownie keeps a single snapshot, LayeredWorld needs one per
+      layer. Every snapshot still goes through chain.snapshot() / chain.revert(), so
+      brownie rolls back its transaction history and deployed contracts as usual.
+    - brownie._config.CONFIG.networks: the launch settings of the chains brownie
+      starts, brownie.config only holds the project settings.
+
+    check() stops the session with a clear error if a brownie upgrade removed them.
+    """
+
+    TESTED_VERSION = "1.19"
+
+    @classmethod
+    def check(cls):
+        if not hasattr(chain, "_snapshot_id") or not hasattr(CONFIG, "networks"):
+            raise pytest.UsageError(
+                "tests/conftest.py relies on private brownie APIs tested with "
+                f"eth-brownie {cls.TESTED_VERSION}, see BrownieInternals"
+            )
+
+    @staticmethod
+    def snapshot():
+        """
+        Take a chain snapshot and return its id
+        """
+        chain.snapshot()
+        return chain._snapshot_id
+
+    @staticmethod
+    def revert(snapshot_id):
+        """
+        Revert to the given snapshot, returns the id of the snapshot brownie takes in
+        its place, as reverting consumes it
+        """
+        chain._snapshot_id = snapshot_id
+        chain.revert()
+        return chain._snapshot_id
+
+    @staticmethod
+    def launch_accounts(count):
+        """
+        Launch at least `count` accounts on the chains brownie starts itself
+        (development and forks), the only networks with cmd_settings
+        """
+        for network_config in CONFIG.networks.values():
+            cmd_settings = network_config.get("cmd_settings")
+            if cmd_settings is None:
+                continue
+            cmd_settings["accounts"] = max(cmd_settings.get("accounts", 10), count)
+
+
+def pytest_collection_modifyitems(config, items):
+    if "bench" in config.getoption("markexpr", ""):
+        return
+    skip_bench = pytest.mark.skip(reason="gas benchmarks only run with -m bench")
+    for item in items:
+        if "bench" in item.keywords:
+            item.add_marker(skip_bench)
+
+
+def _build_funded(world):
+    """
+    Two accounts holding WETH, USDT, USDC and DAI, and a freshly deployed BNPL token
+    On the development network the AAVE / Sushiswap mocks are deployed first and the
+    stablecoins are minted instead of swapped
+    """
+    world.account = get_account()
+    world.account2 = get_account(index=2)
+    local = network.show_active() in NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS
+    if local:
+        deploy_mocks(world.account)
+
+    for account in [world.account, world.account2]:
+        get_weth(account, 100)
+        if local:
+            mint_mock_stablecoins(account)
+        else:
+            swap_to_stablecoins(account)
+
+    world.bnpl = deploy_bnpl_token()
+    world.usdt = interface.IERC20(config["networks"][network.show_active()]["usdt"])
+
+
+def _build_factory(world):
+    """
+    BNPLFactory behind its proxy, with USDT whitelisted
+    """
+    world.factory = deploy_bnpl_factory(world.bnpl, world.account)
+    whitelist_usdt(world.factory)
+
+
+def _build_node(world):
+    """
+    USDT node operated by `account`, with the 2M BNPL bond staked
+    """
+    approve_erc20(BOND_AMOUNT, world.factory, world.bnpl, world.account)
+    create_node(world.factory, world.account, world.usdt.address)
+    node_address = world.factory.operatorToNode(world.account)
+    world.node = Contract.from_abi(BankingNode._name, node_address, BankingNode.abi)
+
+
+def _build_liquid_node(world):
+    """
+    Node with 200 USDT of liquidity deposited by `account`
+    """
+    approve_erc20(USDT_AMOUNT * 2, world.node, world.usdt, world.account)
+    tx = world.node.deposit(USDT_AMOUNT * 2, {"from": world.account})
+    tx.wait(1)
+
+
+class LayeredWorld:
+    """
+    Stack of chain snapshots, one per fixture layer
+
+    Entering a layer builds any missing layers up to it (snapshotting after each),
+    or reverts to it and discards every deeper layer. Discarded layers are rebuilt
+    the next time a test asks for them; the funded base layer is only rebuilt after
+    reset().
+    """
+
+    def __init__(self, builders):
+        self._builders = builders
+        self._snapshots = []
+        self._worlds = []
+
+    def enter(self, depth):
+        # Drop any layers deeper than the one requested
+        del self._snapshots[depth:]
+        del self._worlds[depth:]
+        # Revert to a clean copy of the deepest layer still kept
+        if self._snapshots:
+            self._snapshots[-1] = BrownieInternals.revert(self._snapshots[-1])
+        # Build and snapshot the missing layers on top of it
+        while len(self._worlds) < depth:
+            world = SimpleNamespace()
+            if self._worlds:
+                world = SimpleNamespace(**vars(self._worlds[-1]))
+            self._builders[len(self._worlds)](world)
+            self._worlds.append(world)
+            self._snapshots.append(BrownieInternals.snapshot())
+        return SimpleNamespace(**vars(self._worlds[-1]))
+
+    def reset(self):
+        """
+        Reset the chain to its first block and drop every layer, for tests that
+        need a fresh chain. The next test rebuilds the layers it asks for.
+        """
+        chain.reset()
+        del self._snapshots[:]
+        del self._worlds[:]
+
+
+@pytest.fixture(scope="session")
+def layered_world():
+    return LayeredWorld(
+        [_build_funded, _build_factory, _build_node, _build_liquid_node]
+    )
+
+
+@pytest.fixture
+def funded_world(layered_world):
+    return layered_world.enter(1)
+
+
+@pytest.fixture
+def factory_world(layered_world):
+    return layered_world.enter(2)
+
+
+@pytest.fixture
+def node_world(layered_world):
+    return layered_world.enter(3)
+
+
+@pytest.fixture
+def liquid_node_world(layered_world):
+    return layered_world.enter(4)
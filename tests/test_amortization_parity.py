@@ -0,0 +1,176 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from scripts.helper import approve_erc20
+from scripts.amortization import MAX_UINT96, next_payment, payment_amount, schedule
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MONTHLY = 2628000
+WEEKLY = 604800
+HOURLY = 3600
+MAX_ALLOWANCE = 2**256 - 1
+# (loanAmount, interestRate, numberOfPayments) whose rounding pays off the principal
+# before the last payment
+EARLY_PAYOFF_LOANS = [
+    (10 * 10**6, 83, 1227),
+    (10 * 10**6, 1, 41246),
+    (10 * 10**6, 200, 500),
+]
+
+
+def random_loans(count, seed=9):
+    rng = random.Random(seed)
+    return [
+        (
+            rng.randint(10 * 10**6, 20 * 10**6),  # loanAmount
+            MONTHLY,
+            rng.randint(1, 60),  # numberOfPayments
+            rng.randint(1, 500),  # interestRate
+            rng.random() < 0.3,  # interestOnly
+        )
+        for x in range(count)
+    ]
+
+
+def test_amortization_parity(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+
+    loans = random_loans(7) + [
+        (10 * 10**6, WEEKLY, 260, 20, False),  # weekly payments over 5 years
+        (10 * 10**6, MONTHLY, 3, 83, False),
+        (10 * 10**6, MONTHLY, 3, 83, True),
+    ]
+    loan_ids = []
+    for loan_amount, interval, number_of_payments, interest_rate, interest_only in loans:
+        tx = node.requestLoan(
+            loan_amount,
+            interval,
+            number_of_payments,
+            interest_rate,
+            interest_only,
+            ZERO_ADDRESS,
+            0,
+            account2,
+            "parity loan",
+            {"from": account2},
+        )
+        loan_id = tx.events["LoanRequest"]["loanId"]
+        node.approveLoan(loan_id, 0, {"from": account})
+        loan_ids.append(loan_id)
+
+    print("Next payment and due date match the contract")
+    for loan_id, loan in zip(loan_ids, loans):
+        loan_amount, interval, number_of_payments, interest_rate, interest_only = loan
+        assert node.getNextPayment(loan_id) == next_payment(
+            loan_amount, interest_rate, number_of_payments, interest_only
+        )
+        loan_schedule = schedule(
+            loan_amount,
+            interest_rate,
+            number_of_payments,
+            interest_only,
+            node.idToLoan(loan_id)[2],
+            interval,
+        )
+        assert node.getNextDueDate(loan_id) == loan_schedule.periods[0].due_date
+
+    print("Paying the last two loans to the end follows the schedule")
+    approve_erc20(MAX_ALLOWANCE, node, liquid_node_world.usdt, account2)
+    for loan_id, loan in zip(loan_ids[-2:], loans[-2:]):
+        loan_amount, interval, number_of_payments, interest_rate, interest_only = loan
+        for period in schedule(
+            loan_amount, interest_rate, number_of_payments, interest_only
+        ).periods:
+            assert node.getNextPayment(loan_id) == period.payment
+            node.makeLoanPayment(loan_id, {"from": account2})
+            assert node.idToLoan(loan_id)[7] == period.principal_remaining
+        assert node.getNextPayment(loan_id) == 0
+
+
+@pytest.mark.parametrize("number_of_payments", [1, 12, 20, 60, 260])
+def test_amortization_long_loans(number_of_payments):
+    # the payment is within a wei of the exact annuity, and the schedule pays off the loan
+    loan_amount, interest_rate = 10**25, 83
+    loan_schedule = schedule(loan_amount, interest_rate, number_of_payments)
+    exact = Fraction(loan_amount * interest_rate, 10000) / (
+        1 - Fraction(10000, 10000 + interest_rate) ** number_of_payments
+    )
+    if number_of_payments > 1:
+        assert abs(loan_schedule.periods[0].payment - exact) <= 1
+    assert loan_schedule.reverts_at is None
+    assert len(loan_schedule.periods) == number_of_payments
+    assert loan_schedule.periods[-1].principal_remaining == 0
+
+
+@pytest.mark.parametrize("loan", EARLY_PAYOFF_LOANS)
+def test_amortization_early_payoff(loan):
+    # the payment is capped at the payoff, which ends the loan without reverting
+    loan_amount, interest_rate, number_of_payments = loan
+    loan_schedule = schedule(loan_amount, interest_rate, number_of_payments)
+    assert loan_schedule.reverts_at is None
+    assert len(loan_schedule.periods) < number_of_payments
+    assert loan_schedule.periods[-1].principal_remaining == 0
+    for period in loan_schedule.periods:
+        assert period.payment - period.interest == period.principal
+        assert period.payment == next_payment(
+            loan_amount,
+            interest_rate,
+            number_of_payments,
+            payments_made=period.payment_number - 1,
+            principal_remaining=period.principal_remaining + period.principal,
+        )
+
+
+def test_amortization_payment_bound():
+    # approveLoan reverts with InvalidLoanInput for payments above uint96
+    loan_amount, interest_rate, number_of_payments = MAX_UINT96, 10000, 2
+    assert payment_amount(loan_amount, interest_rate, number_of_payments) > MAX_UINT96
+    assert next_payment(loan_amount, interest_rate, number_of_payments) is None
+    assert schedule(loan_amount, interest_rate, number_of_payments).reverts_at == 1
+
+
+def test_amortization_early_payoff_parity(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+    loan_amount, interest_rate, number_of_payments = EARLY_PAYOFF_LOANS[0]
+
+    tx = node.requestLoan(
+        loan_amount,
+        HOURLY,
+        number_of_payments,
+        interest_rate,
+        False,
+        ZERO_ADDRESS,
+        0,
+        account2,
+        "early payoff loan",
+        {"from": account2},
+    )
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    node.approveLoan(loan_id, 0, {"from": account})
+    approve_erc20(MAX_ALLOWANCE, node, liquid_node_world.usdt, account2)
+    periods = schedule(loan_amount, interest_rate, number_of_payments).periods
+
+    print("Payments follow the schedule up to the last one")
+    paid = 0
+    while paid < len(periods) - 1:
+        batch = min(100, len(periods) - 1 - paid)
+        node.makeLoanPayments([loan_id] * batch, {"from": account2})
+        paid += batch
+        assert node.idToLoan(loan_id)[7] == periods[paid - 1].principal_remaining
+
+    print("The capped payment pays off the loan before its last period")
+    assert paid + 1 < number_of_payments
+    assert node.getNextPayment(loan_id) == periods[-1].payment
+    node.makeLoanPayment(loan_id, {"from": account2})
+    assert node.idToLoan(loan_id)[7] == 0
+    assert node.idToLoan(loan_id)[8] == number_of_payments
+    assert node.getNextPayment(loan_id) == 0
+    assert loan_id not in node.getCurrentLoans(0, 10)[0]
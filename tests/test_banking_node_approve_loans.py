@@ -0,0 +1,71 @@
+import brownie
+
+from scripts.helper import get_account
+
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+TREASURY = "0x27a99802FC48b57670846AbFFf5F2DcDE8a6fC29"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def request_loan(node, borrower, agent, amount):
+    tx = node.requestLoan(
+        amount,
+        2628000,
+        12,
+        83,
+        False,
+        ZERO_ADDRESS,
+        0,
+        agent,
+        "batch loan",
+        {"from": borrower},
+    )
+    tx.wait(1)
+    return tx.events["LoanRequest"]["loanId"]
+
+
+def test_banking_node_approve_loans(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+    usdt = liquid_node_world.usdt
+    agent, agent2 = get_account(index=3), get_account(index=4)
+    agents = [agent, agent, agent2, agent]
+    amounts = [LOAN_AMOUNT * (x + 1) for x in range(len(agents))]
+
+    loan_ids = [
+        request_loan(node, account2, loan_agent, amount)
+        for loan_agent, amount in zip(agents, amounts)
+    ]
+
+    print("Only the operator can approve, and ids must match collateral amounts")
+    with brownie.reverts():
+        node.approveLoans(loan_ids, [0] * len(loan_ids), {"from": account2})
+    with brownie.reverts():
+        node.approveLoans(loan_ids, [0], {"from": account})
+
+    initial_balances = [usdt.balanceOf(x) for x in [account2, agent, agent2]]
+    initial_treasury = usdt.balanceOf(TREASURY)
+    tx = node.approveLoans(loan_ids, [0] * len(loan_ids), {"from": account})
+    tx.wait(1)
+
+    print("Every loan is approved with the same fees as approveLoan")
+    assert [event["loanId"] for event in tx.events["approvedLoan"]] == loan_ids
+    assert node.getPendingRequestCount() == 0
+    assert node.getCurrentLoansCount() == len(loan_ids)
+    assert node.accountsReceiveable() == sum(amounts)
+    assert usdt.balanceOf(account2) - initial_balances[0] == sum(
+        x * 199 // 200 for x in amounts
+    )
+    assert usdt.balanceOf(agent) - initial_balances[1] == sum(
+        x // 400 for x, loan_agent in zip(amounts, agents) if loan_agent == agent
+    )
+    assert usdt.balanceOf(agent2) - initial_balances[2] == amounts[2] // 400
+    assert usdt.balanceOf(TREASURY) - initial_treasury == sum(x // 400 for x in amounts)
+    for loan_id in loan_ids:
+        assert node.getNextPayment(loan_id) > 0
+
+    print("Approved loans can not be approved again")
+    with brownie.reverts():
+        node.approveLoans(loan_ids[:1], [0], {"from": account})
@@ -1,19 +1,8 @@
-from scripts.helper import get_account, approve_erc20, get_weth
-from scripts.uniswap_helpers import swap_to_stablecoins
-from scripts.deploy_helpers import (
-    create_node,
-    whitelist_usdt,
-    deploy_bnpl_factory,
-    deploy_bnpl_token,
-    add_lp,
-)
+from scripts.helper import approve_erc20
+from scripts.deploy_helpers import add_lp
 import pytest
 import time
 from brownie import (
-    BNPLFactory,
-    BNPLToken,
-    BankingNode,
-    Contract,
     config,
     network,
     interface,
@@ -25,33 +14,16 @@ BOND_AMOUNT = Web3.toWei(2000000, "ether")
 USDT_AMOUNT = 100 * 10**6  # 100 USDT
 
 
-def test_banking_node_collateral_loan():
-
-    account = get_account()
-    account2 = get_account(index=2)
-
-    get_weth(account, 100)
-    get_weth(account2, 100)
-    swap_to_stablecoins(account)
-    swap_to_stablecoins(account2)
-
-    # Deploy BNPL Token
-    BNPL = deploy_bnpl_token()
-
-    # Deploy factory
-    FACTORY = deploy_bnpl_factory(BNPL, account)
-    # Whitelist USDT for the factory
-    whitelist_usdt(FACTORY)
+# Integration test: prices the collateral and slashing sales against real Sushiswap liquidity
+@pytest.mark.require_network("mainnet-fork")
+def test_banking_node_collateral_loan(node_world):
 
-    # usdt_address = config["networks"][network.show_active()]["usdt"]
-    USDT = interface.IERC20(config["networks"][network.show_active()]["usdt"])
-    # Deploy node
-    approve_erc20(BOND_AMOUNT, FACTORY, BNPL, account)
-    create_node(FACTORY, account, USDT.address)
+    account = node_world.account
+    account2 = node_world.account2
+    BNPL = node_world.bnpl
 
-    # Check that node was created
-    node_address = FACTORY.operatorToNode(account)
-    node = Contract.from_abi(BankingNode._name, node_address, BankingNode.abi)
+    node = node_world.node
+    node_address = node.address
 
     # Check that 2M BNPL was bonded
     assert node.getBNPLBalance(account) == BOND_AMOUNT
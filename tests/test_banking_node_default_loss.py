@@ -0,0 +1,61 @@
+import brownie
+from brownie import chain
+
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+PAYMENT_INTERVAL = 2628000
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def approved_loan(node, operator, borrower, amount):
+    tx = node.requestLoan(
+        amount,
+        PAYMENT_INTERVAL,
+        12,
+        83,
+        False,
+        ZERO_ADDRESS,
+        0,
+        borrower,
+        "default loan",
+        {"from": borrower},
+    )
+    tx.wait(1)
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    node.approveLoan(loan_id, 0, {"from": operator})
+    return loan_id
+
+
+def test_banking_node_default_loss(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+
+    loan_ids = [
+        approved_loan(node, account, account2, LOAN_AMOUNT * (x + 1)) for x in range(3)
+    ]
+    assert node.getTotalDefaultLoss() == 0
+    assert node.getDefaultedLoans(0, 10) == ([], [])
+
+    print("Slash every loan once the first payment is missed")
+    chain.sleep(PAYMENT_INTERVAL + 1)
+    chain.mine(1)
+    for loan_id in reversed(loan_ids):
+        node.slashLoan(loan_id, 0, {"from": account})
+    assert node.getTotalDefaultLoss() == LOAN_AMOUNT * 6
+
+    print("Defaulted loans are paged in the order they were slashed")
+    assert node.getDefaultedLoans(0, 10) == (
+        loan_ids[::-1],
+        [LOAN_AMOUNT * 3, LOAN_AMOUNT * 2, LOAN_AMOUNT],
+    )
+    assert node.getDefaultedLoans(1, 1) == ([loan_ids[1]], [LOAN_AMOUNT * 2])
+    assert node.getDefaultedLoans(3, 1) == ([], [])
+
+    print("Slashed loans can no longer be paid, the default loss is final")
+    for pay in [node.makeLoanPayment, node.repayEarly]:
+        with brownie.reverts():
+            pay(loan_ids[0], {"from": account2})
+    with brownie.reverts():
+        node.makeLoanPayments(loan_ids[:1], {"from": account2})
+    assert node.getTotalDefaultLoss() == LOAN_AMOUNT * 6
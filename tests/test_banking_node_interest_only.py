@@ -1,18 +1,6 @@
-from scripts.helper import get_account, approve_erc20, get_weth
-from scripts.uniswap_helpers import swap_to_stablecoins
-from scripts.deploy_helpers import (
-    create_node,
-    whitelist_usdt,
-    deploy_bnpl_factory,
-    deploy_bnpl_token,
-    add_lp,
-)
+from scripts.helper import approve_erc20
 import pytest
-import time
 from brownie import (
-    BNPLToken,
-    BankingNode,
-    Contract,
     config,
     network,
     interface,
@@ -23,52 +11,16 @@ BOND_AMOUNT = Web3.toWei(2000000, "ether")
 USDT_AMOUNT = 100 * 10**6  # 100 USDT
 
 
-def test_banking_node_interest_only():
-
-    account = get_account()
-    account2 = get_account(index=2)
-
-    get_weth(account, 100)
-    get_weth(account2, 100)
-    swap_to_stablecoins(account)
-    swap_to_stablecoins(account2)
-
-    # Deploy BNPL Token
-    BNPL = deploy_bnpl_token()
-
-    # Deploy factory
-    FACTORY = deploy_bnpl_factory(BNPL, account)
+def test_banking_node_interest_only(liquid_node_world):
 
-    # Whitelist USDT for the factory
-    whitelist_usdt(FACTORY)
+    # Node with 2M BNPL bonded and 200 USDT deposited by the operator
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+    node_address = node.address
 
-    # Deploy node
-    usdt_address = config["networks"][network.show_active()]["usdt"]
-    approve_erc20(BOND_AMOUNT, FACTORY, BNPL, account)
-    create_node(FACTORY, account, usdt_address)
-
-    # Check that node was created
-    node_address = FACTORY.operatorToNode(account)
-    node = Contract.from_abi(BankingNode._name, node_address, BankingNode.abi)
-
-    # Check that 2M BNPL was bonded
     assert node.getBNPLBalance(account) == BOND_AMOUNT
 
-    # Check initial paramets of Node
-    assert node.getTotalAssetValue() == 0
-
-    # Deposit USDT with 1 account
-    approve_erc20(
-        USDT_AMOUNT * 2,
-        node_address,
-        config["networks"][network.show_active()]["usdt"],
-        account,
-    )
-    tx = node.deposit(USDT_AMOUNT, {"from": account})
-    tx.wait(1)
-    tx = node.deposit(USDT_AMOUNT, {"from": account})
-    tx.wait(1)
-
     # Request a loan of 100 USDT, monthly payments, 1 year duration, 10% interest, interest only
     payment_interval = 2628000  # monthly
     tx = node.requestLoan(
@@ -0,0 +1,79 @@
+from scripts.helper import approve_erc20
+from brownie import (
+    config,
+    network,
+)
+
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def request_loan(node, borrower):
+    tx = node.requestLoan(
+        LOAN_AMOUNT,
+        2628000,
+        12,
+        83,
+        False,
+        ZERO_ADDRESS,
+        0,
+        borrower,
+        "list loan",
+        {"from": borrower},
+    )
+    tx.wait(1)
+    return tx.events["LoanRequest"]["loanId"]
+
+
+def loan_list(getter, count):
+    return [getter(i) for i in range(count)]
+
+
+def test_banking_node_loan_lists(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+
+    loan_ids = [request_loan(node, account2) for x in range(4)]
+    assert loan_list(node.pendingRequests, node.getPendingRequestCount()) == loan_ids
+
+    print("Approve from the middle, the last request moves into its place")
+    node.approveLoan(loan_ids[1], 0, {"from": account})
+    assert loan_list(node.pendingRequests, node.getPendingRequestCount()) == [
+        loan_ids[0],
+        loan_ids[3],
+        loan_ids[2],
+    ]
+    node.approveLoan(loan_ids[3], 0, {"from": account})
+    node.approveLoan(loan_ids[0], 0, {"from": account})
+    assert loan_list(node.pendingRequests, node.getPendingRequestCount()) == [
+        loan_ids[2]
+    ]
+    assert loan_list(node.currentLoans, node.getCurrentLoansCount()) == [
+        loan_ids[1],
+        loan_ids[3],
+        loan_ids[0],
+    ]
+
+    print("Repaying removes from currentLoans the same way")
+    approve_erc20(
+        LOAN_AMOUNT * 2,
+        node,
+        config["networks"][network.show_active()]["usdt"],
+        account2,
+    )
+    node.repayEarly(loan_ids[1], {"from": account2})
+    assert loan_list(node.currentLoans, node.getCurrentLoansCount()) == [
+        loan_ids[0],
+        loan_ids[3],
+    ]
+
+    print("Positions of cleared requests do not affect new requests")
+    node.clearPendingLoans({"from": account})
+    new_loan_id = request_loan(node, account2)
+    node.approveLoan(loan_ids[2], 0, {"from": account})
+    assert loan_list(node.pendingRequests, node.getPendingRequestCount()) == [
+        new_loan_id
+    ]
+    assert node.getCurrentLoansCount() == 3
@@ -0,0 +1,51 @@
+from scripts.lens import get_node_snapshot, iter_loans
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+
+
+def test_banking_node_loan_pages(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+
+    loan_ids = []
+    for number_of_payments in range(1, 6):
+        tx = node.requestLoan(
+            LOAN_AMOUNT,
+            2628000,
+            number_of_payments,
+            83,
+            False,
+            ZERO_ADDRESS,
+            0,
+            account2,
+            "loan pages",
+            {"from": account2},
+        )
+        tx.wait(1)
+        loan_ids.append(tx.events["LoanRequest"]["loanId"])
+    for loan_id in loan_ids[:2]:
+        node.approveLoan(loan_id, 0, {"from": account}).wait(1)
+
+    print("Pages are clipped to the end of the list")
+    ids, loans, next_payments, next_due_dates = node.getCurrentLoans(1, 10)
+    assert ids == [node.currentLoans(1)]
+    assert next_payments == [node.getNextPayment(ids[0])]
+    assert next_due_dates == [node.getNextDueDate(ids[0])]
+    assert node.getCurrentLoans(2, 10) == ([], [], [], [])
+    assert node.getPendingRequests(0, 0) == ([], [], [], [])
+
+    print("The loan book streamed page by page matches the single loan getters")
+    current_loans = list(iter_loans(node, page_size=1))
+    assert current_loans == get_node_snapshot(node).current_loans
+    pending_requests = list(iter_loans(node, pending=True, page_size=2))
+    assert [loan.loan_id for loan in pending_requests] == [
+        node.pendingRequests(i) for i in range(node.getPendingRequestCount())
+    ]
+    for loan in pending_requests:
+        assert tuple(loan.terms.__dict__.values()) == tuple(node.idToLoan(loan.loan_id))
+        assert loan.payment_amount == node.getLoanPaymentAmount(loan.loan_id)
+        assert loan.agent == node.loanToAgent(loan.loan_id)
+        assert loan.next_payment == 0
@@ -0,0 +1,67 @@
+import brownie
+
+from scripts.helper import approve_erc20
+
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+MAX_ALLOWANCE = 2**256 - 1
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def current_loan(node, operator, borrower, number_of_payments, interest_only):
+    tx = node.requestLoan(
+        LOAN_AMOUNT,
+        2628000,
+        number_of_payments,
+        83,
+        interest_only,
+        ZERO_ADDRESS,
+        0,
+        borrower,
+        "batch payment",
+        {"from": borrower},
+    )
+    tx.wait(1)
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    node.approveLoan(loan_id, 0, {"from": operator})
+    return loan_id
+
+
+def test_banking_node_loan_payments(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+    usdt = liquid_node_world.usdt
+
+    # amortizing, interest only, and a final payment of each
+    terms = [(12, False), (12, True), (1, False), (1, True)]
+    loan_ids = [current_loan(node, account, account2, *x) for x in terms]
+    payments = [node.getNextPayment(loan_id) for loan_id in loan_ids]
+    receiveable = node.accountsReceiveable()
+
+    with brownie.reverts():
+        node.makeLoanPayments([], {"from": account})
+
+    print("Pay every loan in one transaction, from a different payer")
+    approve_erc20(MAX_ALLOWANCE, node, usdt, account)
+    initial_balance = usdt.balanceOf(account)
+    tx = node.makeLoanPayments(loan_ids, {"from": account})
+    tx.wait(1)
+    assert initial_balance - usdt.balanceOf(account) == sum(payments)
+    assert [event["loanId"] for event in tx.events["loanPaymentMade"]] == loan_ids
+
+    print("Same accounting as paying one by one")
+    amortized = payments[0] - LOAN_AMOUNT * 83 // 10000
+    assert node.idToLoan(loan_ids[0])[7] == LOAN_AMOUNT - amortized
+    assert node.idToLoan(loan_ids[1])[7] == LOAN_AMOUNT
+    assert node.idToLoan(loan_ids[2])[7] == 0
+    assert node.idToLoan(loan_ids[3])[7] == 0
+    assert node.accountsReceiveable() == receiveable - amortized - 2 * LOAN_AMOUNT
+    assert [node.currentLoans(i) for i in range(node.getCurrentLoansCount())] == [
+        loan_ids[0],
+        loan_ids[1],
+    ]
+
+    print("Paid off loans can not be paid again")
+    with brownie.reverts():
+        node.makeLoanPayments(loan_ids, {"from": account})
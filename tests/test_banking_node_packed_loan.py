@@ -0,0 +1,60 @@
+import brownie
+
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def request_loan(node, borrower, loan_amount, number_of_payments, interest_rate):
+    return node.requestLoan(
+        loan_amount,
+        2628000,
+        number_of_payments,
+        interest_rate,
+        False,
+        ZERO_ADDRESS,
+        0,
+        borrower,
+        "packed loan",
+        {"from": borrower},
+    )
+
+
+def test_banking_node_packed_loan(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+
+    print("Inputs that do not fit the packed loan are rejected")
+    with brownie.reverts():
+        request_loan(node, account2, 2**96, 12, 83)
+    with brownie.reverts():
+        request_loan(node, account2, LOAN_AMOUNT, 12, 2**16)
+
+    print("The getters return the same values as before packing")
+    tx = request_loan(node, account2, LOAN_AMOUNT, 12, 83)
+    tx.wait(1)
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    assert node.loanToAgent(loan_id) == account2
+    assert node.idToLoan(loan_id) == (
+        account2,
+        False,
+        0,
+        LOAN_AMOUNT,
+        2628000,
+        83,
+        12,
+        0,
+        0,
+        ZERO_ADDRESS,
+        0,
+        False,
+    )
+    assert node.getLoanPaymentAmount(loan_id) == 0
+
+    tx = node.approveLoan(loan_id, 0, {"from": account})
+    tx.wait(1)
+    loan = node.idToLoan(loan_id)
+    assert loan[2] == tx.timestamp
+    assert loan[7] == LOAN_AMOUNT
+    assert node.getLoanPaymentAmount(loan_id) == node.getNextPayment(loan_id)
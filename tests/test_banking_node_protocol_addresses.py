@@ -0,0 +1,41 @@
+import pytest
+from brownie import MockLendingPool, MockLendingPoolAddressesProvider, interface
+
+from scripts.helper import approve_erc20
+from scripts.deploy_helpers import MOCK_LIQUIDITY_RATE
+
+USDT_AMOUNT = 100 * 10**6  # 100 USDT
+MAX_ALLOWANCE = 2**256 - 1
+
+
+@pytest.mark.require_network("development")
+def test_banking_node_protocol_addresses(liquid_node_world):
+
+    account = liquid_node_world.account
+    node = liquid_node_world.node
+    usdt = liquid_node_world.usdt
+    provider = MockLendingPoolAddressesProvider[-1]
+    lending_pool = interface.ILendingPool(provider.getLendingPool())
+
+    print("Deposits leave a standing max approval to the lending pool")
+    assert usdt.allowance(node, lending_pool) > MAX_ALLOWANCE // 2
+    approve_erc20(USDT_AMOUNT, node, usdt, account)
+    node.deposit(USDT_AMOUNT, {"from": account}).wait(1)
+    assert usdt.allowance(node, lending_pool) > MAX_ALLOWANCE // 2
+    total_asset_value = node.getTotalAssetValue()
+
+    print("The node keeps using the cached pool until refreshed")
+    new_pool = MockLendingPool.deploy({"from": account})
+    new_pool.initReserve(usdt, MOCK_LIQUIDITY_RATE, {"from": account})
+    provider.setLendingPoolImpl(new_pool, {"from": account})
+    assert node.getTotalAssetValue() >= total_asset_value
+
+    # anyone can refresh, the node now values its assets with the new pool's aToken
+    node.refreshProtocolAddresses({"from": liquid_node_world.account2})
+    assert node.getTotalAssetValue() == node.accountsReceiveable()
+
+    print("Refreshing revokes the allowance of the old pool")
+    assert usdt.allowance(node, lending_pool) == 0
+    approve_erc20(USDT_AMOUNT, node, usdt, account)
+    node.deposit(USDT_AMOUNT, {"from": account}).wait(1)
+    assert usdt.allowance(node, new_pool) > MAX_ALLOWANCE // 2
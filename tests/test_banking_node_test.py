@@ -1,18 +1,8 @@
-from scripts.helper import get_account, approve_erc20, get_weth
-from scripts.uniswap_helpers import swap_to_stablecoins
-from scripts.deploy_helpers import (
-    create_node,
-    whitelist_usdt,
-    deploy_bnpl_factory,
-    deploy_bnpl_token,
-    add_lp,
-)
+from scripts.helper import approve_erc20
+from scripts.deploy_helpers import add_lp
 import pytest
 import time
 from brownie import (
-    BNPLToken,
-    BankingNode,
-    Contract,
     config,
     network,
     interface,
@@ -22,33 +12,15 @@ from web3 import Web3
 BOND_AMOUNT = Web3.toWei(2000000, "ether")
 USDT_AMOUNT = 100 * 10**6  # 100 USDT
 
-def test_banking_node_test():
-
-    account = get_account()
-    account2 = get_account(index=2)
-
-    get_weth(account, 100)
-    get_weth(account2, 100)
-    swap_to_stablecoins(account)
-    swap_to_stablecoins(account2)
+def test_banking_node_test(node_world):
 
-    # Deploy BNPL Token
-    BNPL = deploy_bnpl_token()
-
-    # Deploy factory
-    FACTORY = deploy_bnpl_factory(BNPL, account)
+    account = node_world.account
+    account2 = node_world.account2
+    BNPL = node_world.bnpl
     USDT = interface.ERC20(config["networks"][network.show_active()]["usdt"])
-    # Whitelist USDT for the factory
-    whitelist_usdt(FACTORY)
-
-    print("Deploy node")
-    usdt_address = config["networks"][network.show_active()]["usdt"]
-    approve_erc20(BOND_AMOUNT, FACTORY, BNPL, account)
-    create_node(FACTORY, account, usdt_address)
 
-    print("Check that node was created")
-    node_address = FACTORY.operatorToNode(account)
-    node = Contract.from_abi(BankingNode._name, node_address, BankingNode.abi)
+    node = node_world.node
+    node_address = node.address
 
     print("Check that 2M BNPL was bonded")
     assert node.getBNPLBalance(account) == BOND_AMOUNT
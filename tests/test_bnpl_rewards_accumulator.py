@@ -0,0 +1,90 @@
+from brownie import BankingNode, Contract, chain, config, interface, network
+
+from scripts.helper import approve_erc20
+from scripts.deploy_helpers import (
+    BOND_AMOUNT,
+    create_node,
+    deploy_rewards_controller,
+    whitelist_token,
+)
+
+USDT_AMOUNT = 100 * 10**6
+DAI_AMOUNT = 100 * 10**18
+
+
+def harvest(rewards_controller, bnpl, pid, account):
+    """
+    BNPL received and timestamp of a harvest (deposit of 0)
+    """
+    initial_balance = bnpl.balanceOf(account)
+    tx = rewards_controller.deposit(pid, 0, {"from": account})
+    tx.wait(1)
+    return bnpl.balanceOf(account) - initial_balance, tx.timestamp
+
+
+def assert_close(value, expected):
+    assert abs(value - expected) <= expected // 10**9
+
+
+def test_bnpl_rewards_accumulator(factory_world):
+
+    account = factory_world.account
+    account2 = factory_world.account2
+    bnpl = factory_world.bnpl
+    factory = factory_world.factory
+    usdt = factory_world.usdt
+    dai = interface.IERC20(config["networks"][network.show_active()]["dai"])
+
+    rewards_controller = deploy_rewards_controller(factory, bnpl, chain.time())
+    approve_erc20(BOND_AMOUNT * 10, rewards_controller, bnpl, account)
+    bnpl_per_second = rewards_controller.bnplPerSecond()
+
+    print("Two nodes with the same stake, with a pool each")
+    whitelist_token(factory, dai.address)
+    bnpl.transfer(account2, BOND_AMOUNT, {"from": account})
+    approve_erc20(BOND_AMOUNT, factory, bnpl, account)
+    create_node(factory, account, usdt.address)
+    approve_erc20(BOND_AMOUNT, factory, bnpl, account2)
+    create_node(factory, account2, dai.address)
+    usdt_node = Contract.from_abi(
+        BankingNode._name, factory.operatorToNode(account), BankingNode.abi
+    )
+    dai_node = Contract.from_abi(
+        BankingNode._name, factory.operatorToNode(account2), BankingNode.abi
+    )
+    rewards_controller.add(usdt_node, {"from": account}).wait(1)
+    rewards_controller.add(dai_node, {"from": account2}).wait(1)
+
+    liquidity = [(usdt_node, usdt, USDT_AMOUNT), (dai_node, dai, DAI_AMOUNT)]
+    for node, token, amount in liquidity:
+        approve_erc20(amount, node, token, account2)
+        node.deposit(amount, {"from": account2}).wait(1)
+        approve_erc20(node.balanceOf(account2), rewards_controller, node, account2)
+
+    tx = rewards_controller.deposit(
+        0, usdt_node.balanceOf(account2), {"from": account2}
+    )
+    tx.wait(1)
+    deposit_time = tx.timestamp
+    rewards_controller.deposit(1, dai_node.balanceOf(account2), {"from": account2})
+
+    print("Rewards are split by allocation point, as with MasterChef")
+    chain.sleep(1000)
+    received, harvest_time = harvest(rewards_controller, bnpl, 0, account2)
+    assert_close(received, bnpl_per_second * (harvest_time - deposit_time) // 2)
+
+    print("Changing one pool's allocation point only reweights rewards from then on")
+    approve_erc20(BOND_AMOUNT, dai_node, bnpl, account)
+    dai_node.stake(BOND_AMOUNT, {"from": account}).wait(1)
+    tx = rewards_controller.set(1, {"from": account})
+    tx.wait(1)
+    set_time = tx.timestamp
+    assert rewards_controller.totalAllocPoint() == BOND_AMOUNT * 3
+
+    chain.sleep(1000)
+    received, final_time = harvest(rewards_controller, bnpl, 0, account2)
+    assert_close(
+        received,
+        bnpl_per_second * (set_time - harvest_time) // 2
+        + bnpl_per_second * (final_time - set_time) // 3,
+    )
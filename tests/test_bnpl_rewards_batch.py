@@ -0,0 +1,77 @@
+import brownie
+from brownie import BankingNode, Contract, chain, config, interface, network
+
+from scripts.helper import approve_erc20
+from scripts.deploy_helpers import (
+    BOND_AMOUNT,
+    create_node,
+    deploy_rewards_controller,
+    whitelist_token,
+)
+
+USDT_AMOUNT = 100 * 10**6
+DAI_AMOUNT = 100 * 10**18
+
+
+def test_bnpl_rewards_batch(factory_world):
+
+    account = factory_world.account
+    account2 = factory_world.account2
+    bnpl = factory_world.bnpl
+    factory = factory_world.factory
+    usdt = factory_world.usdt
+    dai = interface.IERC20(config["networks"][network.show_active()]["dai"])
+
+    rewards_controller = deploy_rewards_controller(factory, bnpl, chain.time())
+    approve_erc20(BOND_AMOUNT * 10, rewards_controller, bnpl, account)
+
+    print("Two nodes with a pool each, account2 lends to both")
+    whitelist_token(factory, dai.address)
+    bnpl.transfer(account2, BOND_AMOUNT, {"from": account})
+    approve_erc20(BOND_AMOUNT, factory, bnpl, account)
+    create_node(factory, account, usdt.address)
+    approve_erc20(BOND_AMOUNT, factory, bnpl, account2)
+    create_node(factory, account2, dai.address)
+    nodes = [
+        Contract.from_abi(
+            BankingNode._name, factory.operatorToNode(operator), BankingNode.abi
+        )
+        for operator in [account, account2]
+    ]
+    for node, token, amount in zip(nodes, [usdt, dai], [USDT_AMOUNT, DAI_AMOUNT]):
+        rewards_controller.add(node, {"from": account}).wait(1)
+        approve_erc20(amount, node, token, account2)
+        node.deposit(amount, {"from": account2}).wait(1)
+        approve_erc20(node.balanceOf(account2), rewards_controller, node, account2)
+
+    print("Deposit into both pools in one transaction")
+    amounts = [node.balanceOf(account2) for node in nodes]
+    with brownie.reverts():
+        rewards_controller.depositMany([0, 1], amounts[:1], {"from": account2})
+    tx = rewards_controller.depositMany([0, 1], amounts, {"from": account2})
+    tx.wait(1)
+    assert [rewards_controller.userInfo(pid, account2)[0] for pid in [0, 1]] == amounts
+    assert [event["pid"] for event in tx.events["Deposit"]] == [0, 1]
+
+    print("Batched views match the single pool views")
+    chain.sleep(1000)
+    chain.mine()
+    pending = rewards_controller.pendingBnplMany([0, 1], account2)
+    assert pending == [rewards_controller.pendingBnpl(pid, account2) for pid in [0, 1]]
+    assert all(amount > 0 for amount in pending)
+    assert rewards_controller.getBnplAprAll() == [
+        rewards_controller.getBnplApr(pid) for pid in [0, 1]
+    ]
+
+    print("Harvest both pools with a single BNPL transfer")
+    initial_balance = bnpl.balanceOf(account2)
+    tx = rewards_controller.harvestMany([0, 1], {"from": account2})
+    tx.wait(1)
+    payouts = [
+        event
+        for event in tx.events["Transfer"]
+        if event.address == bnpl.address and event["to"] == account2
+    ]
+    assert len(payouts) == 1
+    assert bnpl.balanceOf(account2) - initial_balance >= sum(pending)
+    assert [rewards_controller.userInfo(pid, account2)[0] for pid in [0, 1]] == amounts
@@ -1,17 +1,12 @@
-from scripts.helper import get_account, approve_erc20, get_weth
-from scripts.uniswap_helpers import swap_to_stablecoins
+from scripts.helper import approve_erc20
 from scripts.deploy_helpers import (
     create_node,
-    whitelist_usdt,
     whitelist_token,
-    deploy_bnpl_factory,
-    deploy_bnpl_token,
     deploy_rewards_controller,
 )
 import pytest
 import time
 from brownie import (
-    BNPLToken,
     BankingNode,
     Contract,
     config,
@@ -25,34 +20,23 @@ USDT_AMOUNT = 200 * 10**6  # 100 USDT
 DAI_AMOUNT = 200 * 10**18  # 100 DAI
 
 
-def test_bnpl_rewards_contract():
+def test_bnpl_rewards_contract(factory_world):
 
-    account = get_account()
-    account2 = get_account(index=2)
-
-    get_weth(account, 100)
-    get_weth(account2, 100)
-    swap_to_stablecoins(account)
-    swap_to_stablecoins(account2)
-
-    # Deploy BNPL Token
-    BNPL = deploy_bnpl_token()
+    account = factory_world.account
+    account2 = factory_world.account2
+    BNPL = factory_world.bnpl
 
     USDT = interface.IERC20(config["networks"][network.show_active()]["usdt"])
     DAI = interface.IERC20(config["networks"][network.show_active()]["dai"])
 
-    
-    # First deploy BNPL Factory and set up 2 nodes
-    # Deploy factory
-    FACTORY = deploy_bnpl_factory(BNPL, account)
-    
+    # First set up 2 nodes on the factory (USDT is already whitelisted)
+    FACTORY = factory_world.factory
+
     # Deploy the rewards controller
     start_time = time.time()
     rewards_controller = deploy_rewards_controller(FACTORY, BNPL, start_time)
 
-    # Whitelist USDT and DAI for the factory
-    # usdt_address = config["networks"][network.show_active()]["usdt"]
-    whitelist_usdt(FACTORY)
+    # Whitelist DAI for the factory
     whitelist_token(FACTORY, DAI.address)
 
     print("Deploy node with account 1")
@@ -0,0 +1,81 @@
+import brownie
+from brownie import chain
+
+from scripts.helper import approve_erc20
+from scripts.deploy_helpers import BOND_AMOUNT, deploy_rewards_controller
+
+
+def test_bnpl_rewards_emissions_buffer(liquid_node_world):
+
+    account = liquid_node_world.account
+    bnpl = liquid_node_world.bnpl
+    node = liquid_node_world.node
+
+    # account is the treasury, the operator of the node and its only lender
+    rewards_controller = deploy_rewards_controller(
+        liquid_node_world.factory, bnpl, chain.time()
+    )
+    approve_erc20(BOND_AMOUNT * 10, rewards_controller, bnpl, account)
+    rewards_controller.add(node, {"from": account}).wait(1)
+    lp_amount = node.balanceOf(account)
+    approve_erc20(lp_amount, rewards_controller, node, account)
+    rewards_controller.deposit(0, lp_amount, {"from": account}).wait(1)
+
+    print("A keeper pulls an epoch of emissions in one transfer")
+    treasury_balance = bnpl.balanceOf(account)
+    tx = rewards_controller.pullEmissions({"from": account})
+    tx.wait(1)
+    epoch_emissions = rewards_controller.EPOCH() * rewards_controller.bnplPerSecond()
+    assert treasury_balance - bnpl.balanceOf(account) == epoch_emissions
+    assert rewards_controller.emissionsBuffer() == epoch_emissions
+
+    print("Pool updates are paid from the buffer")
+    chain.sleep(1000)
+    treasury_balance = bnpl.balanceOf(account)
+    tx = rewards_controller.deposit(0, 0, {"from": account})
+    tx.wait(1)
+    reward = bnpl.balanceOf(account) - treasury_balance
+    assert reward > 0
+    # the pool's reward, the depositor's share of it only differs by rounding
+    pool_reward = epoch_emissions - rewards_controller.emissionsBuffer()
+    assert 0 <= pool_reward - reward <= reward // 10**9
+
+    print("An empty buffer is filled lazily by the next pool update")
+    chain.sleep(rewards_controller.EPOCH() * 2)
+    tx = rewards_controller.deposit(0, 0, {"from": account})
+    tx.wait(1)
+    assert rewards_controller.emissionsBuffer() == epoch_emissions
+
+    print("Lowering the rewards returns the buffer above an epoch at the new rate")
+    rate = rewards_controller.bnplPerSecond()
+    treasury_balance = bnpl.balanceOf(account)
+    buffer = rewards_controller.emissionsBuffer()
+    rewards_controller.updateRewards(1, {"from": account}).wait(1)
+    assert rewards_controller.emissionsBuffer() == rewards_controller.EPOCH()
+    returned = bnpl.balanceOf(account) - treasury_balance
+    # the pool is first given its rewards since the last deposit, at the previous rate
+    assert 0 <= buffer - rewards_controller.EPOCH() - returned <= 10 * rate
+
+    print("Only the owner can sweep the buffer back to the treasury")
+    with brownie.reverts():
+        rewards_controller.sweepEmissionsBuffer({"from": liquid_node_world.account2})
+    treasury_balance = bnpl.balanceOf(account)
+    buffer = rewards_controller.emissionsBuffer()
+    rewards_controller.sweepEmissionsBuffer({"from": account}).wait(1)
+    assert rewards_controller.emissionsBuffer() == 0
+    assert 0 <= buffer - (bnpl.balanceOf(account) - treasury_balance) <= 10
+    # rewards given to the pool stay claimable
+    assert bnpl.balanceOf(rewards_controller) >= rewards_controller.pendingBnpl(
+        0, account
+    )
+
+    print("Nothing is pulled after the end time")
+    chain.sleep(rewards_controller.endTime() - chain.time() + 1)
+    rewards_controller.deposit(0, 0, {"from": account}).wait(1)
+    treasury_balance = bnpl.balanceOf(account)
+    buffer = rewards_controller.emissionsBuffer()
+    chain.sleep(1000)
+    rewards_controller.pullEmissions({"from": account}).wait(1)
+    rewards_controller.deposit(0, 0, {"from": account}).wait(1)
+    assert bnpl.balanceOf(account) == treasury_balance
+    assert rewards_controller.emissionsBuffer() == buffer
@@ -0,0 +1,36 @@
+import pytest
+from brownie import (
+    MockLendingPoolAddressesProvider,
+    MockWETH,
+    config,
+    interface,
+    network,
+)
+
+from scripts.deploy_helpers import MOCK_STABLECOINS, deploy_mock_pair, deploy_mocks
+from scripts.helper import NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS, get_account
+from scripts.swap_math import pair_for
+
+
+def test_deploy_mocks(layered_world):
+    if network.show_active() not in NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS:
+        pytest.skip("Mocks are only deployed on the development network")
+
+    print("The mocks deploy on a fresh chain")
+    layered_world.reset()
+    assert len(MockLendingPoolAddressesProvider) == 0
+    account = get_account()
+    network_config = deploy_mocks(account)
+
+    print("Every stablecoin has a funded pair at its CREATE2 address")
+    weth = MockWETH[-1]
+    for key, name, symbol, decimals in MOCK_STABLECOINS:
+        pair_address = pair_for(network_config["factory"], network_config[key], weth)
+        reserve0, reserve1, _ = interface.IUniswapV2Pair(pair_address).getReserves()
+        assert reserve0 > 0 and reserve1 > 0
+
+    print("Asking for an existing pair returns it")
+    usdt = network_config["usdt"]
+    pair = deploy_mock_pair(usdt, weth, account)
+    assert pair.address == pair_for(network_config["factory"], weth, usdt)
+    assert pair.getReserves()[0] > 0
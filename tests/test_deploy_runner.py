@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from brownie import BNPLFactory, BNPLRewardsController, Contract, chain, config, network
+
+from scripts.deploy_runner import DeployRunner, factory_steps
+
+
+def test_deploy_runner(funded_world, tmp_path):
+
+    account = funded_world.account
+    bnpl = funded_world.bnpl
+    network_config = config["networks"][network.show_active()]
+    manifest = str(tmp_path / "deployment.json")
+    steps = factory_steps(bnpl, network_config, chain.time())
+
+    print("A deployment stopped halfway records the steps it confirmed")
+    DeployRunner(steps[:4], account, manifest).run()
+    with open(manifest) as file:
+        recorded = json.load(file)["steps"]
+    assert set(recorded) == {step.name for step in steps[:4]}
+    assert all("block" in entry for entry in recorded.values())
+
+    print("Only the account that started the deployment can resume it")
+    with pytest.raises(AssertionError):
+        DeployRunner(steps, funded_world.account2, manifest)
+
+    print("The rerun only sends the steps that are missing")
+    nonce = account.nonce
+    results = DeployRunner(steps, account, manifest).run()
+    assert account.nonce - nonce == len(steps) - 4
+    assert results["BNPLFactory"] == recorded["BNPLFactory"]["address"]
+
+    factory = Contract.from_abi(
+        "BNPLFactory_v0", results["BNPLFactory"], BNPLFactory.abi
+    )
+    assert factory.BNPL() == bnpl.address
+    assert factory.bankingNodeImplementation() == results["BankingNode implementation"]
+    assert factory.approvedBaseTokens(network_config["usdt"])
+    assert factory.approvedBaseTokens(network_config["usdc"])
+    rewards_controller = BNPLRewardsController.at(results["BNPLRewardsController"])
+    assert rewards_controller.bnplFactory() == factory.address
+
+    print("A finished deployment sends nothing")
+    DeployRunner(steps, account, manifest).run()
+    assert account.nonce - nonce == len(steps) - 4
@@ -0,0 +1,71 @@
+import brownie
+from brownie import BankingNode, Contract
+
+from scripts.deploy_helpers import (
+    BOND_AMOUNT,
+    GRACE_PERIOD,
+    create_node,
+    predict_node_address,
+)
+from scripts.helper import approve_erc20
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def test_factory_clone_nodes(factory_world):
+
+    account = factory_world.account
+    factory = factory_world.factory
+    usdt = factory_world.usdt
+
+    print("Only the owner can set the implementation, and only to a contract")
+    implementation = BankingNode.at(factory.bankingNodeImplementation())
+    with brownie.reverts():
+        factory.setBankingNodeImplementation(
+            implementation, {"from": factory_world.account2}
+        )
+    with brownie.reverts():
+        factory.setBankingNodeImplementation(account, {"from": account})
+
+    print("The implementation is locked")
+    with brownie.reverts():
+        implementation.initialize(
+            usdt,
+            factory_world.bnpl,
+            False,
+            account,
+            0,
+            ZERO_ADDRESS,
+            ZERO_ADDRESS,
+            ZERO_ADDRESS,
+            ZERO_ADDRESS,
+            {"from": account},
+        )
+
+    print("The node is created at the predicted address")
+    predicted = predict_node_address(factory, usdt, False, GRACE_PERIOD, account)
+    approve_erc20(BOND_AMOUNT, factory, factory_world.bnpl, account)
+    create_node(factory, account, usdt.address)
+    assert factory.operatorToNode(account) == predicted
+
+    node = Contract.from_abi(BankingNode._name, predicted, BankingNode.abi)
+    assert node.bnplFactory() == factory.address
+    assert node.operator() == account
+    assert node.name() == "BNPL USD"
+    assert node.symbol() == "pUSD"
+    assert node.getBNPLBalance(account) == BOND_AMOUNT
+
+    print("A node can only be initialized once")
+    with brownie.reverts():
+        node.initialize(
+            usdt,
+            factory_world.bnpl,
+            False,
+            account,
+            0,
+            ZERO_ADDRESS,
+            ZERO_ADDRESS,
+            ZERO_ADDRESS,
+            ZERO_ADDRESS,
+            {"from": account},
+        )
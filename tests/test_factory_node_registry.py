@@ -0,0 +1,35 @@
+import pytest
+from brownie import BNPLFactoryDEMO, chain
+
+from scripts.deploy_helpers import deploy_rewards_controller, upgrade_factory
+
+
+def test_factory_node_registry(node_world):
+
+    account = node_world.account
+    account2 = node_world.account2
+    factory = node_world.factory
+    node = node_world.node
+
+    print("Nodes created by the factory are flagged as banking nodes")
+    assert factory.isBankingNode(node)
+    assert not factory.isBankingNode(node_world.usdt)
+
+    print("Reward pools are looked up by node, one pool per node")
+    rewards_controller = deploy_rewards_controller(
+        factory, node_world.bnpl, chain.time()
+    )
+    assert rewards_controller.getPid(node) == 0xFFFF
+    with pytest.raises(Exception):
+        rewards_controller.add(node_world.usdt, {"from": account2})
+    rewards_controller.add(node, {"from": account2})
+    assert rewards_controller.getPid(node) == 0
+    with pytest.raises(Exception):
+        rewards_controller.add(node, {"from": account2})
+
+    print("Only the owner can backfill the flags of nodes created before an upgrade")
+    factory = upgrade_factory(BNPLFactoryDEMO, account)
+    with pytest.raises(Exception):
+        factory.backfillBankingNodes(0, 10, {"from": account2})
+    factory.backfillBankingNodes(0, 10, {"from": account})
+    assert factory.isBankingNode(node)
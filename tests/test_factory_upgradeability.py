@@ -11,17 +11,14 @@ from brownie import (
 from web3 import Web3
 from scripts.deploy_helpers import (
     create_node, 
-    deploy_bnpl_token, 
-    deploy_bnpl_factory, 
-    whitelist_usdt,
     upgrade_factory
 )
-from scripts.helper import approve_erc20, get_account
+from scripts.helper import approve_erc20
 
 BOND_AMOUNT = Web3.toWei(2000000, "ether")
 
 
-def test_factory_upgradeability():
+def test_factory_upgradeability(factory_world):
     """
     Validates the upgradeable implementation of BNPLFactory by deploying the contracts, upgrading 
     to a new implementation and calling a function only found in the second implementation.
@@ -34,15 +31,14 @@ def test_factory_upgradeability():
                                    |
                                    --> implementation_v2
     """
-    account = get_account()
+    account = factory_world.account
 
     USDT = interface.ERC20(config["networks"][network.show_active()]["usdt"])
-    BNPL = deploy_bnpl_token()
-    FACTORY = deploy_bnpl_factory(BNPL, account)
+    BNPL = factory_world.bnpl
+    FACTORY = factory_world.factory
 
 
     print("Verifying that a node can be created and behaviour is correct against BNPLFactory_V0")
-    whitelist_usdt(FACTORY)
     approve_erc20(BOND_AMOUNT, FACTORY, BNPL, account)
 
     create_node(FACTORY, account, USDT.address)
@@ -0,0 +1,32 @@
+import pytest
+
+from scripts.bench_gas import (
+    BASELINE_PATH,
+    STATE_SIZES,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+@pytest.mark.bench
+@pytest.mark.require_network("development")
+def test_gas_regressions():
+    """
+    Regression gate against the recorded gas baseline (scripts/bench_gas.py main record)
+    The first run records the baseline, commit it so later runs compare against it
+    Only runs when selected with `-m bench`
+    """
+    baseline = load_baseline()
+    results = run_benchmarks(STATE_SIZES)
+    if not baseline:
+        save_baseline(results)
+        print(f"Recorded the gas baseline at {BASELINE_PATH}")
+        return
+
+    regressions = compare(results, baseline)
+    assert regressions == [], "\n".join(
+        f"{name} @ {size}: {expected} -> {gas_used}"
+        for name, size, expected, gas_used in regressions
+    )
@@ -0,0 +1,83 @@
+from brownie import chain, web3
+
+from scripts.indexer import Indexer
+
+USDT_AMOUNT = 100 * 10**6  # 100 USDT
+
+
+def events(indexer, name):
+    return indexer.db.execute(
+        "SELECT address, user, base_amount FROM events WHERE event = ? ORDER BY block_number",
+        (name,),
+    ).fetchall()
+
+
+def test_indexer(liquid_node_world, tmp_path):
+
+    account = liquid_node_world.account
+    node = liquid_node_world.node
+    factory = liquid_node_world.factory
+    db_path = str(tmp_path / "bnpl.sqlite")
+
+    indexer = Indexer(db_path, factory, confirmations=0)
+    head = indexer.sync()
+    assert indexer.node_count() == 1
+    assert indexer.db.execute("SELECT operator FROM nodes").fetchone()[0] == account
+    # bond staked by the factory and the deposit of the liquid node layer
+    assert events(indexer, "bnplStaked")[0][0] == node.address
+    assert events(indexer, "baseTokenDeposit") == [
+        (node.address, account.address, str(USDT_AMOUNT * 2))
+    ]
+
+    print("A restarted indexer picks up from the checkpoints")
+    node.withdraw(USDT_AMOUNT, {"from": account}).wait(1)
+    indexer = Indexer(db_path, factory, confirmations=0)
+    assert indexer.sync() > head
+    assert events(indexer, "baseTokenWithdrawn") == [
+        (node.address, account.address, str(USDT_AMOUNT))
+    ]
+    assert len(events(indexer, "baseTokenDeposit")) == 1
+
+    print("Unconfirmed blocks are not indexed")
+    node.withdraw(USDT_AMOUNT // 2, {"from": account}).wait(1)
+    indexer = Indexer(db_path, factory, confirmations=1)
+    indexer.sync()
+    assert len(events(indexer, "baseTokenWithdrawn")) == 1
+
+
+def test_indexer_reorg(liquid_node_world, tmp_path):
+
+    account = liquid_node_world.account
+    node = liquid_node_world.node
+    factory = liquid_node_world.factory
+
+    indexer = Indexer(str(tmp_path / "bnpl.sqlite"), factory, confirmations=0)
+    indexer.sync()
+    node.withdraw(USDT_AMOUNT, {"from": account}).wait(1)
+    reorged = indexer.sync()
+    assert events(indexer, "baseTokenWithdrawn") == [
+        (node.address, account.address, str(USDT_AMOUNT))
+    ]
+
+    print("A checkpointed block dropped by a reorg rewinds the rows and checkpoints")
+    chain.undo()
+    node.withdraw(USDT_AMOUNT // 2, {"from": account}).wait(1)
+    chain.mine(2)
+    assert web3.eth.get_block(reorged)["hash"].hex() != indexer.db.execute(
+        "SELECT block_hash FROM checkpoints WHERE address = ?", (node.address,)
+    ).fetchone()[0]
+    indexer._check_reorgs()
+    rewound = reorged - 2
+    assert indexer._checkpoint(node.address) == rewound
+    assert indexer._checkpoint(factory.address) == rewound
+    assert events(indexer, "baseTokenWithdrawn") == []
+
+    print("Re-indexing follows the new chain")
+    head = indexer.sync()
+    assert events(indexer, "baseTokenWithdrawn") == [
+        (node.address, account.address, str(USDT_AMOUNT // 2))
+    ]
+    assert indexer.db.execute(
+        "SELECT block_number, block_hash FROM checkpoints WHERE address = ?",
+        (node.address,),
+    ).fetchone() == (head, web3.eth.get_block(head)["hash"].hex())
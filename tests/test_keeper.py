@@ -0,0 +1,65 @@
+from brownie import chain
+
+from scripts.deploy_helpers import add_lp
+from scripts.helper import approve_erc20
+from scripts.keeper import Keeper
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+MONTHLY = 2628000
+
+
+def current_loan(node, operator, borrower):
+    tx = node.requestLoan(
+        LOAN_AMOUNT,
+        MONTHLY,
+        12,
+        83,
+        False,
+        ZERO_ADDRESS,
+        0,
+        borrower,
+        "keeper",
+        {"from": borrower},
+    )
+    tx.wait(1)
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    node.approveLoan(loan_id, 0, {"from": operator}).wait(1)
+    return loan_id
+
+
+def test_keeper(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    node = liquid_node_world.node
+    usdt = liquid_node_world.usdt
+
+    # BNPL liquidity, for the sale of the slashed BNPL
+    add_lp(liquid_node_world.bnpl)
+
+    print("The keeper loads the deadlines of the current loans")
+    late_loan = current_loan(node, account, account2)
+    keeper = Keeper(liquid_node_world.factory, account)
+    keeper.load()
+    deadline = node.getNextDueDate(late_loan) + node.gracePeriod()
+    assert keeper.deadlines == {(node.address, late_loan): deadline}
+
+    print("New loans and payments are synced from events")
+    paid_loan = current_loan(node, account, account2)
+    approve_erc20(node.getNextPayment(paid_loan), node, usdt, account2)
+    node.makeLoanPayment(paid_loan, {"from": account2}).wait(1)
+    assert keeper.run_once() == []
+    assert keeper.deadlines[(node.address, paid_loan)] == (
+        node.getNextDueDate(paid_loan) + node.gracePeriod()
+    )
+    assert keeper.seconds_to_next_deadline(10**9) > 0
+
+    print("Only loans past their deadline are slashed")
+    chain.sleep(deadline - chain.time() + 1)
+    chain.mine()
+    assert keeper.run_once() == [(node.address, late_loan)]
+    assert node.idToLoan(late_loan)[11]
+    assert not node.idToLoan(paid_loan)[11]
+    assert node.slashingBalance() == 0
+    assert list(keeper.deadlines) == [(node.address, paid_loan)]
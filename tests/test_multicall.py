@@ -0,0 +1,53 @@
+from scripts.multicall import CallFailed, Multicall, read_loan_books
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+
+
+def test_multicall(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    factory = liquid_node_world.factory
+    node = liquid_node_world.node
+
+    print("Calls to different contracts are decoded like direct calls")
+    multicall = Multicall(batch_size=2)
+    calls = [
+        (factory.operatorToNode, account),
+        (factory.bankingNodeCount,),
+        (node.getBaseTokenBalance, account),
+        (node.getStakedBNPL,),
+        (node.getBNPLBalance, account),
+    ]
+    for method, *args in calls:
+        multicall.add(method, *args)
+    assert multicall.call() == [method(*args) for method, *args in calls]
+
+    print("A failed call does not fail the batch")
+    multicall.add(factory.bankingNodesList, 0)
+    failed = multicall.add(factory.bankingNodesList, 1)
+    results = multicall.call()
+    assert results[0] == node.address
+    assert isinstance(results[failed], CallFailed)
+    assert not results[failed]
+
+    print("Loan books of every node")
+    tx = node.requestLoan(
+        LOAN_AMOUNT,
+        2628000,
+        12,
+        83,
+        False,
+        ZERO_ADDRESS,
+        0,
+        account2,
+        "multicall",
+        {"from": account2},
+    )
+    tx.wait(1)
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    node.approveLoan(loan_id, 0, {"from": account}).wait(1)
+    assert read_loan_books(factory) == {
+        node.address: {loan_id: node.idToLoan(loan_id)}
+    }
@@ -0,0 +1,67 @@
+import brownie
+import pytest
+from brownie import MockERC20, chain, config, interface, network
+
+from scripts.deploy_helpers import add_lp
+from scripts.helper import approve_erc20
+from scripts.quotes import Quotes
+from scripts.swap_math import Revert
+
+LOAN_AMOUNT = 10 * 10**6  # 10 USDT, the minimum loan size
+COLLATERAL_AMOUNT = 20 * 10**18  # 20 DAI
+
+
+def test_quotes(liquid_node_world):
+
+    account = liquid_node_world.account
+    account2 = liquid_node_world.account2
+    factory = liquid_node_world.factory
+    node = liquid_node_world.node
+    usdt = liquid_node_world.usdt
+    dai = interface.IERC20(config["networks"][network.show_active()]["dai"])
+    add_lp(liquid_node_world.bnpl)
+
+    approve_erc20(COLLATERAL_AMOUNT, node, dai, account2)
+    tx = node.requestLoan(
+        LOAN_AMOUNT,
+        2628000,
+        12,
+        83,
+        False,
+        dai,
+        COLLATERAL_AMOUNT,
+        account2,
+        "quotes",
+        {"from": account2},
+    )
+    tx.wait(1)
+    loan_id = tx.events["LoanRequest"]["loanId"]
+    node.approveLoan(loan_id, COLLATERAL_AMOUNT, {"from": account}).wait(1)
+    chain.sleep(node.getNextDueDate(loan_id) + node.gracePeriod() - chain.time() + 1)
+    chain.mine()
+
+    print("The quote of the collateral sale is the exact minOut slashLoan accepts")
+    quotes = Quotes.for_factory(factory)
+    quotes.refresh()
+    quote = quotes.get_amount_out(COLLATERAL_AMOUNT, dai, usdt)
+    assert 0 < quotes.min_out(COLLATERAL_AMOUNT, dai, usdt) < quote
+    with brownie.reverts():
+        node.slashLoan(loan_id, quote + 1, {"from": account2})
+    tx = node.slashLoan(loan_id, quote, {"from": account2})
+    tx.wait(1)
+
+    print("Applying the quoted swap gives the reserves read after the slash")
+    assert quotes.swap(COLLATERAL_AMOUNT, dai, usdt) == quote
+    expected = dict(quotes.reserves)
+    quotes.refresh()
+    assert quotes.block == tx.block_number
+    assert quotes.reserves == expected
+    assert quotes.get_amount_out(10**18, liquid_node_world.bnpl, usdt) > 0
+
+    print("Tokens without a pair cannot be quoted")
+    token = MockERC20.deploy("No Pair", "NOPAIR", 18, {"from": account})
+    quotes.add_tokens(token)
+    quotes.refresh()
+    assert quotes.reserves[token.address] is None
+    with pytest.raises(Revert):
+        quotes.get_amount_out(10**18, token, usdt)
@@ -0,0 +1,192 @@
+import copy
+import random
+
+import brownie
+import pytest
+from brownie import (
+    MockAToken,
+    MockERC20,
+    MockLendingPool,
+    MockUniswapV2Pair,
+    chain,
+    config,
+    network,
+)
+from brownie.exceptions import VirtualMachineError
+
+from scripts.deploy_helpers import add_lp
+from scripts.helper import NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS, approve_erc20
+from scripts.simulator import (
+    BASE,
+    BNPL,
+    COLLATERAL,
+    OPERATOR,
+    Revert,
+    Simulator,
+    random_action,
+    random_trace,
+)
+from scripts.swap_math import pair_for
+
+STEPS = 40
+USER = "user"
+MAX_UINT256 = 2**256 - 1
+
+
+def simulator_from_chain(world, tokens):
+    """
+    Simulator starting from the state of the node, its reserves and its pairs
+    """
+    network_config = config["networks"][network.show_active()]
+    node = world.node
+    pool = MockLendingPool[-1]
+    pairs = {}
+    for name, token in tokens.items():
+        pair = MockUniswapV2Pair.at(
+            pair_for(network_config["factory"], token, network_config["weth"])
+        )
+        reserve0, reserve1, _ = pair.getReserves()
+        if pair.token0() == token.address:
+            pairs[name] = (reserve0, reserve1)
+        else:
+            pairs[name] = (reserve1, reserve0)
+    sim = Simulator(
+        decimals=tokens[BASE].decimals(),
+        grace_period=node.gracePeriod(),
+        bond=0,
+        pairs=pairs,
+        now=chain.time(),
+        block=chain.height,
+    )
+    for name in [BASE, COLLATERAL]:
+        index, rate, last_update, a_token = _reserve(pool, tokens[name])
+        sim.pool.add_reserve(name, rate, index, last_update)
+        sim.pool.reserves[name]["scaled"]["node"] = a_token.scaledBalanceOf(node)
+    sim.staking_shares[OPERATOR] = node.stakingShares(world.account)
+    sim.total_staking_shares = node.totalStakingShares()
+    sim.bnpl_balance = tokens[BNPL].balanceOf(node)
+    return sim
+
+
+def _reserve(pool, token):
+    data = pool.getReserveData(token)
+    return (
+        data["liquidityIndex"],
+        data["currentLiquidityRate"],
+        data["lastUpdateTimestamp"],
+        MockAToken.at(data["aTokenAddress"]),
+    )
+
+
+def send(node, action, args, accounts):
+    """
+    Send the transaction of a simulator action, returns whether it reverted
+    Reverting transactions are mined too, so the simulator can take their block
+    """
+    sender = accounts[USER]
+    if action in ["deposit", "withdraw", "stake", "initiate_unstake", "unstake"]:
+        sender, args = accounts[args[0]], args[1:]
+    elif action == "request_loan":
+        collateral = config["networks"][network.show_active()]["dai"]
+        (_, amount, interval, payments, rate, interest_only, collateral_amount) = args
+        args = (amount, interval, payments, rate, interest_only, collateral)
+        args += (collateral_amount, sender, "parity")
+    elif action == "approve_loan":
+        sender, args = accounts[OPERATOR], (args[0], 0)
+    elif action in ["slash_loan", "sell_slashed"]:
+        args += (0,)
+    method = getattr(node, _camel_case(action))
+    try:
+        tx = method(
+            *args, {"from": sender, "gas_limit": 3000000, "allow_revert": True}
+        )
+        tx.wait(1)
+    except VirtualMachineError:
+        pass
+    tx = brownie.history[-1]
+    return tx, tx.status == 0
+
+
+def _camel_case(name):
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_simulator_parity(node_world, seed):
+    if network.show_active() not in NON_FORKED_LOCAL_BLOCKCHAIN_ENVIRONMENTS:
+        pytest.skip("the simulator models the development network mocks")
+
+    account = node_world.account
+    account2 = node_world.account2
+    node = node_world.node
+    network_config = config["networks"][network.show_active()]
+    tokens = {
+        BASE: MockERC20.at(node.baseToken()),
+        COLLATERAL: MockERC20.at(network_config["dai"]),
+        BNPL: node_world.bnpl,
+    }
+    accounts = {OPERATOR: account, USER: account2}
+
+    # BNPL liquidity, for fees and slashing sales
+    add_lp(node_world.bnpl)
+    node_world.bnpl.transfer(account2, 10**7 * 10**18, {"from": account}).wait(1)
+    for token in tokens.values():
+        if token != node_world.bnpl:
+            token.mint(account2, 10**9 * 10 ** token.decimals(), {"from": account})
+        approve_erc20(MAX_UINT256, node, token, account2)
+    approve_erc20(MAX_UINT256, node, node_world.bnpl, account)
+
+    pool = MockLendingPool[-1]
+    a_tokens = {name: _reserve(pool, tokens[name])[3] for name in [BASE, COLLATERAL]}
+    sim = simulator_from_chain(node_world, tokens)
+    trace = random_trace(seed, STEPS, simulator_from_chain(node_world, tokens), [USER])
+
+    print("Every step of the trace reverts and changes state the same on chain")
+    for step, (action, args) in enumerate(trace):
+        if action == "sleep":
+            chain.sleep(args[0])
+            continue
+        tx, reverted = send(node, action, args, accounts)
+        sim.now = tx.timestamp
+        sim.block = tx.block_number
+        result = sim.apply(action, *args)
+        assert reverted == isinstance(result, Revert), (step, action, args, result)
+
+        assert node.totalSupply() == sim.total_supply
+        for name, user in accounts.items():
+            assert node.balanceOf(user) == sim.balances.get(name, 0)
+            assert node.stakingShares(user) == sim.staking_shares.get(name, 0)
+            assert node.unbondingShares(user) == sim.unbonding_shares.get(name, 0)
+        assert node.accountsReceiveable() == sim.accounts_receiveable
+        for name, a_token in a_tokens.items():
+            scaled = sim.pool.reserves[name]["scaled"].get("node", 0)
+            assert a_token.scaledBalanceOf(node) == scaled
+        assert tokens[BASE].balanceOf(node) == sim.base_balance
+        assert tokens[BNPL].balanceOf(node) == sim.bnpl_balance
+        assert node.totalStakingShares() == sim.total_staking_shares
+        assert node.unbondingAmount() == sim.unbonding_amount
+        assert node.slashingBalance() == sim.slashing_balance
+        assert node.getTotalDefaultLoss() == sim.total_default_loss
+        assert node.getCurrentLoansCount() == len(sim.current_loans)
+        assert node.getPendingRequestCount() == len(sim.pending_requests)
+
+
+def _state(sim):
+    state = copy.deepcopy(vars(sim))
+    state["loans"] = {loan_id: vars(loan) for loan_id, loan in state["loans"].items()}
+    state["pool"] = state["pool"].reserves
+    state["exchange"] = state["exchange"].pairs
+    return state
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_simulator_reverts_leave_state(seed):
+    # every action checks its requirements first, a reverted action changes nothing
+    rng = random.Random(seed)
+    sim = Simulator()
+    for step in range(200):
+        action, args = random_action(sim, rng)
+        state = _state(sim)
+        if isinstance(sim.apply(action, *args), Revert):
+            assert _state(sim) == state, (step, action, args)